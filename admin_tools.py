@@ -6,77 +6,72 @@ import asyncio
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import List
 
 # Добавляем корневую папку в путь
 sys.path.append(str(Path(__file__).parent))
 
 from app.core.database import get_db_session
 from app.services.user_service import UserService
-from app.schemas.user import UserUpdate
 
 
-async def set_user_subscription(telegram_id: int, days: int = 30):
-    """Установка подписки пользователю."""
-    async with get_db_session() as session:
-        user_service = UserService(session)
-        
-        # Ищем пользователя
-        user = await user_service.get_user_by_telegram_id(telegram_id)
-        
-        if not user:
-            print(f"❌ Пользователь с telegram_id {telegram_id} не найден в базе данных")
-            return
-        
-        # Устанавливаем подписку
-        subscription_until = datetime.now() + timedelta(days=days)
-        
-        await user_service.update_user(str(user.id), UserUpdate(
-            subscription_until=subscription_until,
-            is_premium=True,
-            status="active"
-        ))
-        
-        print(f"✅ Установлена подписка для пользователя {telegram_id}")
-        print(f"  Подписка до: {subscription_until.strftime('%d.%m.%Y %H:%M')}")
-        print(f"  Дней: {days}")
-        print(f"  Premium: True")
-        print(f"  Статус: active")
+def parse_telegram_ids(raw: str) -> List[int]:
+    """Разбор списка telegram_id, разделенных запятыми."""
+    return [int(part) for part in raw.split(",") if part.strip()]
 
 
-async def remove_user_subscription(telegram_id: int):
-    """Удаление подписки пользователя."""
-    async with get_db_session() as session:
-        user_service = UserService(session)
-        
-        # Ищем пользователя
-        user = await user_service.get_user_by_telegram_id(telegram_id)
-        
-        if not user:
-            print(f"❌ Пользователь с telegram_id {telegram_id} не найден в базе данных")
-            return
-        
-        # Удаляем подписку
-        await user_service.update_user(str(user.id), UserUpdate(
-            subscription_until=None,
-            is_premium=False,
-            status="pending"
-        ))
-        
-        print(f"✅ Удалена подписка для пользователя {telegram_id}")
+async def set_user_subscription(user_service: UserService, telegram_ids: List[int], days: int = 30):
+    """Установка подписки пользователям одним запросом."""
+    # Устанавливаем подписку всем пользователям одним UPDATE
+    subscription_until = datetime.now() + timedelta(days=days)
+    
+    updated = await user_service.bulk_set_subscription(
+        telegram_ids,
+        subscription_until=subscription_until,
+        is_premium=True,
+        status="active"
+    )
+    
+    if not updated:
+        print(f"❌ Пользователи с telegram_id {', '.join(map(str, telegram_ids))} не найдены в базе данных")
+        return
+    
+    print(f"✅ Установлена подписка для {updated} из {len(telegram_ids)} пользователей")
+    print(f"  Подписка до: {subscription_until.strftime('%d.%m.%Y %H:%M')}")
+    print(f"  Дней: {days}")
+    print(f"  Premium: True")
+    print(f"  Статус: active")
 
 
-async def check_user_status(telegram_id: int):
-    """Проверка статуса пользователя."""
-    async with get_db_session() as session:
-        user_service = UserService(session)
-        
-        # Ищем пользователя
-        user = await user_service.get_user_by_telegram_id(telegram_id)
-        
-        if not user:
+async def remove_user_subscription(user_service: UserService, telegram_ids: List[int]):
+    """Удаление подписки пользователей одним запросом."""
+    # Удаляем подписку всем пользователям одним UPDATE
+    updated = await user_service.bulk_set_subscription(
+        telegram_ids,
+        subscription_until=None,
+        is_premium=False,
+        status="pending"
+    )
+    
+    if not updated:
+        print(f"❌ Пользователи с telegram_id {', '.join(map(str, telegram_ids))} не найдены в базе данных")
+        return
+    
+    print(f"✅ Удалена подписка для {updated} из {len(telegram_ids)} пользователей")
+
+
+async def check_user_status(user_service: UserService, telegram_ids: List[int]):
+    """Проверка статуса пользователей."""
+    # Получаем только нужные колонки всех пользователей одним запросом
+    users = await user_service.get_user_status_rows(telegram_ids)
+    found_ids = {user.telegram_id for user in users}
+    now = datetime.now()
+    
+    for telegram_id in telegram_ids:
+        if telegram_id not in found_ids:
             print(f"❌ Пользователь с telegram_id {telegram_id} не найден в базе данных")
-            return
-        
+    
+    for user in users:
         print(f"✅ Пользователь найден:")
         print(f"  ID: {user.id}")
         print(f"  Telegram ID: {user.telegram_id}")
@@ -92,7 +87,7 @@ async def check_user_status(telegram_id: int):
         
         # Проверяем активность подписки
         if user.subscription_until:
-            if user.subscription_until > datetime.now():
+            if user.subscription_until > now:
                 print(f"✅ Активная подписка до {user.subscription_until}")
             else:
                 print(f"❌ Подписка истекла {user.subscription_until}")
@@ -100,60 +95,115 @@ async def check_user_status(telegram_id: int):
             print("❌ Нет активной подписки")
 
 
-async def main():
-    """Основная функция."""
-    if len(sys.argv) < 2:
-        print("Использование:")
-        print("  python admin_tools.py set <telegram_id> [days]")
-        print("  python admin_tools.py remove <telegram_id>")
-        print("  python admin_tools.py check <telegram_id>")
-        print("Примеры:")
-        print("  python admin_tools.py set 1670311707")
-        print("  python admin_tools.py set 1670311707 7")
-        print("  python admin_tools.py remove 1670311707")
-        print("  python admin_tools.py check 1670311707")
-        return
-    
-    command = sys.argv[1]
+async def run_command(user_service: UserService, args: List[str]):
+    """Выполнение одной команды (из аргументов или из строки stdin)."""
+    command = args[0]
     
     if command == "set":
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("❌ Ошибка: укажите telegram_id")
             return
         
         try:
-            telegram_id = int(sys.argv[2])
-            days = int(sys.argv[3]) if len(sys.argv) > 3 else 30
-            await set_user_subscription(telegram_id, days)
+            telegram_ids = parse_telegram_ids(args[1])
+            days = int(args[2]) if len(args) > 2 else 30
         except ValueError:
             print("❌ Ошибка: telegram_id и days должны быть числами")
+            return
+        await set_user_subscription(user_service, telegram_ids, days)
     
     elif command == "remove":
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("❌ Ошибка: укажите telegram_id")
             return
         
         try:
-            telegram_id = int(sys.argv[2])
-            await remove_user_subscription(telegram_id)
+            telegram_ids = parse_telegram_ids(args[1])
         except ValueError:
             print("❌ Ошибка: telegram_id должен быть числом")
+            return
+        await remove_user_subscription(user_service, telegram_ids)
     
     elif command == "check":
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             print("❌ Ошибка: укажите telegram_id")
             return
         
         try:
-            telegram_id = int(sys.argv[2])
-            await check_user_status(telegram_id)
+            telegram_ids = parse_telegram_ids(args[1])
         except ValueError:
             print("❌ Ошибка: telegram_id должен быть числом")
+            return
+        await check_user_status(user_service, telegram_ids)
     
     else:
         print("❌ Ошибка: неизвестная команда. Используйте 'set', 'remove' или 'check'")
 
 
+async def run_batch(interactive: bool):
+    """
+    Выполнение команд из stdin в одной сессии БД.
+    
+    Каждая строка - команда в формате аргументов CLI, например "set 1670311707 7".
+    Пустые строки и строки, начинающиеся с '#', пропускаются.
+    """
+    async with get_db_session() as session:
+        user_service = UserService(session)
+        
+        while True:
+            if interactive:
+                print("> ", end="", flush=True)
+            
+            line = await asyncio.to_thread(sys.stdin.readline)
+            if not line:
+                break
+            
+            args = line.split()
+            if not args or args[0].startswith("#"):
+                continue
+            if args[0] in ("exit", "quit"):
+                break
+            
+            try:
+                await run_command(user_service, args)
+            except Exception as e:
+                print(f"❌ Ошибка выполнения '{line.strip()}': {e}")
+
+
+async def main():
+    """Основная функция."""
+    if len(sys.argv) < 2:
+        print("Использование:")
+        print("  python admin_tools.py set <telegram_id[,telegram_id...]> [days]")
+        print("  python admin_tools.py remove <telegram_id[,telegram_id...]>")
+        print("  python admin_tools.py check <telegram_id[,telegram_id...]>")
+        print("  python admin_tools.py repl              - интерактивный режим")
+        print("  python admin_tools.py batch -           - команды из stdin, по одной на строку")
+        print("Примеры:")
+        print("  python admin_tools.py set 1670311707")
+        print("  python admin_tools.py set 1670311707 7")
+        print("  python admin_tools.py remove 1670311707")
+        print("  python admin_tools.py check 1670311707")
+        print("  python admin_tools.py set 1670311707,123456789 30")
+        print("  cat commands.txt | python admin_tools.py batch -")
+        return
+    
+    command = sys.argv[1]
+    
+    if command == "repl":
+        await run_batch(interactive=True)
+        return
+    
+    if command == "batch":
+        if len(sys.argv) < 3 or sys.argv[2] != "-":
+            print("❌ Ошибка: используйте 'batch -' для чтения команд из stdin")
+            return
+        await run_batch(interactive=False)
+        return
+    
+    async with get_db_session() as session:
+        await run_command(UserService(session), sys.argv[1:])
+
+
 if __name__ == "__main__":
     asyncio.run(main())
-
@@ -2,14 +2,198 @@
 Декораторы для проверки подписки и платежей.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from functools import wraps
-from datetime import datetime
-from telegram import Update
-from telegram.ext import ContextTypes
+from datetime import datetime, timedelta
+from typing import Optional
+from telegram import Update, User
+from telegram.ext import Application, ContextTypes
 from loguru import logger
 
-from app.core.database import get_db_session
+from app.core.database import async_session_maker
 from app.services import UserService, TelegramService
+from app.services.group_management_service import GroupManagementService
+from app.schemas.user import UserCreate
+
+
+# Время жизни кэша данных пользователя в context.user_data
+USER_CACHE_TTL = timedelta(seconds=60)
+SUBSCRIPTION_CACHE_TTL = timedelta(minutes=5)
+
+_USER_CACHE_KEY = "_user_cache"
+_SUBSCRIPTION_CACHE_KEY = "_subscription_cache"
+
+# Атрибут контекста обновления, в котором хранится общая сессия БД
+_REQUEST_SESSION_ATTR = "_request_session"
+
+
+@asynccontextmanager
+async def request_session(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Сессия БД, общая для всех обработчиков одного обновления.
+    
+    Сессия создается при первом обращении и хранится в контексте обновления
+    (он один на все группы обработчиков). Фиксация и закрытие выполняются
+    в close_request_session после обработки обновления.
+    
+    Yields:
+        AsyncSession: Асинхронная сессия базы данных
+    """
+    session = getattr(context, _REQUEST_SESSION_ATTR, None)
+    if session is None:
+        session = async_session_maker()
+        setattr(context, _REQUEST_SESSION_ATTR, session)
+    
+    try:
+        yield session
+    except Exception as e:
+        logger.error(f"Ошибка в сессии базы данных: {e}")
+        await session.rollback()
+        raise
+
+
+async def close_request_session(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Фиксирует и закрывает сессию обновления, если она открывалась.
+    
+    Регистрируется как TypeHandler в последней группе обработчиков.
+    """
+    session = context.__dict__.pop(_REQUEST_SESSION_ATTR, None)
+    if session is None:
+        return
+    
+    try:
+        await session.commit()
+    except Exception as e:
+        logger.error(f"Ошибка фиксации сессии обновления: {e}")
+        await session.rollback()
+    finally:
+        await session.close()
+
+def get_telegram_service(context: ContextTypes.DEFAULT_TYPE) -> TelegramService:
+    """
+    Возвращает общий экземпляр TelegramService для бота.
+    
+    Экземпляр регистрируется в bot_data при старте (см. register_handlers),
+    а если его там нет - создается один раз и сохраняется туда же.
+    """
+    telegram_service = context.bot_data.get("telegram_service")
+    if telegram_service is None:
+        telegram_service = context.bot_data["telegram_service"] = TelegramService(context.bot)
+    return telegram_service
+
+
+def get_group_service(context: ContextTypes.DEFAULT_TYPE) -> GroupManagementService:
+    """Возвращает общий экземпляр GroupManagementService для бота (из bot_data)."""
+    group_service = context.bot_data.get("group_service")
+    if group_service is None:
+        group_service = context.bot_data["group_service"] = GroupManagementService(context.bot)
+    return group_service
+
+
+def _get_cached(user_data: Optional[dict], key: str, telegram_id: int, now: datetime) -> Optional[dict]:
+    """Возвращает актуальную запись кэша пользователя или None."""
+    if user_data is None:
+        return None
+
+    entry = user_data.get(key)
+    if not entry or entry["telegram_id"] != telegram_id or entry["expires_at"] <= now:
+        return None
+
+    return entry
+
+
+def invalidate_user_cache(context: ContextTypes.DEFAULT_TYPE, telegram_id: Optional[int] = None) -> None:
+    """
+    Сбрасывает кэш проверок подписки и оплаты.
+    
+    Args:
+        context: Контекст бота
+        telegram_id: Telegram ID пользователя. Без него сбрасывается только
+            кэш в user_data текущего пользователя, кэш TelegramService остается
+    """
+    if telegram_id is None:
+        _drop_user_cache(context.user_data)
+    else:
+        invalidate_application_user_cache(context.application, telegram_id)
+
+
+def invalidate_application_user_cache(application: Application, telegram_id: int) -> None:
+    """
+    Сбрасывает кэш проверок пользователя, когда контекста обновления нет
+    (например, при оплате через webhook в одном процессе с ботом).
+    
+    Args:
+        application: Приложение бота
+        telegram_id: Telegram ID пользователя
+    """
+    _drop_user_cache(application.user_data.get(telegram_id))
+    
+    telegram_service = application.bot_data.get("telegram_service")
+    if telegram_service is not None:
+        telegram_service.clear_subscription_cache(telegram_id)
+
+
+def _drop_user_cache(user_data: Optional[dict]) -> None:
+    """Удаляет из user_data записи кэша подписки и оплаты."""
+    if user_data is not None:
+        user_data.pop(_USER_CACHE_KEY, None)
+        user_data.pop(_SUBSCRIPTION_CACHE_KEY, None)
+
+
+async def _check_subscription(
+    context: ContextTypes.DEFAULT_TYPE,
+    telegram_service: TelegramService,
+    user_id: int,
+    now: datetime
+) -> bool:
+    """Проверяет подписку на канал с учетом кэша пользователя."""
+    cached = _get_cached(context.user_data, _SUBSCRIPTION_CACHE_KEY, user_id, now)
+    if cached:
+        return cached["is_subscribed"]
+    
+    is_subscribed = await telegram_service.check_user_subscription(user_id)
+    # Кэшируем только подтвержденную подписку: вступивший в группу пользователь
+    # (или после временной ошибки API) не должен ждать истечения TTL
+    if is_subscribed and context.user_data is not None:
+        context.user_data[_SUBSCRIPTION_CACHE_KEY] = {
+            "telegram_id": user_id,
+            "is_subscribed": is_subscribed,
+            "expires_at": now + SUBSCRIPTION_CACHE_TTL
+        }
+    return is_subscribed
+
+
+async def _get_subscription_until(context: ContextTypes.DEFAULT_TYPE, user: User, now: datetime):
+    """
+    Возвращает дату окончания оплаченной подписки с учетом кэша пользователя.
+    
+    Отсутствующий пользователь создается тем же запросом (upsert).
+    
+    Returns:
+        tuple: (был ли пользователь только что создан, дата окончания подписки)
+    """
+    cached = _get_cached(context.user_data, _USER_CACHE_KEY, user.id, now)
+    if cached:
+        return False, cached["subscription_until"]
+    
+    async with request_session(context) as session:
+        user_service = UserService(session)
+        db_user, created = await user_service.get_or_create_by_telegram_id(UserCreate(
+            telegram_id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name
+        ))
+    
+    if context.user_data is not None:
+        context.user_data[_USER_CACHE_KEY] = {
+            "telegram_id": user.id,
+            "subscription_until": db_user.subscription_until,
+            "expires_at": now + USER_CACHE_TTL
+        }
+    return created, db_user.subscription_until
 
 
 def require_subscription(func):
@@ -25,9 +209,13 @@ def require_subscription(func):
                 logger.error("Не удалось получить данные пользователя")
                 return
             
-            # Проверяем подписку
-            telegram_service = TelegramService(context.bot)
-            is_subscribed = await telegram_service.check_user_subscription(user.id)
+            # Одно значение текущего времени на весь вызов (кэш и сравнение подписки)
+            now = datetime.now()
+            
+            telegram_service = get_telegram_service(context)
+            
+            # Проверяем подписку (сначала по кэшу пользователя)
+            is_subscribed = await _check_subscription(context, telegram_service, user.id, now)
             
             if not is_subscribed:
                 await telegram_service.send_subscription_required_message(user.id)
@@ -56,27 +244,81 @@ def require_payment(func):
                 logger.error("Не удалось получить данные пользователя")
                 return
             
-            async with get_db_session() as session:
-                user_service = UserService(session)
-                db_user = await user_service.get_user_by_telegram_id(user.id)
-                
-                if not db_user:
-                    # Пользователь не найден, отправляем приветствие
-                    from app.bot.handlers.start import start_command_handler
-                    return await start_command_handler(update, context)
-                
-                # Проверяем активную подписку
-                if not db_user.subscription_until or db_user.subscription_until <= datetime.now():
-                    # Нет активной подписки
-                    telegram_service = TelegramService(context.bot)
-                    await telegram_service.send_payment_required_message(user.id)
-                    return
-                
-                # Если есть активная подписка, выполняем оригинальную функцию
-                return await func(update, context, *args, **kwargs)
+            # Одно значение текущего времени на весь вызов (кэш и сравнение подписки)
+            now = datetime.now()
+            
+            # Берем дату окончания подписки из кэша, чтобы не ходить в БД на каждый клик
+            created, subscription_until = await _get_subscription_until(context, user, now)
+            
+            if created:
+                # Новый пользователь, отправляем приветствие
+                from app.bot.handlers.start import start_command_handler
+                return await start_command_handler(update, context)
+            
+            # Проверяем активную подписку
+            if not subscription_until or subscription_until <= now:
+                # Нет активной подписки
+                telegram_service = get_telegram_service(context)
+                await telegram_service.send_payment_required_message(user.id)
+                return
+            
+            # Если есть активная подписка, выполняем оригинальную функцию
+            return await func(update, context, *args, **kwargs)
                 
         except Exception as e:
             logger.error(f"Ошибка в декораторе require_payment: {e}")
             return
     
     return wrapper
+
+
+def require_subscription_and_payment(func):
+    """
+    Декоратор для проверки подписки на канал и активной оплаты.
+    Запрос к Telegram API и запрос к БД выполняются параллельно.
+    """
+    @wraps(func)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        try:
+            user = update.effective_user
+            if not user:
+                logger.error("Не удалось получить данные пользователя")
+                return
+            
+            # Одно значение текущего времени на весь вызов (кэш и сравнение подписки)
+            now = datetime.now()
+            
+            telegram_service = get_telegram_service(context)
+            
+            # Запускаем проверку подписки, пока читаем пользователя из БД
+            subscription_task = asyncio.create_task(
+                _check_subscription(context, telegram_service, user.id, now)
+            )
+            try:
+                created, subscription_until = await _get_subscription_until(context, user, now)
+            except Exception:
+                subscription_task.cancel()
+                raise
+            is_subscribed = await subscription_task
+            
+            if not is_subscribed:
+                await telegram_service.send_subscription_required_message(user.id)
+                return
+            
+            if created:
+                # Новый пользователь, отправляем приветствие
+                from app.bot.handlers.start import start_command_handler
+                return await start_command_handler(update, context)
+            
+            # Проверяем активную подписку
+            if not subscription_until or subscription_until <= now:
+                await telegram_service.send_payment_required_message(user.id)
+                return
+            
+            return await func(update, context, *args, **kwargs)
+            
+        except Exception as e:
+            logger.error(f"Ошибка в декораторе require_subscription_and_payment: {e}")
+            return
+    
+    return wrapper
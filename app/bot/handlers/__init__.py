@@ -2,9 +2,15 @@
 Обработчики для ClubBot.
 """
 
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters
+from telegram import Update
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, TypeHandler, ContextTypes, filters
 from loguru import logger
 
+from app.services.telegram_service import TelegramService
+from app.services.group_management_service import GroupManagementService
+from config.settings import get_settings
+from app.bot.decorators import close_request_session
+
 from .start import start_handler
 from .main import main_handler
 from .payment import payment_handler
@@ -28,10 +34,12 @@ from .admin_dashboard import (
     admin_management_handler,
     admin_add_admin_handler,
     admin_remove_admin_handler,
-    handle_admin_id_input,
+    handle_add_admin_id_input,
+    handle_remove_admin_id_input,
     admin_check_subscriptions_handler,
     admin_send_to_group_handler,
-    handle_group_message_input
+    handle_group_message_input,
+    AdminState
 )
 from .group_info import group_info_handler
 from .group_activity import (
@@ -41,9 +49,95 @@ from .group_activity import (
 )
 
 
+_SETTINGS = get_settings()
+_GROUP_ID = int(_SETTINGS.GROUP_ID) if _SETTINGS.GROUP_ID else None
+
+# Фильтры сообщений группы и личных сообщений (не групповых)
+if _GROUP_ID is not None:
+    GROUP_FILTER = filters.Chat(chat_id=_GROUP_ID) & ~filters.COMMAND
+    PRIVATE_FILTER = filters.TEXT & ~filters.COMMAND & ~filters.Chat(chat_id=_GROUP_ID)
+else:
+    GROUP_FILTER = None
+    PRIVATE_FILTER = filters.TEXT & ~filters.COMMAND
+
+# Маршруты админских callback'ов: точное совпадение callback_data
+CALLBACK_ROUTES = {
+    "admin_dashboard": admin_dashboard_handler,
+    "admin_back": admin_dashboard_handler,
+    "admin_users": admin_users_handler,
+    "admin_access": admin_access_handler,
+    "admin_give_access_all": admin_give_access_all_handler,
+    "admin_give_access_by_id": admin_give_access_by_id_handler,
+    "admin_revoke_access_by_id": admin_revoke_access_by_id_handler,
+    "admin_management": admin_management_handler,
+    "admin_add_admin": admin_add_admin_handler,
+    "admin_remove_admin": admin_remove_admin_handler,
+    "admin_activity": admin_activity_handler,
+    "admin_activity_by_chats": admin_activity_by_chats_handler,
+    "admin_refresh": admin_refresh_handler,
+    "admin_broadcast": admin_broadcast_handler,
+    "admin_check_subscriptions": admin_check_subscriptions_handler,
+    "admin_send_to_group": admin_send_to_group_handler,
+}
+
+# Маршруты для callback_data с параметрами (по префиксу)
+CALLBACK_PREFIX_ROUTES = (
+    ("admin_users_", admin_users_handler),
+    ("admin_chat_activity_", admin_chat_activity_handler),
+)
+
+
+async def admin_callback_dispatcher(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Направляет админский callback в нужный обработчик по таблице маршрутов."""
+    data = update.callback_query.data
+    
+    handler = CALLBACK_ROUTES.get(data)
+    if handler is None:
+        for prefix, prefix_handler in CALLBACK_PREFIX_ROUTES:
+            if data.startswith(prefix):
+                handler = prefix_handler
+                break
+    
+    if handler is None:
+        logger.warning(f"Неизвестный админский callback: {data}")
+        return
+    
+    await handler(update, context)
+
+
+# Обработчики текстового ввода в личных сообщениях по состоянию awaiting_input
+PRIVATE_INPUT_ROUTES = {
+    AdminState.AWAIT_ADD_ADMIN_ID: handle_add_admin_id_input,
+    AdminState.AWAIT_REMOVE_ADMIN_ID: handle_remove_admin_id_input,
+    AdminState.AWAIT_GRANT_USER_ID: handle_user_id_input,
+    AdminState.AWAIT_REVOKE_USER_ID: handle_revoke_user_id_input,
+    AdminState.AWAIT_GROUP_MESSAGE: handle_group_message_input,
+}
+
+
+async def private_text_dispatcher(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Направляет текст из личных сообщений в обработчик ожидаемого ввода."""
+    handler = PRIVATE_INPUT_ROUTES.get(context.user_data.get("awaiting_input"))
+    if handler is not None:
+        await handler(update, context)
+        return
+    
+    # Ничего не ожидаем - отвечаем как на /start, но только в личном чате
+    if update.effective_chat and update.effective_chat.type == "private":
+        await start_handler(update, context)
+
+
+# Группа обработчика, закрывающего сессию БД обновления (должна быть последней)
+REQUEST_SESSION_GROUP = 1000
+
+
 def register_handlers(application: Application) -> None:
     """Регистрация всех обработчиков."""
     try:
+        # Общие экземпляры сервисов для обработчиков и декораторов
+        application.bot_data["telegram_service"] = TelegramService(application.bot)
+        application.bot_data["group_service"] = GroupManagementService(application.bot)
+        
         # Команды
         application.add_handler(CommandHandler("start", start_handler))
         application.add_handler(CommandHandler("admin", admin_dashboard_handler))
@@ -56,50 +150,24 @@ def register_handlers(application: Application) -> None:
         application.add_handler(CallbackQueryHandler(ritual_handler, pattern="^ritual_[^s]"))
         application.add_handler(CallbackQueryHandler(goal_handler, pattern="^goal"))
         
-        # Админ-панель callback queries
-        application.add_handler(CallbackQueryHandler(admin_dashboard_handler, pattern="^admin_dashboard"))
-        application.add_handler(CallbackQueryHandler(admin_users_handler, pattern="^admin_users.*"))
-        application.add_handler(CallbackQueryHandler(admin_access_handler, pattern="^admin_access"))
-        application.add_handler(CallbackQueryHandler(admin_give_access_all_handler, pattern="^admin_give_access_all"))
-        application.add_handler(CallbackQueryHandler(admin_give_access_by_id_handler, pattern="^admin_give_access_by_id"))
-        application.add_handler(CallbackQueryHandler(admin_revoke_access_by_id_handler, pattern="^admin_revoke_access_by_id"))
-        application.add_handler(CallbackQueryHandler(admin_management_handler, pattern="^admin_management"))
-        application.add_handler(CallbackQueryHandler(admin_add_admin_handler, pattern="^admin_add_admin"))
-        application.add_handler(CallbackQueryHandler(admin_remove_admin_handler, pattern="^admin_remove_admin"))
-        application.add_handler(CallbackQueryHandler(admin_activity_handler, pattern="^admin_activity"))
-        application.add_handler(CallbackQueryHandler(admin_activity_by_chats_handler, pattern="^admin_activity_by_chats"))
-        application.add_handler(CallbackQueryHandler(admin_chat_activity_handler, pattern="^admin_chat_activity_"))
-        application.add_handler(CallbackQueryHandler(admin_refresh_handler, pattern="^admin_refresh"))
-        application.add_handler(CallbackQueryHandler(admin_broadcast_handler, pattern="^admin_broadcast"))
-        application.add_handler(CallbackQueryHandler(admin_check_subscriptions_handler, pattern="^admin_check_subscriptions"))
-        application.add_handler(CallbackQueryHandler(admin_send_to_group_handler, pattern="^admin_send_to_group"))
+        # Админ-панель callback queries (один обработчик с таблицей маршрутов)
+        application.add_handler(CallbackQueryHandler(admin_callback_dispatcher, pattern="^admin_"))
         
         # Обработчики активности в группе (должны быть ПЕРВЫМИ!)
         application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, group_member_handler_func))
         application.add_handler(MessageHandler(filters.StatusUpdate.LEFT_CHAT_MEMBER, group_left_member_handler_func))
         
         # Сообщения из группы (для отслеживания активности)
-        from config.settings import get_settings
-        settings = get_settings()
-        if settings.GROUP_ID:
+        if GROUP_FILTER is not None:
             # Обработчик ВСЕХ типов сообщений ТОЛЬКО для нашей группы
-            group_filter = filters.Chat(chat_id=int(settings.GROUP_ID)) & ~filters.COMMAND
-            application.add_handler(MessageHandler(group_filter, group_message_handler_func))
-        
-        # Личные сообщения пользователей (работают всегда)
-        # ВАЖНО: Порядок имеет значение! Сначала обрабатываем админские команды, потом общие
-        
-        # Админские обработчики ввода ID (только для личных сообщений)
-        from config.settings import get_settings
-        settings = get_settings()
+            application.add_handler(MessageHandler(GROUP_FILTER, group_message_handler_func))
         
-        # Фильтр для личных сообщений (не групповых)
-        private_filter = filters.TEXT & ~filters.COMMAND & ~filters.Chat(chat_id=int(settings.GROUP_ID)) if settings.GROUP_ID else filters.TEXT & ~filters.COMMAND
+        # Личные сообщения пользователей (работают всегда):
+        # ввод ID/текста для админки или ответ как на /start
+        application.add_handler(MessageHandler(PRIVATE_FILTER, private_text_dispatcher))
         
-        application.add_handler(MessageHandler(private_filter, handle_admin_id_input))
-        application.add_handler(MessageHandler(private_filter, handle_user_id_input))
-        application.add_handler(MessageHandler(private_filter, handle_group_message_input))
-        application.add_handler(MessageHandler(private_filter, start_handler))
+        # Фиксация и закрытие общей сессии БД - после всех остальных групп
+        application.add_handler(TypeHandler(Update, close_request_session), group=REQUEST_SESSION_GROUP)
         
         logger.info("✅ Все обработчики зарегистрированы")
         
@@ -116,6 +184,6 @@ __all__ = [
     "report_handler",
     "ritual_handler",
     "goal_handler",
-    "admin_handler",
+    "admin_dashboard_handler",
     "group_info_handler"
 ]
@@ -2,20 +2,666 @@
 Админ-панель для мониторинга активности в канале.
 """
 
+import asyncio
+import re
+import time
+from collections import defaultdict
+from enum import Enum
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import ContextTypes
 from loguru import logger
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 
-from app.core.database import get_db_session
+from app.core.database import get_db_session_readonly
 from app.services.user_service import UserService
 from app.services.payment_service import PaymentService
 from app.services.activity_service import ActivityService
-from app.services.telegram_service import TelegramService
-from app.services.group_management_service import GroupManagementService
+from app.services.admin_service import AdminService
+from app.models.user import UserStatus
+from app.schemas.user import UserCreate
+from app.bot.decorators import invalidate_user_cache, get_group_service, request_session
 from config.settings import get_settings
 
 
+# Настройки, которые читаются один раз при импорте, а не в каждом обработчике
+_SETTINGS = get_settings()
+# ID администраторов: проверка прав без чтения настроек на каждое нажатие
+_ADMIN_IDS: FrozenSet[int] = _SETTINGS.admin_ids_set
+_SUPER_ADMIN_ID: int = _SETTINGS.SUPER_ADMIN_ID
+# ID основной группы клуба (в настройках хранится строкой)
+_GROUP_ID: int = int(_SETTINGS.GROUP_ID)
+# Чаты для аналитики и их названия (свойства настроек собирают их заново при каждом обращении)
+_ALL_CHAT_IDS: Tuple[str, ...] = tuple(_SETTINGS.all_chat_ids)
+_CHAT_NAMES: Dict[str, str] = _SETTINGS.chat_names
+
+
+class AdminState(str, Enum):
+    """Ожидаемый от администратора текстовый ввод (context.user_data['awaiting_input'])."""
+    AWAIT_GRANT_USER_ID = "user_id"
+    AWAIT_REVOKE_USER_ID = "revoke_user_id"
+    AWAIT_ADD_ADMIN_ID = "add_admin_id"
+    AWAIT_REMOVE_ADMIN_ID = "remove_admin_id"
+    AWAIT_GROUP_MESSAGE = "group_message"
+
+
+# Один экземпляр на процесс: сервис кэширует список администраторов
+_admin_service = AdminService()
+
+
+def _refresh_admin_ids() -> None:
+    """Перечитывает список администраторов из настроек (после добавления или удаления)."""
+    global _ADMIN_IDS
+    _ADMIN_IDS = get_settings().admin_ids_set
+
+
+# Кэш статистики админ-панели: ключ -> (время сохранения, значение)
+STATS_CACHE_TTL = 60
+# "Обновить" пересчитывает статистику, только если она старше этого возраста (сек)
+REFRESH_MIN_AGE = 5
+_STATS_CACHE: Dict[str, Tuple[float, Any]] = {}
+_STATS_LOCKS: Dict[str, asyncio.Lock] = {}
+# Когда кэш статистики последний раз очищался от устаревших записей
+_stats_purged_at = 0.0
+
+# Сколько раз пытаться отправить сообщение, если Telegram просит подождать (RetryAfter)
+SEND_ATTEMPTS = 3
+# Сколько уведомлений о выдаче доступа отправляется одновременно (лимит бота ~30 сообщений/с)
+NOTIFY_CONCURRENCY = 25
+
+# Очередь сообщений в группу: (чат администратора, имя администратора, текст).
+# Отправка идет в фоне, чтобы ожидание лимитов Telegram не держало обработку обновлений
+_GROUP_SEND_QUEUE: "asyncio.Queue[Tuple[int, str, str]]" = asyncio.Queue()
+_group_send_task: Optional[asyncio.Task] = None
+
+# Списки пользователей меняются заметнее счетчиков, поэтому живут в кэше меньше
+USER_LISTS_CACHE_TTL = 20
+
+# Ключи статистики, зависящие от данных пользователей ("*" в конце - префикс ключа)
+_USER_STATS_KEYS = ("user_counts", "users_page:*", "pending_users")
+
+
+def _is_fresh(key: str, ttl: float) -> bool:
+    """Есть ли в кэше значение, сохраненное не раньше ttl секунд назад."""
+    entry = _STATS_CACHE.get(key)
+    return entry is not None and time.monotonic() - entry[0] < ttl
+
+
+async def _cached(
+    key: str,
+    ttl: float,
+    coro_factory: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Возвращает значение статистики из кэша или вычисляет и сохраняет его.
+    
+    Для каждого ключа используется свой замок, чтобы при истечении TTL
+    запрос в БД выполнял только один обработчик. Кнопка "Обновить" передает
+    короткий TTL, поэтому повторные нажатия подряд не идут в БД.
+    """
+    if _is_fresh(key, ttl):
+        return _STATS_CACHE[key][1]
+    
+    lock = _STATS_LOCKS.get(key)
+    if lock is None:
+        lock = _STATS_LOCKS[key] = asyncio.Lock()
+    async with lock:
+        if _is_fresh(key, ttl):
+            return _STATS_CACHE[key][1]
+        
+        value = await coro_factory()
+        _store_stats(key, value)
+        return value
+
+
+async def _session_call(factory: Callable[[Any], Awaitable[Any]]) -> Any:
+    """
+    Выполняет запрос на чтение в отдельной сессии БД.
+    
+    Одну AsyncSession нельзя использовать из нескольких задач одновременно,
+    поэтому для параллельных запросов каждая задача берет свою сессию из пула.
+    Сессия только для чтения: без BEGIN/COMMIT вокруг запросов статистики.
+    """
+    async with get_db_session_readonly() as session:
+        return await factory(session)
+
+
+def _cached_query(
+    key: str,
+    factory: Callable[[Any], Awaitable[Any]],
+    ttl: float = STATS_CACHE_TTL
+) -> Awaitable[Any]:
+    """Кэшированный запрос статистики в отдельной сессии."""
+    return _cached(key, ttl, lambda: _session_call(factory))
+
+
+@lru_cache(maxsize=8)
+def _fmt_date(day: date) -> str:
+    """Дата в формате ДД.ММ.ГГГГ; одни и те же дни форматируются один раз."""
+    return day.strftime('%d.%m.%Y')
+
+
+def _fmt_period(start: date, end: date) -> str:
+    """Период "ДД.ММ.ГГГГ - ДД.ММ.ГГГГ" для заголовков статистики."""
+    return f"{_fmt_date(start)} - {_fmt_date(end)}"
+
+
+def _local_time(utc_now: datetime) -> datetime:
+    """Переводит наивное UTC-время в локальное время сервера для отображения."""
+    return utc_now.replace(tzinfo=timezone.utc).astimezone()
+
+
+def _purge_stats(now: float) -> None:
+    """
+    Удаляет записи старше STATS_CACHE_TTL (самого длинного TTL кэша)
+    и свободные замки ключей, которых больше нет в кэше.
+    
+    Выполняется не чаще раза в STATS_CACHE_TTL.
+    """
+    global _stats_purged_at
+    if now - _stats_purged_at < STATS_CACHE_TTL:
+        return
+    
+    _stats_purged_at = now
+    for key in [k for k, (stored_at, _) in _STATS_CACHE.items() if now - stored_at >= STATS_CACHE_TTL]:
+        del _STATS_CACHE[key]
+    for key in [k for k, lock in _STATS_LOCKS.items() if k not in _STATS_CACHE and not lock.locked()]:
+        del _STATS_LOCKS[key]
+
+
+def _store_stats(key: str, value: Any) -> None:
+    """Сохраняет в кэш статистику (в том числе полученную попутно другим запросом)."""
+    now = time.monotonic()
+    _purge_stats(now)
+    _STATS_CACHE[key] = (now, value)
+
+
+def _invalidate_stats(*keys: str) -> None:
+    """
+    Сбрасывает закэшированную статистику (после изменения данных).
+    
+    Ключ со звездочкой в конце сбрасывает все ключи с таким префиксом
+    (например, страницы пользователей по всем курсорам). Свободные замки
+    сброшенных ключей удаляются вместе с записями.
+    """
+    for key in keys:
+        if key.endswith("*"):
+            prefix = key[:-1]
+            dropped = [k for k in _STATS_CACHE if k.startswith(prefix)]
+        else:
+            dropped = [key]
+        
+        for cached_key in dropped:
+            _STATS_CACHE.pop(cached_key, None)
+            lock = _STATS_LOCKS.get(cached_key)
+            if lock is not None and not lock.locked():
+                del _STATS_LOCKS[cached_key]
+
+
+# Telegram ID во вводе администратора: только цифры, пробелы по краям допускаются
+_TG_ID_RE = re.compile(r"^\s*([0-9]{5,15})\s*$")
+
+
+def _parse_telegram_id(text: Optional[str]) -> Optional[int]:
+    """Разбирает введенный Telegram ID; None если ввод не похож на ID."""
+    match = _TG_ID_RE.match(text or "")
+    return int(match.group(1)) if match else None
+
+
+async def _read_id_input(update: Update, subject: str = "пользователя") -> Optional[int]:
+    """
+    Разбирает ID из сообщения администратора, на неверный ввод отвечает подсказкой.
+    
+    Args:
+        update: Обновление с текстом администратора
+        subject: Чей ID ожидается (для текста подсказки)
+        
+    Returns:
+        Optional[int]: Telegram ID или None, если формат неверный
+    """
+    telegram_id = _parse_telegram_id(update.message.text)
+    if telegram_id is None:
+        await update.message.reply_text(
+            f"❌ Неверный формат ID. Введите числовой ID {subject}.\n\n"
+            "Пример: <code>123456789</code>",
+            parse_mode='HTML'
+        )
+    return telegram_id
+
+
+# Номер страницы в callback_data списка пользователей
+_USERS_PAGE_RE = re.compile(r"admin_users_page_([0-9]{1,4})")
+
+
+# Защита от быстрых повторных нажатий: user_id -> (callback_data, время нажатия).
+# Хранится только последнее нажатие пользователя, поэтому словарь не растет
+# с каждой новой кнопкой (например, страницами списка пользователей)
+CLICK_DEBOUNCE_SECONDS = 1.0
+_LAST_CLICK: Dict[int, Tuple[str, float]] = {}
+
+
+async def _debounce_callback(query) -> bool:
+    """
+    Проверяет, не повторное ли это нажатие той же кнопки в течение секунды.
+    
+    На повторное нажатие сразу отвечаем, чтобы Telegram не ждал ответа.
+    
+    Returns:
+        bool: True если нажатие нужно проигнорировать
+    """
+    user_id = query.from_user.id
+    now = time.monotonic()
+    last_data, last_time = _LAST_CLICK.get(user_id, (None, 0.0))
+    if last_data == query.data and now - last_time < CLICK_DEBOUNCE_SECONDS:
+        await safe_answer_callback(query, "⏳ Подождите…")
+        return True
+    
+    _LAST_CLICK[user_id] = (query.data, now)
+    return False
+
+
+# Шаблоны сообщений админ-панели: статичный текст собирается один раз,
+# при отрисовке подставляются только значения
+_DASHBOARD_TMPL = """
+📊 <b>Админ-панель ОСНОВА ПУТИ</b>
+
+👥 <b>Пользователи:</b>
+• Всего: {total}
+• Активных: {active}
+• Premium: {premium}
+• Новых за 24ч: {new}
+
+💳 <b>Платежи:</b>
+• Всего: {payments_total}
+• Успешных: {payments_successful}
+
+⚡ <b>Активность:</b>
+• Активных за 24ч: {active_today}
+
+📅 Обновлено: {updated_at}
+""".format_map
+
+_USERS_TMPL = """👥 <b>Управление пользователями</b>
+
+📊 <b>Статистика:</b>
+• Всего: {total}
+• Активных: {active}
+• Premium: {premium}
+
+📋 <b>Список пользователей (стр. {page}):</b>
+""".format_map
+
+# Значки строки пользователя: по статусу и по флагам (индекс - bool флага)
+_STATUS_EMOJI = {UserStatus.ACTIVE: "✅"}.get
+_PREMIUM_EMOJI = ("🔓", "💎")
+_CHANNEL_EMOJI = ("❌", "📢")
+
+_USER_ROW_TMPL = "{i}. {status_emoji} {premium_emoji} {channel_emoji} <b>{first_name}</b>{username}\n   ID: {telegram_id}\n   Статус: {status}\n{subscription}   Добавлен: {created_at}\n\n".format_map
+
+_ACCESS_TMPL = """🔑 <b>Управление доступом</b>
+
+📊 <b>Статистика:</b>
+• Всего пользователей: {total}
+• С активным доступом: {active}
+• Premium пользователей: {premium}
+
+👥 <b>Пользователи без доступа ({pending_total}):</b>
+""".format_map
+
+_PENDING_ROW_TMPL = "\n{channel_emoji} <b>{first_name}</b>{username}\nID: {telegram_id} | Добавлен: {created_at}".format_map
+
+_ACTIVITY_TMPL = """📈 <b>Общая активность по всем чатам</b>
+
+📅 <b>Сегодня ({today}):</b>
+• Сообщений: {today_messages}
+• Активных пользователей: {today_users}
+
+📅 <b>Вчера ({yesterday}):</b>
+• Сообщений: {yesterday_messages}
+• Активных пользователей: {yesterday_users}
+
+📊 <b>За неделю (общая статистика):</b>
+• Всего сообщений: {total_messages}
+• Уникальных пользователей: {unique_users}
+• Активных чатов: {active_chats}
+
+🎯 <b>Типы сообщений за неделю:</b>
+• 💬 Текст: {message}
+• 🎤 Голосовые: {voice}
+• 📹 Видеосообщения: {video_note}
+• 🖼️ Фото: {photo}
+• 🎬 Видео: {video}
+• 🎵 Аудио: {audio}
+• 📄 Документы: {document}
+• 😀 Стикеры: {sticker}
+• 🎞️ GIF: {animation}
+
+👥 <b>Все пользователи за неделю (по активности):</b>
+""".format_map
+
+_ACTIVITY_ROW_TMPL = "{i}. {first_name} {username} - {count} сообщений\n".format_map
+
+# Типы сообщений, выводимые в статистике активности: (подпись, тип)
+_MSG_TYPE_ROWS = (
+    ("💬 Текст", "message"),
+    ("🎤 Голосовые", "voice"),
+    ("📹 Видеосообщения", "video_note"),
+    ("🖼️ Фото", "photo"),
+    ("🎬 Видео", "video"),
+    ("🎵 Аудио", "audio"),
+    ("📄 Документы", "document"),
+    ("😀 Стикеры", "sticker"),
+    ("🎞️ GIF", "animation")
+)
+_ACTIVITY_MESSAGE_TYPES = tuple(message_type for _, message_type in _MSG_TYPE_ROWS)
+
+_CHATS_HEADER_TMPL = """📈 <b>Активность по чатам</b>
+
+📅 <b>Период: {period}</b>
+
+""".format_map
+
+_CHAT_SUMMARY_TMPL = """💬 <b>{chat_name}</b>
+• Сообщений: {total_messages}
+• Пользователей: {unique_users}
+• Топ типы: Текст({message}), Фото({photo}), Голос({voice})
+
+""".format_map
+
+# Строки типов сообщений собираются из _MSG_TYPE_ROWS; счетчики подставляются по типу
+_CHAT_ACTIVITY_TMPL = ("""📈 <b>Активность в чате: {chat_name}</b>
+
+📅 <b>Период: {period}</b>
+
+📊 <b>Общая статистика:</b>
+• Всего сообщений: {total_messages}
+• Уникальных пользователей: {unique_users}
+
+🎯 <b>Типы сообщений:</b>
+""" + "".join(f"• {label}: {{{message_type}}}\n" for label, message_type in _MSG_TYPE_ROWS) + """
+👥 <b>Активные пользователи:</b>
+""").format_map
+
+# Статичные тексты экранов и шаблоны ответов на ввод ID
+_BROADCAST_TEXT = """📢 <b>Рассылка сообщений</b>
+
+Выберите тип рассылки:
+
+• Всем пользователям
+• Только активным
+• Только premium
+• По статусу подписки
+"""
+
+_GRANT_BY_ID_TEXT = """👤 <b>Выдача доступа по ID</b>
+
+Введите Telegram ID пользователя, которому нужно выдать доступ.
+
+<b>Пример:</b> <code>123456789</code>
+
+💡 <b>Как найти ID:</b>
+• Попросите пользователя написать боту @userinfobot
+• Или используйте команду /start и посмотрите в логах бота
+
+Для отмены нажмите "Назад к панели"."""
+
+_REVOKE_BY_ID_TEXT = """❌ <b>Отмена доступа по ID</b>
+
+Введите Telegram ID пользователя, у которого нужно отменить доступ.
+
+<b>Пример:</b> <code>123456789</code>
+
+💡 <b>Как найти ID:</b>
+• Посмотрите в админ-панели в разделе "Пользователи"
+• Или используйте команду /start и посмотрите в логах бота
+
+Для отмены нажмите "Назад к панели"."""
+
+_ADD_ADMIN_TEXT = """➕ <b>Добавление администратора</b>
+
+Введите Telegram ID пользователя, которого нужно сделать администратором.
+
+<b>Пример:</b> <code>123456789</code>
+
+💡 <b>Как найти ID:</b>
+• Попросите пользователя написать боту /start
+• Посмотрите в логах бота или в админ-панели
+
+Для отмены нажмите "Назад к управлению"."""
+
+_REMOVE_ADMIN_TEXT = """➖ <b>Удаление администратора</b>
+
+Введите Telegram ID администратора, которого нужно удалить.
+
+<b>Пример:</b> <code>123456789</code>
+
+⚠️ <b>Внимание:</b>
+• Супер-администратора удалить нельзя
+• Удаленный пользователь потеряет доступ к админ-панели
+
+Для отмены нажмите "Назад к управлению"."""
+
+_GRANT_DONE_TMPL = """✅ <b>Доступ выдан успешно!</b>
+
+👤 <b>Пользователь:</b> {first_name}{username}
+🆔 <b>ID:</b> <code>{telegram_id}</code>
+📅 <b>Подписка до:</b> {subscription_until}
+
+{result}
+
+Пользователь теперь имеет доступ к функциям клуба.""".format_map
+
+_REVOKE_DONE_TMPL = """✅ <b>Доступ отменен успешно!</b>
+
+👤 <b>Пользователь:</b> {first_name}
+🆔 <b>ID:</b> <code>{telegram_id}</code>
+📅 <b>Статус:</b> pending (доступ отменен)
+
+Пользователь больше не имеет доступ к функциям клуба.""".format_map
+
+_GRANT_ALL_DONE_TMPL = """✅ <b>Доступ выдан успешно!</b>
+
+👥 Обработано пользователей: {updated_count}
+📅 Подписка до: {subscription_until}
+
+Все пользователи теперь имеют доступ к функциям клуба и получат уведомление.
+""".format_map
+
+_ACCESS_GRANTED_NOTICE_TMPL = """🎉 <b>Доступ к клубу «ОСНОВА ПУТИ» открыт!</b>
+
+📅 Подписка действует до {subscription_until}.
+
+Нажмите /start, чтобы начать.""".format_map
+
+_ADMIN_ADDED_TMPL = """✅ <b>Администратор добавлен успешно!</b>
+
+👤 <b>ID:</b> <code>{admin_id}</code>
+📅 <b>Время:</b> {time}
+
+{message}
+
+✅ <b>Изменения применены мгновенно!</b>
+• Новый администратор получил доступ к админ-панели""".format_map
+
+_ADMIN_REMOVED_TMPL = """✅ <b>Администратор удален успешно!</b>
+
+👤 <b>ID:</b> <code>{admin_id}</code>
+📅 <b>Время:</b> {time}
+
+{message}
+
+✅ <b>Изменения применены мгновенно!</b>
+• Пользователь потерял доступ к админ-панели""".format_map
+
+_SUBSCRIPTION_REPORT_TMPL = """✅ <b>Проверка подписок завершена!</b>
+
+📊 <b>Результаты:</b>
+• 👥 Проверено участников: {total_checked}
+• ⚠️ Отправлено предупреждений: {warnings_sent}
+• ❌ Не удалось отправить: {warnings_failed}
+• 🚫 Исключено пользователей: {kicked_users}
+• 🔧 Ошибок: {errors}
+
+📋 <b>Детали:</b>{details}
+
+⏰ <b>Следующая проверка:</b> через 30 минут
+🔄 <b>Автоматическая проверка:</b> каждые 30 минут
+
+💡 <b>Важно:</b>
+• Пользователи получат 3 дня на оплату
+• Исключение произойдет автоматически
+• Можно добавить обратно через админ-панель
+
+📝 <b>Примечание:</b>
+• "Не удалось отправить" = пользователь не начинал диалог с ботом
+• Это нормальное поведение Telegram API
+• Пользователь все равно будет исключен через 3 дня""".format_map
+
+_GROUP_SENT_TMPL = """✅ <b>Сообщение отправлено в группу!</b>
+
+📝 <b>Текст:</b>
+{message_text}
+
+👤 <b>Отправил:</b> {admin_name}
+📅 <b>Время:</b> {time}
+
+Сообщение успешно доставлено всем участникам группы.""".format_map
+
+_GROUP_SEND_FAILED_TMPL = """❌ <b>Ошибка отправки сообщения</b>
+
+Не удалось отправить сообщение в группу.
+
+<b>Возможные причины:</b>
+• Бот не является администратором группы
+• Неверный ID группы
+• Техническая ошибка
+
+<b>Ошибка:</b> {error}""".format_map
+
+# Статичные клавиатуры админ-панели: кнопки не зависят от запроса, собираются один раз
+_DASHBOARD_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👥 Пользователи", callback_data="admin_users")],
+    [InlineKeyboardButton("🔑 Выдача доступа", callback_data="admin_access")],
+    [InlineKeyboardButton("👑 Управление админами", callback_data="admin_management")],
+    [InlineKeyboardButton("🚫 Проверить подписки", callback_data="admin_check_subscriptions")],
+    [InlineKeyboardButton("📈 Активность", callback_data="admin_activity")],
+    [InlineKeyboardButton("📤 Отправить в группу", callback_data="admin_send_to_group")],
+    [InlineKeyboardButton("📢 Рассылка", callback_data="admin_broadcast")],
+    [InlineKeyboardButton("🔄 Обновить", callback_data="admin_refresh")]
+])
+
+_ACCESS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ Выдать доступ всем", callback_data="admin_give_access_all")],
+    [InlineKeyboardButton("👤 Выдать доступ по ID", callback_data="admin_give_access_by_id")],
+    [InlineKeyboardButton("❌ Отменить доступ по ID", callback_data="admin_revoke_access_by_id")],
+    [InlineKeyboardButton("🔄 Обновить", callback_data="admin_access")],
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
+])
+
+_GRANT_ALL_DONE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 К управлению доступом", callback_data="admin_access")],
+    [InlineKeyboardButton("🔙 К админ-панели", callback_data="admin_dashboard")]
+])
+
+_BACK_TO_DASHBOARD_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
+])
+
+_ACTIVITY_BY_CHATS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Общая статистика", callback_data="admin_activity")],
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
+])
+
+_CHAT_ACTIVITY_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Общая статистика", callback_data="admin_activity")],
+    [InlineKeyboardButton("📋 По всем чатам", callback_data="admin_activity_by_chats")],
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
+])
+
+_BROADCAST_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👥 Всем пользователям", callback_data="broadcast_all")],
+    [InlineKeyboardButton("✅ Только активным", callback_data="broadcast_active")],
+    [InlineKeyboardButton("💎 Только premium", callback_data="broadcast_premium")],
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
+])
+
+_REVOKE_ACCESS_BY_ID_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_access")]
+])
+
+_MANAGEMENT_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Добавить админа", callback_data="admin_add_admin")],
+    [InlineKeyboardButton("➖ Удалить админа", callback_data="admin_remove_admin")],
+    [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
+])
+
+_BACK_TO_MANAGEMENT_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Назад к управлению", callback_data="admin_management")]
+])
+
+_CHECK_SUBSCRIPTIONS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Проверить еще раз", callback_data="admin_check_subscriptions")],
+    [InlineKeyboardButton("🔙 Назад", callback_data="admin_back")]
+])
+
+# Максимальная длина названия чата на кнопке
+CHAT_BUTTON_MAX_LENGTH = 20
+
+
+def _shorten(text: str, width: int) -> str:
+    """Обрезает текст до width символов, заменяя хвост многоточием."""
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+@lru_cache(maxsize=1)
+def _activity_keyboard() -> InlineKeyboardMarkup:
+    """
+    Клавиатура экрана активности с кнопкой для каждого чата.
+    
+    Список чатов задается при импорте, поэтому клавиатура собирается один раз.
+    """
+    # Кнопка "По чатам" (общая статистика по всем чатам)
+    keyboard_buttons = [[InlineKeyboardButton("📊 По чатам", callback_data="admin_activity_by_chats")]]
+    
+    # Кнопки для каждого чата
+    for chat_id in _ALL_CHAT_IDS:
+        button_text = _shorten(_CHAT_NAMES.get(chat_id, f"Чат {chat_id}"), CHAT_BUTTON_MAX_LENGTH)
+        keyboard_buttons.append([InlineKeyboardButton(f"💬 {button_text}", callback_data=f"admin_chat_activity_{chat_id}")])
+    
+    # Кнопка "Назад"
+    keyboard_buttons.append([InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")])
+    
+    return InlineKeyboardMarkup(keyboard_buttons)
+
+def _fmt_user_row(i: int, user) -> str:
+    """Блок одного пользователя в списке "Пользователи"."""
+    return _USER_ROW_TMPL({
+        "i": i,
+        "status_emoji": _STATUS_EMOJI(user.status, "⏳"),
+        "premium_emoji": _PREMIUM_EMOJI[bool(user.is_premium)],
+        "channel_emoji": _CHANNEL_EMOJI[bool(user.is_subscribed_to_channel)],
+        "first_name": user.first_name,
+        "username": f" (@{user.username})" if user.username else "",
+        "telegram_id": user.telegram_id,
+        "status": user.status,
+        "subscription": (
+            f"   Подписка до: {_fmt_date(user.subscription_until.date())}\n"
+            if user.subscription_until else ""
+        ),
+        "created_at": user.created_at.strftime('%d.%m.%Y %H:%M')
+    })
+
+
+# Постоянные строки клавиатуры списка пользователей (под кнопками пагинации)
+_USERS_ACTION_ROWS = (
+    (InlineKeyboardButton("🔄 Обновить", callback_data="admin_users"),),
+    (InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard"),)
+)
+
+
 async def safe_answer_callback(query, text: str = None) -> bool:
     """
     Безопасный ответ на callback query с обработкой устаревших запросов.
@@ -39,81 +685,208 @@ async def safe_answer_callback(query, text: str = None) -> bool:
             return False
 
 
-async def admin_dashboard_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Обработчик команды /admin - админ-панель."""
+def _answer_in_background(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str = None) -> None:
+    """
+    Отвечает на нажатие кнопки фоновой задачей, не дожидаясь ответа Telegram.
+    
+    Ответ идет параллельно с запросами в БД и правкой сообщения;
+    ошибки логирует сама safe_answer_callback.
+    
+    Args:
+        update: Обновление с callback query
+        context: Контекст бота
+        text: Текст для ответа (опционально)
+    """
+    context.application.create_task(safe_answer_callback(update.callback_query, text), update=update)
+
+
+async def _edit_view(
+    query,
+    context: ContextTypes.DEFAULT_TYPE,
+    view_key: str,
+    text: str,
+    keyboard: InlineKeyboardMarkup
+) -> None:
+    """
+    Обновляет сообщение экрана, отправляя в Telegram только то, что изменилось.
+    
+    Последний показанный вариант экрана хранится в context.user_data[view_key].
+    Он считается актуальным, только если сообщение то же и на нем все еще наша
+    клавиатура (то есть его не перерисовал другой экран). Тогда при том же тексте
+    меняется только клавиатура (edit_message_reply_markup) или ничего.
+    """
+    message = query.message
+    last = context.user_data.get(view_key)
+    same_view = (
+        last is not None and message is not None
+        and last[0] == message.message_id and last[2] == message.reply_markup
+    )
+    
     try:
-        settings = get_settings()
-        user_id = update.effective_user.id
-        
-        # Проверяем, является ли пользователь админом
-        if user_id not in settings.admin_ids_list:
-            # Проверяем, есть ли message (команда) или это callback query
-            if update.message:
-                await update.message.reply_text("❌ У вас нет прав администратора.")
-            elif update.callback_query:
-                await update.callback_query.answer("❌ У вас нет прав администратора.")
-            return
-        
-        # Получаем статистику
-        async with get_db_session() as session:
-            user_service = UserService(session)
-            payment_service = PaymentService(session)
-            activity_service = ActivityService(session)
-            
-            # Общая статистика пользователей
-            total_users = await user_service.get_total_users_count()
-            active_users = await user_service.get_active_users_count()
-            premium_users = await user_service.get_premium_users_count()
-            
-            # Статистика за последние 24 часа
-            yesterday = datetime.utcnow() - timedelta(days=1)
-            new_users_today = await user_service.get_new_users_count_since(yesterday)
-            
-            # Статистика платежей
-            total_payments = await payment_service.get_total_payments_count()
-            successful_payments = await payment_service.get_successful_payments_count()
-            
-            # Статистика активности
-            active_today = await activity_service.get_active_users_count_since(yesterday)
+        if same_view and last[1] == text:
+            if last[2] != keyboard:
+                await query.edit_message_reply_markup(reply_markup=keyboard)
+        else:
+            await query.edit_message_text(text, reply_markup=keyboard, parse_mode='HTML')
+    except BadRequest as e:
+        if "Message is not modified" not in str(e):
+            raise
+    
+    if message is not None:
+        context.user_data[view_key] = (message.message_id, text, keyboard)
+
+
+def admin_only(super_only: bool = False):
+    """
+    Декоратор: пропускает к обработчику только администраторов.
+    
+    Проверка выполняется до любой работы обработчика (в том числе до открытия
+    сессии БД); остальным отвечаем отказом на нажатие кнопки или на сообщение.
+    На отказ в ответ на сообщение сбрасывается ожидание ввода админ-панели.
+    
+    Args:
+        super_only: Пропускать только супер-администратора
+    """
+    denied_text = (
+        "❌ Только супер-администратор может управлять администраторами."
+        if super_only else "❌ У вас нет прав администратора."
+    )
+    
+    def decorator(handler: Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]):
+        @wraps(handler)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            user = update.effective_user
+            if user is None:
+                allowed = False
+            elif super_only:
+                allowed = user.id == _SUPER_ADMIN_ID
+            else:
+                allowed = user.id in _ADMIN_IDS
+            
+            if not allowed:
+                if update.callback_query:
+                    await safe_answer_callback(update.callback_query, denied_text)
+                elif update.message:
+                    await update.message.reply_text(denied_text)
+                    if context.user_data is not None:
+                        context.user_data.pop('awaiting_input', None)
+                return
             
-            # Создаем сообщение с статистикой
-            message = f"""
-📊 <b>Админ-панель ОСНОВА ПУТИ</b>
+            return await handler(update, context)
+        
+        return wrapper
+    
+    return decorator
 
-👥 <b>Пользователи:</b>
-• Всего: {total_users}
-• Активных: {active_users}
-• Premium: {premium_users}
-• Новых за 24ч: {new_users_today}
 
-💳 <b>Платежи:</b>
-• Всего: {total_payments}
-• Успешных: {successful_payments}
+def _chat_stats_key(chat_id: str) -> str:
+    """
+    Ключ кэша статистики одного чата за последнюю неделю.
+    
+    Период в ключ не входит: он у всех вызовов один (последние 7 дней),
+    а при смене даты запись устаревает сама за STATS_CACHE_TTL.
+    """
+    return f"chat_stats:{chat_id}"
 
-⚡ <b>Активность:</b>
-• Активных за 24ч: {active_today}
 
-📅 Обновлено: {datetime.now().strftime('%d.%m.%Y %H:%M')}
-"""
-            
-            # Создаем клавиатуру
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("👥 Пользователи", callback_data="admin_users")],
-                [InlineKeyboardButton("🔑 Выдача доступа", callback_data="admin_access")],
-                [InlineKeyboardButton("👑 Управление админами", callback_data="admin_management")],
-                [InlineKeyboardButton("🚫 Проверить подписки", callback_data="admin_check_subscriptions")],
-                [InlineKeyboardButton("📈 Активность", callback_data="admin_activity")],
-                [InlineKeyboardButton("📤 Отправить в группу", callback_data="admin_send_to_group")],
-                [InlineKeyboardButton("📢 Рассылка", callback_data="admin_broadcast")],
-                [InlineKeyboardButton("🔄 Обновить", callback_data="admin_refresh")]
-            ])
-            
-            # Отправляем сообщение в зависимости от типа update
-            if update.message:
-                await update.message.reply_text(message, reply_markup=keyboard, parse_mode='HTML')
-            elif update.callback_query:
-                await update.callback_query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
-            
+async def _all_chats_stats(week_ago: date, today: date) -> Dict[str, Dict[str, Any]]:
+    """
+    Кэшированная статистика по всем чатам за период.
+    
+    Статистика каждого чата попутно кладется в кэш отдельно, поэтому
+    переход из списка в конкретный чат не делает запрос в БД.
+    """
+    async def load(session) -> Dict[str, Dict[str, Any]]:
+        stats_by_chat = await ActivityService(session).get_activity_stats_for_chats(None, week_ago, today)
+        for chat_id, chat_stats in stats_by_chat.items():
+            _store_stats(_chat_stats_key(chat_id), {chat_id: chat_stats})
+        return stats_by_chat
+    
+    return await _cached_query(_chat_stats_key("all"), load)
+
+
+async def _prefetch_activity_stats() -> None:
+    """
+    Заранее заполняет кэш статистики активности.
+    
+    После админ-панели обычно открывают "Активность" и "По чатам",
+    поэтому их данные считаются в фоне, пока отправляется сообщение панели.
+    """
+    try:
+        today = datetime.utcnow().date()
+        prefetches = [_all_chats_stats(today - timedelta(days=7), today)]
+        if ActivityService.get_dashboard_snapshot() is None:
+            prefetches.append(ActivityService.refresh_dashboard_snapshot())
+        
+        # Запросы независимы и идут в разных сессиях - выполняем параллельно
+        await asyncio.gather(*prefetches)
+    except Exception as e:
+        logger.error(f"Ошибка предварительной загрузки статистики активности: {e}")
+
+
+# Ключи кэша статистики главной панели
+_DASHBOARD_STATS_KEYS = ("user_counts", "payment_counts", "active_today")
+
+
+async def _render_dashboard(ttl: float = STATS_CACHE_TTL) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Собирает текст и клавиатуру главной админ-панели.
+    
+    Args:
+        ttl: Допустимый возраст закэшированной статистики (сек)
+        
+    Returns:
+        Tuple[str, InlineKeyboardMarkup]: Текст сообщения и клавиатура
+    """
+    # Получаем статистику: независимые запросы выполняются параллельно
+    now = datetime.utcnow()
+    yesterday = now - timedelta(days=1)
+    user_counts, payment_counts, active_today = await asyncio.gather(
+        # Статистика пользователей (включая новых за 24 часа) - одним запросом
+        _cached_query("user_counts", lambda s: UserService(s).get_user_counts(since=yesterday), ttl),
+        # Статистика платежей
+        _cached_query("payment_counts", lambda s: PaymentService(s).get_payment_counts(), ttl),
+        # Статистика активности
+        _cached_query(
+            "active_today", lambda s: ActivityService(s).get_active_users_count_since(yesterday), ttl
+        )
+    )
+    
+    message = _DASHBOARD_TMPL({
+        **user_counts,
+        "payments_total": payment_counts['total'],
+        "payments_successful": payment_counts['successful'],
+        "active_today": active_today,
+        "updated_at": _local_time(now).strftime('%d.%m.%Y %H:%M')
+    })
+    return message, _DASHBOARD_KB
+
+
+@admin_only()
+async def admin_dashboard_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработчик команды /admin - админ-панель."""
+    try:
+        query = update.callback_query
+        if query:
+            if await _debounce_callback(query):
+                return
+            # Отвечаем на нажатие параллельно с запросами в БД
+            _answer_in_background(update, context)
+        
+        message, keyboard = await _render_dashboard()
+        
+        # Пока сообщение отправляется, заранее готовим статистику активности
+        context.application.create_task(_prefetch_activity_stats(), update=update)
+        
+        # Отправляем сообщение в зависимости от типа update. Показанный вариант
+        # запоминается, чтобы "Обновить" без изменений не редактировал сообщение
+        if update.message:
+            sent = await update.message.reply_text(message, reply_markup=keyboard, parse_mode='HTML')
+            if sent is not None:
+                context.user_data['_last_dashboard_view'] = (sent.message_id, message, keyboard)
+        elif query:
+            await _edit_view(query, context, '_last_dashboard_view', message, keyboard)
+        
     except Exception as e:
         logger.error(f"Ошибка в admin_dashboard_handler: {e}")
         # Отправляем ошибку в зависимости от типа update
@@ -123,356 +896,249 @@ async def admin_dashboard_handler(update: Update, context: ContextTypes.DEFAULT_
             await update.callback_query.edit_message_text("❌ Произошла ошибка при загрузке админ-панели.")
 
 
+@admin_only()
 async def admin_users_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки 'Пользователи' в админ-панели."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query)
-        
-        settings = get_settings()
-        user_id = query.from_user.id
+        if await _debounce_callback(query):
+            return
+        _answer_in_background(update, context)
         
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
+        # Определяем номер страницы из callback_data
+        page_match = _USERS_PAGE_RE.fullmatch(query.data or "")
+        page = int(page_match.group(1)) if page_match else 0
+        if query.data == "admin_users_current":
+            # Кнопка текущей страницы: на нажатие уже ответили, перерисовывать нечего
             return
         
-        async with get_db_session() as session:
-            user_service = UserService(session)
-            
-            # Определяем номер страницы из callback_data
+        # Курсоры страниц: cursors[N] - последний пользователь страницы N-1
+        cursors = context.user_data.get('user_page_cursors') or [None]
+        if page >= len(cursors):
+            # Курсор неизвестен (например, после перезапуска бота) - начинаем сначала
             page = 0
-            if query.data and query.data.startswith("admin_users_page_"):
-                try:
-                    page = int(query.data.split("_")[-1])
-                except (ValueError, IndexError):
-                    page = 0
-            elif query.data == "admin_users_current":
-                # Если нажата кнопка текущей страницы, ничего не делаем
-                return
-            
-            # Получаем общую статистику
-            total_users = await user_service.get_total_users_count()
-            active_users = await user_service.get_active_users_count()
-            premium_users = await user_service.get_premium_users_count()
-            
-            # Получаем список всех пользователей с пагинацией
-            users_per_page = 10
-            recent_users = await user_service.get_recent_users(limit=users_per_page, offset=page * users_per_page)
-            
-            message = f"""👥 <b>Управление пользователями</b>
-
-📊 <b>Статистика:</b>
-• Всего: {total_users}
-• Активных: {active_users}
-• Premium: {premium_users}
-
-📋 <b>Список пользователей (стр. {page + 1}):</b>
-"""
-            
-            for i, user in enumerate(recent_users, 1):
-                status_emoji = "✅" if user.status == "active" else "⏳"
-                premium_emoji = "💎" if user.is_premium else "🔓"
-                channel_emoji = "📢" if user.is_subscribed_to_channel else "❌"
-                
-                message += f"{i}. {status_emoji} {premium_emoji} {channel_emoji} <b>{user.first_name}</b>"
-                if user.username:
-                    message += f" (@{user.username})"
-                message += f"\n   ID: {user.telegram_id}\n"
-                message += f"   Статус: {user.status}\n"
-                if user.subscription_until:
-                    message += f"   Подписка до: {user.subscription_until.strftime('%d.%m.%Y')}\n"
-                message += f"   Добавлен: {user.created_at.strftime('%d.%m.%Y %H:%M')}\n\n"
-            
-            # Создаем клавиатуру с пагинацией
-            keyboard_buttons = []
-            
-            # Кнопки пагинации
-            nav_buttons = []
-            if page > 0:
-                nav_buttons.append(InlineKeyboardButton("◀️", callback_data=f"admin_users_page_{page-1}"))
-            nav_buttons.append(InlineKeyboardButton(f"{page + 1}", callback_data="admin_users_current"))
-            if len(recent_users) == users_per_page:
-                nav_buttons.append(InlineKeyboardButton("▶️", callback_data=f"admin_users_page_{page+1}"))
-            
-            if nav_buttons:
-                keyboard_buttons.append(nav_buttons)
-            
-            # Кнопки действий
-            keyboard_buttons.extend([
-                [InlineKeyboardButton("🔄 Обновить", callback_data="admin_users")],
-                [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-            ])
-            
-            keyboard = InlineKeyboardMarkup(keyboard_buttons)
-            
-            # Проверяем, изменилось ли сообщение
-            try:
-                await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
-            except Exception as edit_error:
-                if "Message is not modified" in str(edit_error):
-                    # Сообщение не изменилось, просто отвечаем на callback
-                    await safe_answer_callback(query, "📋 Данные актуальны")
-                else:
-                    # Другая ошибка - пересылаем
-                    raise edit_error
-            
+        cursor = cursors[page]
+        
+        # Страница пользователей и общая статистика - одним запросом
+        users_per_page = 10
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        recent_users, next_cursor, user_counts = await _cached(
+            f"users_page:{cursor}",
+            USER_LISTS_CACHE_TTL,
+            lambda: _session_call(lambda s: UserService(s).get_users_page_with_stats(
+                cursor, limit=users_per_page, since=yesterday
+            ))
+        )
+        _store_stats("user_counts", user_counts)
+        
+        cursors = cursors[:page + 1]
+        if next_cursor:
+            cursors.append(next_cursor)
+        context.user_data['user_page_cursors'] = cursors
+        
+        message = _USERS_TMPL({**user_counts, "page": page + 1}) + "".join(
+            _fmt_user_row(i, user) for i, user in enumerate(recent_users, 1)
+        )
+        
+        # Кнопки пагинации - единственная часть клавиатуры, зависящая от страницы
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton("◀️", callback_data=f"admin_users_page_{page-1}"))
+        nav_buttons.append(InlineKeyboardButton(f"{page + 1}", callback_data="admin_users_current"))
+        if next_cursor:
+            nav_buttons.append(InlineKeyboardButton("▶️", callback_data=f"admin_users_page_{page+1}"))
+        
+        keyboard = InlineKeyboardMarkup((tuple(nav_buttons),) + _USERS_ACTION_ROWS)
+        
+        await _edit_view(query, context, '_last_users_view', message, keyboard)
+        
     except Exception as e:
         logger.error(f"Ошибка в admin_users_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке списка пользователей.")
 
 
+@admin_only()
 async def admin_access_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки 'Выдача доступа' в админ-панели."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query)
+        if await _debounce_callback(query):
+            return
+        _answer_in_background(update, context)
+        
+        # Статистика доступа (общий кэш с панелью) и ожидающие - параллельно, каждый
+        # запрос в своей сессии. Количество ожидающих и первые из них приходят одним
+        # запросом; списки кэшируются ненадолго
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        user_counts, (pending_total, pending_preview) = await asyncio.gather(
+            _cached_query("user_counts", lambda s: UserService(s).get_user_counts(since=yesterday)),
+            _cached_query(
+                "pending_users",
+                lambda s: UserService(s).get_status_preview("pending", limit=5),
+                USER_LISTS_CACHE_TTL
+            )
+        )
         
-        settings = get_settings()
-        user_id = query.from_user.id
+        parts = [_ACCESS_TMPL({**user_counts, "pending_total": pending_total})]
+        append = parts.append
         
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
+        for user in pending_preview:
+            append(_PENDING_ROW_TMPL({
+                "channel_emoji": "📢" if user.is_subscribed_to_channel else "❌",
+                "first_name": user.first_name,
+                "username": f" (@{user.username})" if user.username else "",
+                "telegram_id": user.telegram_id,
+                "created_at": user.created_at.strftime('%d.%m %H:%M')
+            }))
+        
+        if pending_total > len(pending_preview):
+            append(f"\n\n... и еще {pending_total - len(pending_preview)} пользователей")
+        
+        message = "".join(parts)
+        
+        keyboard = _ACCESS_KB
+        
+        await _edit_view(query, context, '_last_access_view', message, keyboard)
         
-        async with get_db_session() as session:
-            user_service = UserService(session)
-            
-            # Получаем статистику доступа
-            total_users = await user_service.get_total_users_count()
-            active_users = await user_service.get_active_users_count()
-            premium_users = await user_service.get_premium_users_count()
-            
-            # Получаем пользователей без доступа
-            pending_users = await user_service.get_users_by_status("pending")
-            
-            message = f"""🔑 <b>Управление доступом</b>
-
-📊 <b>Статистика:</b>
-• Всего пользователей: {total_users}
-• С активным доступом: {active_users}
-• Premium пользователей: {premium_users}
-
-👥 <b>Пользователи без доступа ({len(pending_users)}):</b>
-"""
-            
-            for user in pending_users[:5]:  # Показываем первых 5
-                channel_emoji = "📢" if user.is_subscribed_to_channel else "❌"
-                message += f"\n{channel_emoji} <b>{user.first_name}</b>"
-                if user.username:
-                    message += f" (@{user.username})"
-                message += f"\nID: {user.telegram_id}"
-                message += f" | Добавлен: {user.created_at.strftime('%d.%m %H:%M')}"
-            
-            if len(pending_users) > 5:
-                message += f"\n\n... и еще {len(pending_users) - 5} пользователей"
-            
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("✅ Выдать доступ всем", callback_data="admin_give_access_all")],
-                [InlineKeyboardButton("👤 Выдать доступ по ID", callback_data="admin_give_access_by_id")],
-                [InlineKeyboardButton("❌ Отменить доступ по ID", callback_data="admin_revoke_access_by_id")],
-                [InlineKeyboardButton("🔄 Обновить", callback_data="admin_access")],
-                [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-            ])
-            
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
-            
     except Exception as e:
         logger.error(f"Ошибка в admin_access_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке управления доступом.")
 
 
+@admin_only()
 async def admin_give_access_all_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик выдачи доступа всем пользователям."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query, "⏳ Выдаем доступ всем пользователям...")
-        
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
+        _answer_in_background(update, context, "⏳ Выдаем доступ всем пользователям...")
         
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             
-            # Получаем всех пользователей со статусом pending
-            pending_users = await user_service.get_users_by_status("pending")
+            # Выдаем доступ всем ожидающим одним запросом: статус active и подписка на 30 дней
+            subscription_until = datetime.now() + timedelta(days=30)
+            granted_telegram_ids = await user_service.bulk_grant_access(subscription_until)
+            updated_count = len(granted_telegram_ids)
             
-            if not pending_users:
+            if not updated_count:
                 await query.edit_message_text("✅ Нет пользователей для выдачи доступа.")
                 return
             
-            # Выдаем доступ всем
-            updated_count = 0
-            from datetime import datetime, timedelta
-            from app.schemas.user import UserUpdate
+            # Иначе до истечения USER_CACHE_TTL пользователи видели бы "нужна оплата"
+            for telegram_id in granted_telegram_ids:
+                invalidate_user_cache(context, telegram_id)
+            _invalidate_stats(*_USER_STATS_KEYS)
             
-            for user in pending_users:
-                try:
-                    # Устанавливаем статус active и подписку на 30 дней
-                    subscription_until = datetime.now() + timedelta(days=30)
-                    
-                    await user_service.update_user(str(user.id), UserUpdate(
-                        status="active",
-                        is_premium=True,
-                        subscription_until=subscription_until
-                    ))
-                    updated_count += 1
-                except Exception as e:
-                    logger.error(f"Ошибка обновления пользователя {user.id}: {e}")
+            message = _GRANT_ALL_DONE_TMPL({
+                "updated_count": updated_count,
+                "subscription_until": subscription_until.strftime('%d.%m.%Y')
+            })
             
-            message = f"""✅ <b>Доступ выдан успешно!</b>
-
-👥 Обработано пользователей: {updated_count}
-📅 Подписка до: {(datetime.now() + timedelta(days=30)).strftime('%d.%m.%Y')}
-
-Все пользователи теперь имеют доступ к функциям клуба.
-"""
-            
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔙 К управлению доступом", callback_data="admin_access")],
-                [InlineKeyboardButton("🔙 К админ-панели", callback_data="admin_dashboard")]
-            ])
+            keyboard = _GRANT_ALL_DONE_KB
             
             await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        
+        # Уведомления рассылаются в фоне, чтобы не держать обработку обновлений
+        context.application.create_task(
+            _notify_access_granted(context.bot, granted_telegram_ids, subscription_until),
+            update=update
+        )
             
     except Exception as e:
         logger.error(f"Ошибка в admin_give_access_all_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при выдаче доступа.")
 
 
+@admin_only()
 async def admin_give_access_by_id_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик выдачи доступа по ID пользователя."""
     try:
         query = update.callback_query
         await safe_answer_callback(query, "👤 Введите ID пользователя для выдачи доступа")
         
-        settings = get_settings()
         user_id = query.from_user.id
         
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
-        
         # Запрашиваем ID пользователя
-        message = """👤 <b>Выдача доступа по ID</b>
-
-Введите Telegram ID пользователя, которому нужно выдать доступ.
-
-<b>Пример:</b> <code>123456789</code>
-
-💡 <b>Как найти ID:</b>
-• Попросите пользователя написать боту @userinfobot
-• Или используйте команду /start и посмотрите в логах бота
-
-Для отмены нажмите "Назад к панели"."""
+        keyboard = _BACK_TO_DASHBOARD_KB
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-        ])
-        
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        await query.edit_message_text(_GRANT_BY_ID_TEXT, reply_markup=keyboard, parse_mode='HTML')
         
         # Сохраняем состояние для ожидания ввода ID
-        context.user_data['waiting_for_user_id'] = True
-        logger.info(f"✅ Установлено состояние waiting_for_user_id=True для пользователя {user_id}")
+        context.user_data['awaiting_input'] = AdminState.AWAIT_GRANT_USER_ID
+        logger.debug(f"Установлено состояние ожидания ID для выдачи доступа, админ {user_id}")
         
     except Exception as e:
         logger.error(f"Ошибка в admin_give_access_by_id_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при запросе ID пользователя.")
 
 
+async def _auto_add_to_group(context: ContextTypes.DEFAULT_TYPE, telegram_id: int) -> Optional[bool]:
+    """Автоматически добавляет пользователя в группу; None - если произошла ошибка."""
+    try:
+        return await get_group_service(context).auto_add_paid_user_to_group(telegram_id)
+    except Exception as e:
+        logger.error(f"Ошибка автоматического добавления пользователя {telegram_id} в группу: {e}")
+        return None
+
+
+@admin_only()
 async def handle_user_id_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик ввода ID пользователя для выдачи доступа."""
-    logger.info(f"🚀 НАЧАЛО handle_user_id_input для пользователя {update.effective_user.id}")
-    logger.info(f"🔧 Проверяем импорты - TelegramService доступен: {TelegramService is not None}")
-    logger.info(f"🔧 Проверяем импорты - GroupManagementService доступен: {GroupManagementService is not None}")
-    
     try:
-        logger.info(f"🔍 handle_user_id_input вызван для пользователя {update.effective_user.id}")
-        logger.info(f"   Состояние: waiting_for_user_id={context.user_data.get('waiting_for_user_id', False)}")
-        logger.info(f"   Состояние: waiting_for_revoke_user_id={context.user_data.get('waiting_for_revoke_user_id', False)}")
-        logger.info(f"   Сообщение: {update.message.text}")
-        
-        # Проверяем, ожидаем ли мы ввод ID для выдачи или отмены доступа
-        if not (context.user_data.get('waiting_for_user_id', False) or 
-                context.user_data.get('waiting_for_revoke_user_id', False)):
-            logger.info("   ❌ Не ожидаем ввод ID, пропускаем")
-            return
+        logger.opt(lazy=True).debug(
+            "handle_user_id_input: пользователь {}, состояние {}",
+            lambda: update.effective_user.id,
+            lambda: context.user_data.get('awaiting_input')
+        )
         
-        # Если ожидаем отмену доступа, вызываем соответствующий обработчик
-        if context.user_data.get('waiting_for_revoke_user_id', False):
-            await handle_revoke_user_id_input(update, context)
+        target_user_id = await _read_id_input(update)
+        if target_user_id is None:
             return
-            
-        user_message = update.message.text.strip()
         
-        # Проверяем, что это число
-        try:
-            target_user_id = int(user_message)
-        except ValueError:
-            await update.message.reply_text(
-                "❌ Неверный формат ID. Введите числовой ID пользователя.\n\n"
-                "Пример: <code>123456789</code>",
-                parse_mode='HTML'
-            )
-            return
-        
-        # Проверяем права администратора
-        settings = get_settings()
         admin_id = update.effective_user.id
         
-        if admin_id not in settings.admin_ids_list:
-            await update.message.reply_text("❌ У вас нет прав администратора.")
-            context.user_data['waiting_for_user_id'] = False
-            return
-        
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             
-            # Ищем пользователя по Telegram ID
-            target_user = await user_service.get_user_by_telegram_id(target_user_id)
+            # Обычный случай - пользователь уже есть: выдаем доступ одним UPDATE ... RETURNING
+            subscription_until = datetime.now() + timedelta(days=30)
+            target_user = await user_service.set_subscription_by_telegram_id(
+                target_user_id, subscription_until, is_premium=True, status="active"
+            )
+            was_created = False
             
             if not target_user:
                 # Пользователь не найден в базе - попробуем создать его
-                logger.info(f"Пользователь {target_user_id} не найден в базе, пытаемся создать...")
+                logger.debug(f"Пользователь {target_user_id} не найден в базе, проверяем участие в группе")
                 
                 try:
-                    # Получаем информацию о пользователе через Telegram API
-                    telegram_service = TelegramService(context.bot)
-                    
                     # Проверяем, есть ли пользователь в группе
                     try:
                         chat_member = await context.bot.get_chat_member(
-                            chat_id=int(settings.GROUP_ID),
+                            chat_id=_GROUP_ID,
                             user_id=target_user_id
                         )
                         
-                        if chat_member.status in ['left', 'kicked']:
+                        if chat_member.status in {'left', 'kicked'}:
                             await update.message.reply_text(
                                 f"❌ Пользователь с ID <code>{target_user_id}</code> не находится в группе.\n\n"
                                 "Сначала добавьте пользователя в группу, затем выдайте доступ.",
                                 parse_mode='HTML'
                             )
-                            context.user_data['waiting_for_user_id'] = False
+                            context.user_data.pop('awaiting_input', None)
                             return
                         
-                        # Пользователь в группе - создаем запись в базе
-                        from app.schemas.user import UserCreate
-                        from datetime import datetime
-                        
+                        # Пользователь в группе - создаем запись в базе сразу с доступом
                         user_data = UserCreate(
                             telegram_id=target_user_id,
                             username=chat_member.user.username,
                             first_name=chat_member.user.first_name or "Неизвестно",
-                            last_name=chat_member.user.last_name,
-                            status="pending"  # Сначала pending, потом станет active
+                            last_name=chat_member.user.last_name
                         )
                         
-                        target_user = await user_service.create_user(user_data)
-                        logger.info(f"Создан новый пользователь {target_user_id} (@{target_user.username})")
+                        target_user, was_created = await user_service.upsert_grant_access(
+                            user_data, subscription_until
+                        )
                         
                     except Exception as e:
                         logger.error(f"Ошибка получения информации о пользователе {target_user_id}: {e}")
@@ -481,7 +1147,7 @@ async def handle_user_id_input(update: Update, context: ContextTypes.DEFAULT_TYP
                             "Убедитесь, что ID правильный и пользователь есть в группе.",
                             parse_mode='HTML'
                         )
-                        context.user_data['waiting_for_user_id'] = False
+                        context.user_data.pop('awaiting_input', None)
                         return
                         
                 except Exception as e:
@@ -491,472 +1157,317 @@ async def handle_user_id_input(update: Update, context: ContextTypes.DEFAULT_TYP
                         "Попробуйте еще раз или обратитесь к разработчику.",
                         parse_mode='HTML'
                     )
-                    context.user_data['waiting_for_user_id'] = False
+                    context.user_data.pop('awaiting_input', None)
                     return
             
-            # Выдаем доступ
-            from datetime import datetime, timedelta
-            from app.schemas.user import UserUpdate
-            
-            subscription_until = datetime.now() + timedelta(days=30)
-            
-            await user_service.update_user(str(target_user.id), UserUpdate(
-                status="active",
-                is_premium=True,
-                subscription_until=subscription_until
-            ))
-            
-            # Проверяем, был ли пользователь создан или уже существовал
-            was_created = target_user.status == "pending" and target_user.is_premium == False
-            
-            success_message = f"""✅ <b>Доступ выдан успешно!</b>
-
-👤 <b>Пользователь:</b> {target_user.first_name}"""
-            
-            if target_user.username:
-                success_message += f" (@{target_user.username})"
-                
-            success_message += f"""
-🆔 <b>ID:</b> <code>{target_user.telegram_id}</code>
-📅 <b>Подписка до:</b> {subscription_until.strftime('%d.%m.%Y %H:%M')}
-
-{"🆕 Пользователь создан и получил доступ" if was_created else "✅ Доступ обновлен"}
-
-Пользователь теперь имеет доступ к функциям клуба."""
-            
-            await update.message.reply_text(success_message, parse_mode='HTML')
+            invalidate_user_cache(context, target_user.telegram_id)
+            _invalidate_stats(*_USER_STATS_KEYS)
+            
+            success_message = _GRANT_DONE_TMPL({
+                "first_name": target_user.first_name,
+                "username": f" (@{target_user.username})" if target_user.username else "",
+                "telegram_id": target_user.telegram_id,
+                "subscription_until": subscription_until.strftime('%d.%m.%Y %H:%M'),
+                "result": "🆕 Пользователь создан и получил доступ" if was_created else "✅ Доступ обновлен"
+            })
+            
+            # Ответ администратору и добавление в группу - независимые запросы к Telegram
+            _, added_to_group = await asyncio.gather(
+                update.message.reply_text(success_message, parse_mode='HTML'),
+                _auto_add_to_group(context, target_user.telegram_id)
+            )
+            logger.info(f"Админ {admin_id} выдал доступ пользователю {target_user_id}")
             
-            # Автоматически добавляем пользователя в группу
-            try:
-                logger.info(f"🔧 Начинаем автоматическое добавление пользователя {target_user.telegram_id} в группу")
-                
-                # Создаем сервисы для добавления в группу
-                logger.info(f"🔧 Получаем settings...")
-                settings = get_settings()
-                logger.info(f"🔧 Settings получены: GROUP_ID={settings.GROUP_ID}")
-                
-                logger.info(f"🔧 Создаем TelegramService...")
-                telegram_service = TelegramService(context.bot)
-                logger.info(f"🔧 TelegramService создан успешно")
-                
-                logger.info(f"🔧 Создаем GroupManagementService...")
-                group_service = GroupManagementService(context.bot)
-                logger.info(f"🔧 GroupManagementService создан успешно")
-                
-                # Автоматически добавляем пользователя в группу
-                logger.info(f"🔧 Вызываем auto_add_paid_user_to_group для пользователя {target_user.telegram_id}")
-                added_to_group = await group_service.auto_add_paid_user_to_group(target_user.telegram_id)
-                logger.info(f"🔧 auto_add_paid_user_to_group завершен, результат: {added_to_group}")
-                
-                if added_to_group:
-                    await update.message.reply_text("✅ Пользователь автоматически добавлен в группу!", parse_mode='HTML')
-                    logger.info(f"✅ Пользователь {target_user.telegram_id} автоматически добавлен в группу через админ панель")
-                else:
-                    await update.message.reply_text("⚠️ Пользователь получил доступ, но не удалось автоматически добавить в группу.", parse_mode='HTML')
-                    logger.warning(f"⚠️ Не удалось автоматически добавить пользователя {target_user.telegram_id} в группу через админ панель")
-                
-            except Exception as e:
-                import traceback
-                logger.error(f"❌ Ошибка автоматического добавления пользователя {target_user.telegram_id} в группу через админ панель: {e}")
-                logger.error(f"❌ Traceback: {traceback.format_exc()}")
+            if added_to_group:
+                await update.message.reply_text("✅ Пользователь автоматически добавлен в группу!", parse_mode='HTML')
+            elif added_to_group is None:
                 await update.message.reply_text("⚠️ Пользователь получил доступ, но произошла ошибка при добавлении в группу.", parse_mode='HTML')
+            else:
+                await update.message.reply_text("⚠️ Пользователь получил доступ, но не удалось автоматически добавить в группу.", parse_mode='HTML')
+                logger.warning(f"Не удалось автоматически добавить пользователя {target_user.telegram_id} в группу")
             
             # Очищаем состояние
-            context.user_data['waiting_for_user_id'] = False
+            context.user_data.pop('awaiting_input', None)
             
     except Exception as e:
         logger.error(f"Ошибка в handle_user_id_input: {e}")
         await update.message.reply_text("❌ Произошла ошибка при выдаче доступа.")
-        context.user_data['waiting_for_user_id'] = False
+        context.user_data.pop('awaiting_input', None)
 
 
+@admin_only()
 async def admin_activity_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки 'Активность' в админ-панели."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query)
+        if await _debounce_callback(query):
+            return
+        _answer_in_background(update, context)
         
-        settings = get_settings()
-        user_id = query.from_user.id
+        # Статистика по дням, по типам сообщений и все пользователи за неделю
+        # берется из снимка, который пересчитывает планировщик; без снимка - считаем сразу
+        now, stats = (
+            ActivityService.get_dashboard_snapshot()
+            or await ActivityService.refresh_dashboard_snapshot()
+        )
+        today = now.date()
+        yesterday = today - timedelta(days=1)
+        
+        no_activity = {'messages': 0, 'active_users': 0}
+        activity_today = stats['by_day'].get(today, no_activity)
+        activity_yesterday = stats['by_day'].get(yesterday, no_activity)
+        overall_stats = stats['totals']
+        message_types = stats['by_type']
+        all_users = stats['top_users']
+        
+        parts = [_ACTIVITY_TMPL({
+            "today": _fmt_date(today),
+            "today_messages": activity_today['messages'],
+            "today_users": activity_today['active_users'],
+            "yesterday": _fmt_date(yesterday),
+            "yesterday_messages": activity_yesterday['messages'],
+            "yesterday_users": activity_yesterday['active_users'],
+            **overall_stats,
+            **{message_type: message_types.get(message_type, 0) for message_type in _ACTIVITY_MESSAGE_TYPES}
+        })]
+        append = parts.append
+        
+        if all_users:
+            for i, (first_name, username, count) in enumerate(all_users, 1):
+                append(_ACTIVITY_ROW_TMPL({
+                    "i": i,
+                    "first_name": first_name,
+                    "username": f"@{username}" if username else "",
+                    "count": count
+                }))
+        else:
+            append("Нет данных об активности пользователей")
         
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
+        # Добавляем временную метку для уникальности сообщения
+        append(f"\n⏰ Обновлено: {_local_time(now).strftime('%H:%M:%S')}")
+        message = "".join(parts)
+        
+        keyboard = _activity_keyboard()
+        
+        await _edit_view(query, context, '_last_activity_view', message, keyboard)
         
-        async with get_db_session() as session:
-            activity_service = ActivityService(session)
-            
-            # Получаем статистику активности
-            today = datetime.utcnow().date()
-            yesterday = (datetime.utcnow() - timedelta(days=1)).date()
-            week_ago = (datetime.utcnow() - timedelta(days=7)).date()
-            
-            # Получаем общую статистику
-            overall_stats = await activity_service.get_overall_activity_stats(week_ago, today)
-            activity_today = await activity_service.get_activity_stats_for_date(today)
-            activity_yesterday = await activity_service.get_activity_stats_for_date(yesterday)
-            
-            message = f"""📈 <b>Общая активность по всем чатам</b>
-
-📅 <b>Сегодня ({today.strftime('%d.%m.%Y')}):</b>
-• Сообщений: {activity_today.get('messages', 0)}
-• Активных пользователей: {activity_today.get('active_users', 0)}
-
-📅 <b>Вчера ({yesterday.strftime('%d.%m.%Y')}):</b>
-• Сообщений: {activity_yesterday.get('messages', 0)}
-• Активных пользователей: {activity_yesterday.get('active_users', 0)}
-
-📊 <b>За неделю (общая статистика):</b>
-• Всего сообщений: {overall_stats.get('total_messages', 0)}
-• Уникальных пользователей: {overall_stats.get('unique_users', 0)}
-• Активных чатов: {overall_stats.get('active_chats', 0)}
-
-🎯 <b>Типы сообщений за неделю:</b>
-• 💬 Текст: {overall_stats.get('message_types', {}).get('message', 0)}
-• 🎤 Голосовые: {overall_stats.get('message_types', {}).get('voice', 0)}
-• 📹 Видеосообщения: {overall_stats.get('message_types', {}).get('video_note', 0)}
-• 🖼️ Фото: {overall_stats.get('message_types', {}).get('photo', 0)}
-• 🎬 Видео: {overall_stats.get('message_types', {}).get('video', 0)}
-• 🎵 Аудио: {overall_stats.get('message_types', {}).get('audio', 0)}
-• 📄 Документы: {overall_stats.get('message_types', {}).get('document', 0)}
-• 😀 Стикеры: {overall_stats.get('message_types', {}).get('sticker', 0)}
-• 🎞️ GIF: {overall_stats.get('message_types', {}).get('animation', 0)}
-
-👥 <b>Все пользователи за неделю (по активности):</b>
-"""
-            
-            # Получаем всех пользователей (не топ, а всех)
-            all_users = await activity_service.get_top_active_users(days=7, limit=100)  # Увеличиваем лимит
-            
-            if all_users:
-                for i, user in enumerate(all_users, 1):
-                    username = user.get('username', '')
-                    username_display = f"@{username}" if username else ""
-                    message += f"{i}. {user.get('first_name', 'Неизвестно')} {username_display} - {user.get('activity_count', 0)} сообщений\n"
-            else:
-                message += "Нет данных об активности пользователей"
-            
-            # Добавляем временную метку для уникальности сообщения
-            message += f"\n⏰ Обновлено: {datetime.utcnow().strftime('%H:%M:%S')}"
-            
-            # Создаем кнопки для каждого чата
-            keyboard_buttons = []
-            
-            # Кнопка "По чатам" (общая статистика по всем чатам)
-            keyboard_buttons.append([InlineKeyboardButton("📊 По чатам", callback_data="admin_activity_by_chats")])
-            
-            # Кнопки для каждого чата
-            for chat_id in settings.all_chat_ids:
-                chat_name = settings.chat_names.get(chat_id, f"Чат {chat_id}")
-                # Ограничиваем длину названия чата для кнопки
-                button_text = chat_name[:20] + "..." if len(chat_name) > 20 else chat_name
-                keyboard_buttons.append([InlineKeyboardButton(f"💬 {button_text}", callback_data=f"admin_chat_activity_{chat_id}")])
-            
-            # Кнопка "Назад"
-            keyboard_buttons.append([InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")])
-            
-            keyboard = InlineKeyboardMarkup(keyboard_buttons)
-            
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
-            
     except Exception as e:
         logger.error(f"Ошибка в admin_activity_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке статистики активности.")
 
 
-async def admin_activity_by_chats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Обработчик кнопки 'По чатам' в аналитике активности."""
-    try:
-        query = update.callback_query
-        await safe_answer_callback(query)
-        
-        user_id = update.effective_user.id
-        settings = get_settings()
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
-        
-        async with get_db_session() as session:
-            activity_service = ActivityService(session)
-            
-            # Получаем статистику активности
-            today = datetime.utcnow().date()
-            yesterday = (datetime.utcnow() - timedelta(days=1)).date()
-            week_ago = (datetime.utcnow() - timedelta(days=7)).date()
-            
-            message = f"""📈 <b>Активность по чатам</b>
-
-📅 <b>Период: {week_ago.strftime('%d.%m.%Y')} - {today.strftime('%d.%m.%Y')}</b>
-
-"""
-            
-            # Получаем общую статистику по всем чатам
-            chat_stats_dict = await activity_service.get_activity_stats_by_chat(week_ago, today)
-            
-            # Группируем по основным чатам (без топиков)
-            main_chats = {}
-            for chat_id, stats in chat_stats_dict.items():
-                # Определяем основной чат (убираем суффикс топика)
-                if '_' in chat_id:
-                    main_chat = chat_id.split('_')[0]
-                else:
-                    main_chat = chat_id
-                
-                if main_chat not in main_chats:
-                    main_chats[main_chat] = {
-                        'total_messages': 0,
-                        'unique_users': 0,
-                        'message_types': {}
-                    }
-                
-                # Суммируем статистику
-                main_chats[main_chat]['total_messages'] += stats.get('total_messages', 0)
-                # unique_users уже число из stats, просто суммируем
-                if 'unique_users' not in main_chats[main_chat]:
-                    main_chats[main_chat]['unique_users'] = stats.get('unique_users', 0)
-                else:
-                    main_chats[main_chat]['unique_users'] += stats.get('unique_users', 0)
-                
-                # Суммируем типы сообщений
-                for msg_type, count in stats.get('message_types', {}).items():
-                    if msg_type not in main_chats[main_chat]['message_types']:
-                        main_chats[main_chat]['message_types'][msg_type] = 0
-                    main_chats[main_chat]['message_types'][msg_type] += count
-            
-            # Показываем статистику по основным чатам
-            for main_chat, stats in main_chats.items():
-                chat_name = settings.chat_names.get(main_chat, f"Чат {main_chat}")
-                if not chat_name:
-                    chat_name = "Основная группа"
-                
-                message += f"""💬 <b>{chat_name}</b>
-• Сообщений: {stats['total_messages']}
-• Пользователей: {stats['unique_users']}
-• Топ типы: Текст({stats['message_types'].get('message', 0)}), Фото({stats['message_types'].get('photo', 0)}), Голос({stats['message_types'].get('voice', 0)})
-
-"""
-            
-            # Добавляем временную метку для уникальности сообщения
-            message += f"\n⏰ Обновлено: {datetime.utcnow().strftime('%H:%M:%S')}"
-            
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("📊 Общая статистика", callback_data="admin_activity")],
-                [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-            ])
+@admin_only()
+async def admin_activity_by_chats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработчик кнопки 'По чатам' в аналитике активности."""
+    try:
+        query = update.callback_query
+        _answer_in_background(update, context)
+        
+        # Получаем статистику активности
+        now = datetime.utcnow()
+        today = now.date()
+        week_ago = today - timedelta(days=7)
+        
+        # Статистика по всем чатам одним запросом (включая топики)
+        chat_stats_dict = await _all_chats_stats(week_ago, today)
+        
+        parts = [_CHATS_HEADER_TMPL({"period": _fmt_period(week_ago, today)})]
+        
+        # Группируем по основным чатам (без топиков)
+        main_chats = {}
+        for chat_id, stats in chat_stats_dict.items():
+            # Определяем основной чат (убираем суффикс топика)
+            main_chat = chat_id.partition('_')[0]
+            
+            if main_chat not in main_chats:
+                main_chats[main_chat] = {
+                    'total_messages': 0,
+                    'unique_users': 0,
+                    'message_types': {}
+                }
+            
+            # Суммируем статистику
+            main_chats[main_chat]['total_messages'] += stats.get('total_messages', 0)
+            # unique_users уже число из stats, просто суммируем
+            if 'unique_users' not in main_chats[main_chat]:
+                main_chats[main_chat]['unique_users'] = stats.get('unique_users', 0)
+            else:
+                main_chats[main_chat]['unique_users'] += stats.get('unique_users', 0)
             
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+            # Суммируем типы сообщений
+            for msg_type, count in stats.get('message_types', {}).items():
+                if msg_type not in main_chats[main_chat]['message_types']:
+                    main_chats[main_chat]['message_types'][msg_type] = 0
+                main_chats[main_chat]['message_types'][msg_type] += count
+        
+        # Показываем статистику по основным чатам
+        for main_chat, stats in main_chats.items():
+            chat_name = _CHAT_NAMES.get(main_chat, f"Чат {main_chat}")
+            if not chat_name:
+                chat_name = "Основная группа"
             
+            # Отсутствующие типы сообщений подставляются нулем
+            parts.append(_CHAT_SUMMARY_TMPL(defaultdict(
+                int,
+                stats['message_types'],
+                chat_name=chat_name,
+                total_messages=stats['total_messages'],
+                unique_users=stats['unique_users']
+            )))
+        
+        # Добавляем временную метку для уникальности сообщения
+        parts.append(f"\n⏰ Обновлено: {_local_time(now).strftime('%H:%M:%S')}")
+        message = "".join(parts)
+        
+        keyboard = _ACTIVITY_BY_CHATS_KB
+        
+        await _edit_view(query, context, '_last_chats_view', message, keyboard)
+        
     except Exception as e:
         logger.error(f"Ошибка в admin_activity_by_chats_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке статистики по чатам.")
 
 
+@admin_only()
 async def admin_chat_activity_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки конкретного чата в аналитике."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query)
-        
-        user_id = update.effective_user.id
-        settings = get_settings()
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
+        _answer_in_background(update, context)
         
         # Извлекаем ID чата из callback_data
         callback_data = query.data
-        chat_id = callback_data.replace("admin_chat_activity_", "")
+        chat_id = callback_data.removeprefix("admin_chat_activity_")
+        
+        chat_name = _CHAT_NAMES.get(chat_id, f"Чат {chat_id}")
+        
+        # Получаем статистику активности
+        now = datetime.utcnow()
+        today = now.date()
+        week_ago = today - timedelta(days=7)
+        
+        # Статистика только по этому чату и его пользователи - из кэша или параллельно из БД
+        chat_stats_dict, chat_users = await asyncio.gather(
+            _cached_query(
+                _chat_stats_key(chat_id),
+                lambda s: ActivityService(s).get_activity_stats_for_chats([chat_id], week_ago, today)
+            ),
+            _cached_query(
+                f"chat_users:{chat_id}",
+                lambda s: ActivityService(s).get_top_active_users_for_chat(chat_id, limit=50, since=week_ago)
+            )
+        )
+        chat_stats = chat_stats_dict.get(chat_id, {})
+        
+        # Отсутствующие счетчики (нет активности или типа сообщений) подставляются нулем
+        parts = [_CHAT_ACTIVITY_TMPL(defaultdict(
+            int,
+            chat_stats.get('message_types', {}),
+            chat_name=chat_name,
+            period=_fmt_period(week_ago, today),
+            total_messages=chat_stats.get('total_messages', 0),
+            unique_users=chat_stats.get('unique_users', 0)
+        ))]
+        append = parts.append
+        
+        if chat_users:
+            for i, (first_name, username, count) in enumerate(chat_users, 1):
+                append(_ACTIVITY_ROW_TMPL({
+                    "i": i,
+                    "first_name": first_name,
+                    "username": f"@{username}" if username else "",
+                    "count": count
+                }))
+        else:
+            append("Нет активности в этом чате")
         
-        chat_name = settings.chat_names.get(chat_id, f"Чат {chat_id}")
+        # Добавляем временную метку
+        append(f"\n⏰ Обновлено: {_local_time(now).strftime('%H:%M:%S')}")
+        message = "".join(parts)
+        
+        keyboard = _CHAT_ACTIVITY_KB
+        
+        await _edit_view(query, context, '_last_chat_activity_view', message, keyboard)
         
-        async with get_db_session() as session:
-            activity_service = ActivityService(session)
-            
-            # Получаем статистику активности
-            today = datetime.utcnow().date()
-            yesterday = (datetime.utcnow() - timedelta(days=1)).date()
-            week_ago = (datetime.utcnow() - timedelta(days=7)).date()
-            
-            # Получаем статистику по конкретному чату
-            chat_stats_dict = await activity_service.get_activity_stats_by_chat(week_ago, today)
-            chat_stats = chat_stats_dict.get(chat_id, {})
-            
-            message = f"""📈 <b>Активность в чате: {chat_name}</b>
-
-📅 <b>Период: {week_ago.strftime('%d.%m.%Y')} - {today.strftime('%d.%m.%Y')}</b>
-
-📊 <b>Общая статистика:</b>
-• Всего сообщений: {chat_stats.get('total_messages', 0)}
-• Уникальных пользователей: {chat_stats.get('unique_users', 0)}
-
-🎯 <b>Типы сообщений:</b>
-• 💬 Текст: {chat_stats.get('message_types', {}).get('message', 0)}
-• 🎤 Голосовые: {chat_stats.get('message_types', {}).get('voice', 0)}
-• 📹 Видеосообщения: {chat_stats.get('message_types', {}).get('video_note', 0)}
-• 🖼️ Фото: {chat_stats.get('message_types', {}).get('photo', 0)}
-• 🎬 Видео: {chat_stats.get('message_types', {}).get('video', 0)}
-• 🎵 Аудио: {chat_stats.get('message_types', {}).get('audio', 0)}
-• 📄 Документы: {chat_stats.get('message_types', {}).get('document', 0)}
-• 😀 Стикеры: {chat_stats.get('message_types', {}).get('sticker', 0)}
-• 🎞️ GIF: {chat_stats.get('message_types', {}).get('animation', 0)}
-
-👥 <b>Активные пользователи:</b>
-"""
-            
-            # Получаем пользователей этого чата
-            chat_users = await activity_service.get_top_active_users_for_chat(chat_id, days=7, limit=50)
-            
-            if chat_users:
-                for i, user in enumerate(chat_users, 1):
-                    username = user.get('username', '')
-                    username_display = f"@{username}" if username else ""
-                    message += f"{i}. {user.get('first_name', 'Неизвестно')} {username_display} - {user.get('activity_count', 0)} сообщений\n"
-            else:
-                message += "Нет активности в этом чате"
-            
-            # Добавляем временную метку
-            message += f"\n⏰ Обновлено: {datetime.utcnow().strftime('%H:%M:%S')}"
-            
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("📊 Общая статистика", callback_data="admin_activity")],
-                [InlineKeyboardButton("📋 По всем чатам", callback_data="admin_activity_by_chats")],
-                [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-            ])
-            
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
-            
     except Exception as e:
         logger.error(f"Ошибка в admin_chat_activity_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке статистики чата.")
 
 
+@admin_only()
 async def admin_refresh_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки 'Обновить' в админ-панели."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query, "🔄 Обновляем данные...")
+        if await _debounce_callback(query):
+            return
+        # Только что посчитанную статистику не пересчитываем и не пишем, что обновляем
+        from_cache = all(_is_fresh(key, REFRESH_MIN_AGE) for key in _DASHBOARD_STATS_KEYS)
+        _answer_in_background(update, context, None if from_cache else "🔄 Обновляем данные...")
         
-        # Перенаправляем на главную панель
-        await admin_dashboard_handler(update, context)
+        # Правим то же сообщение панели
+        message, keyboard = await _render_dashboard(ttl=REFRESH_MIN_AGE)
+        await _edit_view(query, context, '_last_dashboard_view', message, keyboard)
         
     except Exception as e:
         logger.error(f"Ошибка в admin_refresh_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при обновлении данных.")
 
 
+@admin_only()
 async def admin_broadcast_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки 'Рассылка' в админ-панели."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query)
-        
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
-        
-        message = """📢 <b>Рассылка сообщений</b>
-
-Выберите тип рассылки:
-
-• Всем пользователям
-• Только активным
-• Только premium
-• По статусу подписки
-"""
+        _answer_in_background(update, context)
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("👥 Всем пользователям", callback_data="broadcast_all")],
-            [InlineKeyboardButton("✅ Только активным", callback_data="broadcast_active")],
-            [InlineKeyboardButton("💎 Только premium", callback_data="broadcast_premium")],
-            [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-        ])
+        keyboard = _BROADCAST_KB
         
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        await query.edit_message_text(_BROADCAST_TEXT, reply_markup=keyboard, parse_mode='HTML')
         
     except Exception as e:
         logger.error(f"Ошибка в admin_broadcast_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке меню рассылки.")
 
 
+@admin_only()
 async def admin_revoke_access_by_id_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик отмены доступа по ID пользователя."""
     try:
         query = update.callback_query
         await safe_answer_callback(query, "❌ Введите ID пользователя для отмены доступа")
         
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
-        
         # Запрашиваем ID пользователя
-        message = """❌ <b>Отмена доступа по ID</b>
-
-Введите Telegram ID пользователя, у которого нужно отменить доступ.
-
-<b>Пример:</b> <code>123456789</code>
-
-💡 <b>Как найти ID:</b>
-• Посмотрите в админ-панели в разделе "Пользователи"
-• Или используйте команду /start и посмотрите в логах бота
-
-Для отмены нажмите "Назад к панели"."""
+        keyboard = _REVOKE_ACCESS_BY_ID_KB
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_access")]
-        ])
-        
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        await query.edit_message_text(_REVOKE_BY_ID_TEXT, reply_markup=keyboard, parse_mode='HTML')
         
         # Сохраняем состояние для ожидания ввода ID
-        context.user_data['waiting_for_revoke_user_id'] = True
+        context.user_data['awaiting_input'] = AdminState.AWAIT_REVOKE_USER_ID
         
     except Exception as e:
         logger.error(f"Ошибка в admin_revoke_access_by_id_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при запросе ID пользователя.")
 
 
+@admin_only()
 async def handle_revoke_user_id_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик ввода ID пользователя для отмены доступа."""
     try:
-        # Проверяем, ожидаем ли мы ввод ID для отмены доступа
-        if not context.user_data.get('waiting_for_revoke_user_id', False):
-            return
-            
-        user_message = update.message.text.strip()
-        
-        # Проверяем, что это число
-        try:
-            target_user_id = int(user_message)
-        except ValueError:
-            await update.message.reply_text(
-                "❌ Неверный формат ID. Введите числовой ID пользователя.\n\n"
-                "Пример: <code>123456789</code>",
-                parse_mode='HTML'
-            )
-            return
-        
-        # Проверяем права администратора
-        settings = get_settings()
-        admin_id = update.effective_user.id
-        
-        if admin_id not in settings.admin_ids_list:
-            await update.message.reply_text("❌ У вас нет прав администратора.")
-            context.user_data['waiting_for_revoke_user_id'] = False
+        target_user_id = await _read_id_input(update)
+        if target_user_id is None:
             return
         
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             
-            # Ищем пользователя по Telegram ID
-            target_user = await user_service.get_user_by_telegram_id(target_user_id)
+            # Отменяем доступ одним UPDATE ... RETURNING (без предварительного SELECT)
+            target_user = await user_service.set_subscription_by_telegram_id(
+                target_user_id,
+                subscription_until=None,
+                is_premium=False,
+                status="pending"
+            )
             
             if not target_user:
                 await update.message.reply_text(
@@ -964,311 +1475,191 @@ async def handle_revoke_user_id_input(update: Update, context: ContextTypes.DEFA
                     "Убедитесь, что пользователь хотя бы раз писал боту.",
                     parse_mode='HTML'
                 )
-                context.user_data['waiting_for_revoke_user_id'] = False
+                context.user_data.pop('awaiting_input', None)
                 return
             
-            # Отменяем доступ
-            from app.schemas.user import UserUpdate
-            
-            await user_service.update_user(str(target_user.id), UserUpdate(
-                status="pending",
-                is_premium=False,
-                subscription_until=None
-            ))
+            invalidate_user_cache(context, target_user.telegram_id)
+            _invalidate_stats(*_USER_STATS_KEYS)
             
-            success_message = f"""✅ <b>Доступ отменен успешно!</b>
-
-👤 <b>Пользователь:</b> {target_user.first_name}
-🆔 <b>ID:</b> <code>{target_user.telegram_id}</code>
-📅 <b>Статус:</b> pending (доступ отменен)
-
-Пользователь больше не имеет доступ к функциям клуба."""
+            success_message = _REVOKE_DONE_TMPL({
+                "first_name": target_user.first_name,
+                "telegram_id": target_user.telegram_id
+            })
             
             await update.message.reply_text(success_message, parse_mode='HTML')
             
             # Очищаем состояние
-            context.user_data['waiting_for_revoke_user_id'] = False
+            context.user_data.pop('awaiting_input', None)
             
     except Exception as e:
         logger.error(f"Ошибка в handle_revoke_user_id_input: {e}")
         await update.message.reply_text("❌ Произошла ошибка при отмене доступа.")
-        context.user_data['waiting_for_revoke_user_id'] = False
+        context.user_data.pop('awaiting_input', None)
 
 
+@admin_only(super_only=True)
 async def admin_management_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик управления администраторами."""
     try:
         query = update.callback_query
-        await safe_answer_callback(query, "👑 Управление администраторами")
-        
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
-        
-        # Проверяем, является ли пользователь супер-администратором
-        if user_id != settings.SUPER_ADMIN_ID:
-            await query.edit_message_text("❌ Только супер-администратор может управлять администраторами.")
-            return
+        _answer_in_background(update, context, "👑 Управление администраторами")
         
         # Получаем список текущих администраторов
-        from app.services.admin_service import AdminService
-        admin_service = AdminService()
-        current_admins = await admin_service.get_current_admins()
+        current_admins = await _admin_service.get_current_admins()
         
         # Формируем сообщение
-        message = "👑 <b>Управление администраторами</b>\n\n"
-        message += "<b>Текущие администраторы:</b>\n"
+        parts = ["👑 <b>Управление администраторами</b>\n\n<b>Текущие администраторы:</b>\n"]
+        append = parts.append
         
         for admin in current_admins:
             status = "🔴 Супер-админ" if admin['is_super_admin'] else "🟡 Админ"
-            message += f"• ID: <code>{admin['id']}</code> - {status}\n"
+            append(f"• ID: <code>{admin['id']}</code> - {status}\n")
         
-        message += f"\n<b>Супер-администратор:</b> <code>{settings.SUPER_ADMIN_ID}</code>"
-        message += "\n\nВыберите действие:"
+        append(f"\n<b>Супер-администратор:</b> <code>{_SUPER_ADMIN_ID}</code>\n\nВыберите действие:")
+        message = "".join(parts)
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("➕ Добавить админа", callback_data="admin_add_admin")],
-            [InlineKeyboardButton("➖ Удалить админа", callback_data="admin_remove_admin")],
-            [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-        ])
+        keyboard = _MANAGEMENT_KB
         
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        await _edit_view(query, context, '_last_management_view', message, keyboard)
         
     except Exception as e:
         logger.error(f"Ошибка в admin_management_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при загрузке управления администраторами.")
 
 
+@admin_only(super_only=True)
 async def admin_add_admin_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик добавления администратора."""
     try:
         query = update.callback_query
         await safe_answer_callback(query, "➕ Добавление администратора")
         
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id != settings.SUPER_ADMIN_ID:
-            await query.edit_message_text("❌ Только супер-администратор может добавлять администраторов.")
-            return
-        
-        message = """➕ <b>Добавление администратора</b>
-
-Введите Telegram ID пользователя, которого нужно сделать администратором.
-
-<b>Пример:</b> <code>123456789</code>
-
-💡 <b>Как найти ID:</b>
-• Попросите пользователя написать боту /start
-• Посмотрите в логах бота или в админ-панели
-
-Для отмены нажмите "Назад к управлению"."""
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад к управлению", callback_data="admin_management")]
-        ])
+        keyboard = _BACK_TO_MANAGEMENT_KB
         
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        await query.edit_message_text(_ADD_ADMIN_TEXT, reply_markup=keyboard, parse_mode='HTML')
         
         # Сохраняем состояние для ожидания ввода ID
-        context.user_data['waiting_for_add_admin_id'] = True
+        context.user_data['awaiting_input'] = AdminState.AWAIT_ADD_ADMIN_ID
         
     except Exception as e:
         logger.error(f"Ошибка в admin_add_admin_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при запросе ID администратора.")
 
 
+@admin_only(super_only=True)
 async def admin_remove_admin_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик удаления администратора."""
     try:
         query = update.callback_query
         await safe_answer_callback(query, "➖ Удаление администратора")
         
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id != settings.SUPER_ADMIN_ID:
-            await query.edit_message_text("❌ Только супер-администратор может удалять администраторов.")
-            return
-        
-        message = """➖ <b>Удаление администратора</b>
-
-Введите Telegram ID администратора, которого нужно удалить.
-
-<b>Пример:</b> <code>123456789</code>
-
-⚠️ <b>Внимание:</b>
-• Супер-администратора удалить нельзя
-• Удаленный пользователь потеряет доступ к админ-панели
-
-Для отмены нажмите "Назад к управлению"."""
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад к управлению", callback_data="admin_management")]
-        ])
+        keyboard = _BACK_TO_MANAGEMENT_KB
         
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
+        await query.edit_message_text(_REMOVE_ADMIN_TEXT, reply_markup=keyboard, parse_mode='HTML')
         
         # Сохраняем состояние для ожидания ввода ID
-        context.user_data['waiting_for_remove_admin_id'] = True
+        context.user_data['awaiting_input'] = AdminState.AWAIT_REMOVE_ADMIN_ID
         
     except Exception as e:
         logger.error(f"Ошибка в admin_remove_admin_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при запросе ID администратора.")
 
 
-async def handle_admin_id_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Обработчик ввода ID администратора."""
-    try:
-        logger.info(f"🔍 handle_admin_id_input вызван для пользователя {update.effective_user.id}")
-        logger.info(f"   Состояние: waiting_for_add_admin_id={context.user_data.get('waiting_for_add_admin_id', False)}")
-        logger.info(f"   Состояние: waiting_for_remove_admin_id={context.user_data.get('waiting_for_remove_admin_id', False)}")
-        logger.info(f"   Состояние: waiting_for_user_id={context.user_data.get('waiting_for_user_id', False)}")
-        logger.info(f"   Состояние: waiting_for_revoke_user_id={context.user_data.get('waiting_for_revoke_user_id', False)}")
-        logger.info(f"   Сообщение: {update.message.text}")
-        
-        # Проверяем, ожидаем ли мы ввод ID для добавления админа
-        if context.user_data.get('waiting_for_add_admin_id', False):
-            await handle_add_admin_id_input(update, context)
-            return
-        
-        # Проверяем, ожидаем ли мы ввод ID для удаления админа
-        if context.user_data.get('waiting_for_remove_admin_id', False):
-            await handle_remove_admin_id_input(update, context)
-            return
-        
-        # Проверяем, ожидаем ли мы ввод ID для выдачи или отмены доступа пользователю
-        if context.user_data.get('waiting_for_user_id', False) or context.user_data.get('waiting_for_revoke_user_id', False):
-            logger.info("   ✅ Перенаправляем на handle_user_id_input")
-            await handle_user_id_input(update, context)
-            return
-        
-        # Проверяем, ожидаем ли мы ввод сообщения для группы
-        if context.user_data.get('waiting_for_group_message', False):
-            logger.info("   ✅ Перенаправляем на handle_group_message_input")
-            await handle_group_message_input(update, context)
-            return
-        
-        logger.info("   ❌ Не ожидаем ввод ID, пропускаем")
-            
-    except Exception as e:
-        logger.error(f"Ошибка в handle_admin_id_input: {e}")
-        await update.message.reply_text("❌ Произошла ошибка при обработке ID администратора.")
-
-
+@admin_only(super_only=True)
 async def handle_add_admin_id_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик ввода ID для добавления администратора."""
     try:
-        user_message = update.message.text.strip()
-        
-        # Проверяем, что это число
-        try:
-            admin_id = int(user_message)
-        except ValueError:
-            await update.message.reply_text(
-                "❌ Неверный формат ID. Введите числовой ID пользователя.\n\n"
-                "Пример: <code>123456789</code>",
-                parse_mode='HTML'
-            )
+        admin_id = await _read_id_input(update)
+        if admin_id is None:
             return
         
-        # Проверяем права администратора
-        settings = get_settings()
         current_admin_id = update.effective_user.id
         
-        if current_admin_id != settings.SUPER_ADMIN_ID:
-            await update.message.reply_text("❌ Только супер-администратор может добавлять администраторов.")
-            context.user_data['waiting_for_add_admin_id'] = False
-            return
-        
         # Добавляем администратора
-        from app.services.admin_service import AdminService
-        admin_service = AdminService()
-        
-        result = await admin_service.add_admin(admin_id, current_admin_id)
+        result = await _admin_service.add_admin(admin_id, current_admin_id)
         
         if result['success']:
-            success_message = f"""✅ <b>Администратор добавлен успешно!</b>
-
-👤 <b>ID:</b> <code>{admin_id}</code>
-📅 <b>Время:</b> {datetime.now().strftime('%d.%m.%Y %H:%M')}
-
-{result['message']}
-
-✅ <b>Изменения применены мгновенно!</b>
-• Новый администратор получил доступ к админ-панели"""
+            _refresh_admin_ids()
+            success_message = _ADMIN_ADDED_TMPL({
+                "admin_id": admin_id,
+                "time": datetime.now().strftime('%d.%m.%Y %H:%M'),
+                "message": result['message']
+            })
             
             await update.message.reply_text(success_message, parse_mode='HTML')
         else:
             await update.message.reply_text(f"❌ {result['message']}")
         
         # Очищаем состояние
-        context.user_data['waiting_for_add_admin_id'] = False
+        context.user_data.pop('awaiting_input', None)
         
     except Exception as e:
         logger.error(f"Ошибка в handle_add_admin_id_input: {e}")
         await update.message.reply_text("❌ Произошла ошибка при добавлении администратора.")
-        context.user_data['waiting_for_add_admin_id'] = False
+        context.user_data.pop('awaiting_input', None)
 
 
+@admin_only(super_only=True)
 async def handle_remove_admin_id_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик ввода ID для удаления администратора."""
     try:
-        user_message = update.message.text.strip()
-        
-        # Проверяем, что это число
-        try:
-            admin_id = int(user_message)
-        except ValueError:
-            await update.message.reply_text(
-                "❌ Неверный формат ID. Введите числовой ID администратора.\n\n"
-                "Пример: <code>123456789</code>",
-                parse_mode='HTML'
-            )
+        admin_id = await _read_id_input(update, "администратора")
+        if admin_id is None:
             return
         
-        # Проверяем права администратора
-        settings = get_settings()
         current_admin_id = update.effective_user.id
         
-        if current_admin_id != settings.SUPER_ADMIN_ID:
-            await update.message.reply_text("❌ Только супер-администратор может удалять администраторов.")
-            context.user_data['waiting_for_remove_admin_id'] = False
-            return
-        
         # Удаляем администратора
-        from app.services.admin_service import AdminService
-        admin_service = AdminService()
-        
-        result = await admin_service.remove_admin(admin_id, current_admin_id)
+        result = await _admin_service.remove_admin(admin_id, current_admin_id)
         
         if result['success']:
-            success_message = f"""✅ <b>Администратор удален успешно!</b>
-
-👤 <b>ID:</b> <code>{admin_id}</code>
-📅 <b>Время:</b> {datetime.now().strftime('%d.%m.%Y %H:%M')}
-
-{result['message']}
-
-✅ <b>Изменения применены мгновенно!</b>
-• Пользователь потерял доступ к админ-панели"""
+            _refresh_admin_ids()
+            success_message = _ADMIN_REMOVED_TMPL({
+                "admin_id": admin_id,
+                "time": datetime.now().strftime('%d.%m.%Y %H:%M'),
+                "message": result['message']
+            })
             
             await update.message.reply_text(success_message, parse_mode='HTML')
         else:
             await update.message.reply_text(f"❌ {result['message']}")
         
         # Очищаем состояние
-        context.user_data['waiting_for_remove_admin_id'] = False
+        context.user_data.pop('awaiting_input', None)
         
     except Exception as e:
         logger.error(f"Ошибка в handle_remove_admin_id_input: {e}")
         await update.message.reply_text("❌ Произошла ошибка при удалении администратора.")
-        context.user_data['waiting_for_remove_admin_id'] = False
+        context.user_data.pop('awaiting_input', None)
+
+
+# Сколько записей показывать в отчете о проверке подписок
+SUBSCRIPTION_REPORT_DETAILS = 10
+# Минимальный интервал между обновлениями сообщения с прогрессом (сек)
+PROGRESS_EDIT_INTERVAL = 1.0
 
 
+def _format_check_detail(detail: Dict[str, Any]) -> str:
+    """Строка отчета о проверке подписок для одной записи."""
+    action = detail.get('action')
+    if action == 'warning_sent':
+        return f"\n• ⚠️ Предупреждение: @{detail.get('username', 'unknown')} (ID: {detail['user_id']})"
+    if action == 'warning_failed':
+        return f"\n• ❌ Не отправлено: @{detail.get('username', 'unknown')} (ID: {detail['user_id']})"
+    if action == 'error':
+        return f"\n• 🔧 Ошибка: {detail['message']}"
+    return ""
+
+
+async def _edit_progress(query, text: str) -> None:
+    """Обновляет сообщение с прогрессом; ошибки не прерывают основную операцию."""
+    try:
+        await query.edit_message_text(text, parse_mode='HTML')
+    except Exception as e:
+        logger.debug(f"Не удалось обновить прогресс: {e}")
+
+
+@admin_only()
 async def admin_check_subscriptions_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик проверки подписок участников группы."""
     try:
@@ -1284,57 +1675,41 @@ async def admin_check_subscriptions_handler(update: Update, context: ContextType
             parse_mode='HTML'
         )
         
-        # Создаем сервисы
-        group_service = GroupManagementService(context.bot)
-        
-        # Выполняем проверку
-        results = await group_service.check_subscriptions_and_kick_unpaid()
+        group_service = get_group_service(context)
+        
+        # Выполняем проверку: детали приходят по мере обработки, в отчет идут первые 10,
+        # а сообщение с прогрессом обновляется не чаще раза в секунду
+        results = group_service.new_check_results()
+        detail_lines = []
+        details_count = 0
+        last_progress = time.monotonic()
+        
+        async for detail in group_service.iter_subscription_checks(results):
+            details_count += 1
+            if details_count <= SUBSCRIPTION_REPORT_DETAILS:
+                detail_lines.append(_format_check_detail(detail))
+            
+            now = time.monotonic()
+            if now - last_progress >= PROGRESS_EDIT_INTERVAL:
+                last_progress = now
+                await _edit_progress(
+                    query,
+                    "🔍 <b>Проверка подписок участников группы</b>\n\n"
+                    f"⏳ Проверено: {results['processed']} из {results['total_checked']}\n"
+                    f"⚠️ Предупреждений: {results['warnings_sent']}"
+                )
         
-        # Формируем отчет
-        report_message = f"""✅ <b>Проверка подписок завершена!</b>
-
-📊 <b>Результаты:</b>
-• 👥 Проверено участников: {results['total_checked']}
-• ⚠️ Отправлено предупреждений: {results['warnings_sent']}
-• ❌ Не удалось отправить: {results['warnings_failed']}
-• 🚫 Исключено пользователей: {results['kicked_users']}
-• 🔧 Ошибок: {results['errors']}
-
-📋 <b>Детали:</b>"""
-
-        # Добавляем детали
-        if results['details']:
-            for detail in results['details'][:10]:  # Показываем первые 10
-                if detail.get('action') == 'warning_sent':
-                    report_message += f"\n• ⚠️ Предупреждение: @{detail.get('username', 'unknown')} (ID: {detail['user_id']})"
-                elif detail.get('action') == 'warning_failed':
-                    report_message += f"\n• ❌ Не отправлено: @{detail.get('username', 'unknown')} (ID: {detail['user_id']})"
-                elif detail.get('action') == 'error':
-                    report_message += f"\n• 🔧 Ошибка: {detail['message']}"
+        # Проверка меняет статусы и подписки пользователей - счетчики и списки устарели
+        _invalidate_stats(*_USER_STATS_KEYS)
         
-        if len(results['details']) > 10:
-            report_message += f"\n• ... и еще {len(results['details']) - 10} записей"
+        # Формируем отчет: детали и, если записей больше лимита, их остаток
+        details = "".join(detail_lines)
+        if details_count > SUBSCRIPTION_REPORT_DETAILS:
+            details += f"\n• ... и еще {details_count - SUBSCRIPTION_REPORT_DETAILS} записей"
+        report_message = _SUBSCRIPTION_REPORT_TMPL({**results, "details": details})
         
-        report_message += f"""
-
-⏰ <b>Следующая проверка:</b> через 30 минут
-🔄 <b>Автоматическая проверка:</b> каждые 30 минут
-
-💡 <b>Важно:</b>
-• Пользователи получат 3 дня на оплату
-• Исключение произойдет автоматически
-• Можно добавить обратно через админ-панель
-
-📝 <b>Примечание:</b>
-• "Не удалось отправить" = пользователь не начинал диалог с ботом
-• Это нормальное поведение Telegram API
-• Пользователь все равно будет исключен через 3 дня"""
-
         # Создаем клавиатуру
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔄 Проверить еще раз", callback_data="admin_check_subscriptions")],
-            [InlineKeyboardButton("🔙 Назад", callback_data="admin_back")]
-        ])
+        keyboard = _CHECK_SUBSCRIPTIONS_KB
         
         await query.edit_message_text(report_message, reply_markup=keyboard, parse_mode='HTML')
         
@@ -1343,19 +1718,13 @@ async def admin_check_subscriptions_handler(update: Update, context: ContextType
         await query.edit_message_text("❌ Произошла ошибка при проверке подписок.")
 
 
+@admin_only()
 async def admin_send_to_group_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик кнопки 'Отправить в группу' в админ-панели."""
     try:
         query = update.callback_query
         await safe_answer_callback(query)
         
-        settings = get_settings()
-        user_id = query.from_user.id
-        
-        if user_id not in settings.admin_ids_list:
-            await query.edit_message_text("❌ У вас нет прав администратора.")
-            return
-        
         message = """📤 <b>Отправка сообщения в группу</b>
 
 Введите текст сообщения, которое будет отправлено в группу от лица бота.
@@ -1371,36 +1740,113 @@ async def admin_send_to_group_handler(update: Update, context: ContextTypes.DEFA
 • <a href="https://example.com">ссылка</a>
 • <code>моноширинный</code>"""
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад к панели", callback_data="admin_dashboard")]
-        ])
+        keyboard = _BACK_TO_DASHBOARD_KB
         
         await query.edit_message_text(message, reply_markup=keyboard, parse_mode='HTML')
         
         # Сохраняем состояние для ожидания ввода текста
-        context.user_data['waiting_for_group_message'] = True
+        context.user_data['awaiting_input'] = AdminState.AWAIT_GROUP_MESSAGE
         
     except Exception as e:
         logger.error(f"Ошибка в admin_send_to_group_handler: {e}")
         await query.edit_message_text("❌ Произошла ошибка при подготовке отправки сообщения.")
 
 
+async def _send_with_retry(bot, chat_id: int, text: str) -> None:
+    """
+    Отправляет HTML-сообщение, при превышении лимита Telegram ждет и повторяет.
+    
+    Raises:
+        Exception: Ошибка последней попытки отправки
+    """
+    for attempt in range(1, SEND_ATTEMPTS + 1):
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, parse_mode='HTML')
+            return
+        except RetryAfter as e:
+            # Превышен лимит Telegram: ждем указанное время и пробуем снова
+            if attempt == SEND_ATTEMPTS:
+                raise
+            await asyncio.sleep(e.retry_after)
+
+
+async def _notify_access_granted(bot, telegram_ids: List[int], subscription_until: datetime) -> None:
+    """Уведомляет пользователей о выданном доступе, не больше NOTIFY_CONCURRENCY отправок одновременно."""
+    text = _ACCESS_GRANTED_NOTICE_TMPL({"subscription_until": subscription_until.strftime('%d.%m.%Y')})
+    semaphore = asyncio.Semaphore(NOTIFY_CONCURRENCY)
+    
+    async def notify(telegram_id: int) -> bool:
+        async with semaphore:
+            try:
+                await _send_with_retry(bot, telegram_id, text)
+                return True
+            except Exception as e:
+                # Например, пользователь не начинал диалог с ботом
+                logger.warning(f"Не удалось уведомить пользователя {telegram_id} о выдаче доступа: {e}")
+                return False
+    
+    results = await asyncio.gather(*(notify(telegram_id) for telegram_id in telegram_ids))
+    logger.info(f"Уведомления о выдаче доступа отправлены: {sum(results)} из {len(results)}")
+
+
+async def _send_group_message(bot, admin_chat_id: int, admin_name: str, message_text: str) -> None:
+    """Отправляет сообщение в группу и сообщает администратору результат."""
+    error: Optional[Exception] = None
+    try:
+        await _send_with_retry(bot, _GROUP_ID, message_text)
+    except Exception as e:
+        error = e
+    
+    if error is None:
+        report = _GROUP_SENT_TMPL({
+            "message_text": message_text,
+            "admin_name": admin_name,
+            "time": datetime.now().strftime('%d.%m.%Y %H:%M')
+        })
+        logger.info(f"✅ Админ {admin_chat_id} отправил сообщение в группу {_GROUP_ID}: {message_text[:50]}...")
+    else:
+        report = _GROUP_SEND_FAILED_TMPL({"error": str(error)})
+        logger.error(f"Ошибка отправки сообщения в группу: {error}")
+    
+    try:
+        await bot.send_message(chat_id=admin_chat_id, text=report, parse_mode='HTML')
+    except Exception as e:
+        logger.error(f"Ошибка отправки отчета администратору {admin_chat_id}: {e}")
+
+
+async def _drain_group_send_queue(bot) -> None:
+    """Отправляет сообщения из очереди по одному и завершается, когда очередь пуста."""
+    while not _GROUP_SEND_QUEUE.empty():
+        admin_chat_id, admin_name, message_text = _GROUP_SEND_QUEUE.get_nowait()
+        try:
+            await _send_group_message(bot, admin_chat_id, admin_name, message_text)
+        except Exception as e:
+            logger.error(f"Ошибка в очереди отправки в группу: {e}")
+        finally:
+            _GROUP_SEND_QUEUE.task_done()
+
+
+def _enqueue_group_message(
+    context: ContextTypes.DEFAULT_TYPE,
+    admin_chat_id: int,
+    admin_name: str,
+    message_text: str
+) -> None:
+    """Ставит сообщение в очередь отправки в группу и при необходимости запускает обработчик очереди."""
+    global _group_send_task
+    _GROUP_SEND_QUEUE.put_nowait((admin_chat_id, admin_name, message_text))
+    # Между проверкой пустой очереди и завершением задачи нет await,
+    # поэтому новое сообщение либо заберет работающая задача, либо запустится новая
+    if _group_send_task is None or _group_send_task.done():
+        _group_send_task = context.application.create_task(_drain_group_send_queue(context.bot))
+
+
+@admin_only()
 async def handle_group_message_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик ввода текста для отправки в группу."""
     try:
-        logger.info(f"🔍 handle_group_message_input вызван для пользователя {update.effective_user.id}")
-        
         # Проверяем, ожидаем ли мы ввод сообщения для группы
-        if not context.user_data.get('waiting_for_group_message', False):
-            logger.info("   ❌ Не ожидаем ввод сообщения для группы, пропускаем")
-            return
-        
-        settings = get_settings()
-        user_id = update.effective_user.id
-        
-        if user_id not in settings.admin_ids_list:
-            await update.message.reply_text("❌ У вас нет прав администратора.")
-            context.user_data['waiting_for_group_message'] = False
+        if context.user_data.get('awaiting_input') != AdminState.AWAIT_GROUP_MESSAGE:
             return
         
         message_text = update.message.text.strip()
@@ -1409,50 +1855,16 @@ async def handle_group_message_input(update: Update, context: ContextTypes.DEFAU
             await update.message.reply_text("❌ Сообщение не может быть пустым. Попробуйте еще раз.")
             return
         
-        # Отправляем сообщение в группу
-        try:
-            telegram_service = TelegramService(context.bot)
-            
-            # Отправляем сообщение в группу
-            await telegram_service.bot.send_message(
-                chat_id=int(settings.GROUP_ID),
-                text=message_text,
-                parse_mode='HTML'
-            )
-            
-            success_message = f"""✅ <b>Сообщение отправлено в группу!</b>
-
-📝 <b>Текст:</b>
-{message_text}
-
-👤 <b>Отправил:</b> {update.effective_user.first_name}
-📅 <b>Время:</b> {datetime.now().strftime('%d.%m.%Y %H:%M')}
-
-Сообщение успешно доставлено всем участникам группы."""
-            
-            await update.message.reply_text(success_message, parse_mode='HTML')
-            
-            logger.info(f"✅ Админ {user_id} отправил сообщение в группу {settings.GROUP_ID}: {message_text[:50]}...")
-            
-        except Exception as e:
-            error_message = f"""❌ <b>Ошибка отправки сообщения</b>
-
-Не удалось отправить сообщение в группу.
-
-<b>Возможные причины:</b>
-• Бот не является администратором группы
-• Неверный ID группы
-• Техническая ошибка
-
-<b>Ошибка:</b> {str(e)}"""
-            
-            await update.message.reply_text(error_message, parse_mode='HTML')
-            logger.error(f"Ошибка отправки сообщения в группу: {e}")
+        # Отправка идет в фоне, результат придет отдельным сообщением
+        _enqueue_group_message(
+            context, update.effective_chat.id, update.effective_user.first_name, message_text
+        )
+        await update.message.reply_text("⏳ Сообщение поставлено в очередь на отправку в группу.")
         
         # Очищаем состояние
-        context.user_data['waiting_for_group_message'] = False
+        context.user_data.pop('awaiting_input', None)
         
     except Exception as e:
         logger.error(f"Ошибка в handle_group_message_input: {e}")
         await update.message.reply_text("❌ Произошла ошибка при обработке сообщения.")
-        context.user_data['waiting_for_group_message'] = False
+        context.user_data.pop('awaiting_input', None)
@@ -9,12 +9,11 @@ from telegram.ext import ContextTypes
 from loguru import logger
 from datetime import datetime, timedelta
 
-from app.core.database import get_db_session
 from app.services.user_service import UserService
 from app.services.goal_service import GoalService
 from app.services.activity_service import ActivityService, ActivityType
 from app.schemas.goal import GoalCreate
-from app.bot.decorators import require_payment
+from app.bot.decorators import require_payment, request_session
 
 
 @require_payment
@@ -68,7 +67,7 @@ async def show_goals_list(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         if not user:
             return
             
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             goal_service = GoalService(session)
             
@@ -82,17 +81,19 @@ async def show_goals_list(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             active_goals = await goal_service.get_user_active_goals(str(db_user.id))
             completed_goals = await goal_service.get_user_completed_goals(str(db_user.id), limit=5)
             
-            goals_text = f"""
+            parts = [f"""
 🎯 <b>Твои цели</b>
 
 <b>Активные цели ({len(active_goals)}):</b>
-"""
+"""]
+            append = parts.append
             
             if active_goals:
-                for i, goal in enumerate(active_goals, 1):
+                today = datetime.now().date()
+                for goal in active_goals:
                     deadline_str = ""
                     if goal.deadline:
-                        days_left = (goal.deadline.date() - datetime.now().date()).days
+                        days_left = (goal.deadline.date() - today).days
                         if days_left > 0:
                             deadline_str = f" (осталось {days_left} дн.)"
                         elif days_left == 0:
@@ -100,24 +101,25 @@ async def show_goals_list(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                         else:
                             deadline_str = f" (просрочено на {abs(days_left)} дн.)"
                     
-                    goals_text += f"• {goal.title}{deadline_str}\n"
+                    append(f"• {goal.title}{deadline_str}\n")
             else:
-                goals_text += "• Нет активных целей\n"
+                append("• Нет активных целей\n")
             
-            goals_text += f"\n<b>Выполнено недавно ({len(completed_goals)}):</b>\n"
+            append(f"\n<b>Выполнено недавно ({len(completed_goals)}):</b>\n")
             
             if completed_goals:
                 for goal in completed_goals:
                     completed_date = goal.completed_at.strftime("%d.%m") if goal.completed_at else ""
-                    goals_text += f"✅ {goal.title} ({completed_date})\n"
+                    append(f"✅ {goal.title} ({completed_date})\n")
             else:
-                goals_text += "• Нет выполненных целей\n"
+                append("• Нет выполненных целей\n")
             
-            goals_text += """
+            append("""
 <b>Помни:</b> цель без плана — это просто мечта!
 
 Что хочешь сделать?
-"""
+""")
+            goals_text = "".join(parts)
             
             keyboard = [
                 [InlineKeyboardButton("➕ Новая цель", callback_data="goal_create")],
@@ -187,7 +189,7 @@ async def show_weekly_goals(update: Update, context: ContextTypes.DEFAULT_TYPE)
         if not user:
             return
             
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             goal_service = GoalService(session)
             
@@ -205,24 +207,25 @@ async def show_weekly_goals(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 str(db_user.id), week_start, week_end
             )
             
-            weekly_text = f"""
+            parts = [f"""
 📅 <b>Цели на неделю</b>
 
 <b>Неделя {week_start.strftime('%d.%m')} - {week_end.strftime('%d.%m')}:</b>
 
-"""
+"""]
+            append = parts.append
             
             if weekly_goals:
                 completed_count = sum(1 for goal in weekly_goals if goal.is_completed)
-                weekly_text += f"<b>Прогресс: {completed_count}/{len(weekly_goals)} целей</b>\n\n"
+                append(f"<b>Прогресс: {completed_count}/{len(weekly_goals)} целей</b>\n\n")
                 
                 for goal in weekly_goals:
                     status = "✅" if goal.is_completed else "⏳"
-                    weekly_text += f"{status} {goal.title}\n"
+                    append(f"{status} {goal.title}\n")
             else:
-                weekly_text += "• Нет целей на эту неделю\n"
+                append("• Нет целей на эту неделю\n")
             
-            weekly_text += """
+            append("""
 
 <b>Рекомендации для недельных целей:</b>
 • 3-5 конкретных задач
@@ -231,7 +234,8 @@ async def show_weekly_goals(update: Update, context: ContextTypes.DEFAULT_TYPE)
 • 1 привычка для внедрения
 
 <b>Помни:</b> каждая неделя — это новый шанс стать лучше!
-"""
+""")
+            weekly_text = "".join(parts)
             
             keyboard = [
                 [InlineKeyboardButton("➕ Добавить цель на неделю", callback_data="goal_create")],
@@ -257,7 +261,7 @@ async def show_goals_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         if not user:
             return
             
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             goal_service = GoalService(session)
             
@@ -324,13 +328,13 @@ async def show_goals_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 async def complete_goal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Отметить цель как выполненную."""
     try:
-        goal_id = update.callback_query.data.replace("goal_complete_", "")
+        goal_id = update.callback_query.data.removeprefix("goal_complete_")
         
         user = update.effective_user
         if not user:
             return
             
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             goal_service = GoalService(session)
             activity_service = ActivityService(session)
@@ -393,9 +397,9 @@ async def complete_goal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 async def delete_goal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Удалить цель."""
     try:
-        goal_id = update.callback_query.data.replace("goal_delete_", "")
+        goal_id = update.callback_query.data.removeprefix("goal_delete_")
         
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             goal_service = GoalService(session)
             
             # Получаем цель перед удалением
@@ -472,7 +476,7 @@ async def handle_goal_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text("❌ Цель не может быть пустой. Попробуй еще раз.")
             return
         
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             goal_service = GoalService(session)
             activity_service = ActivityService(session)
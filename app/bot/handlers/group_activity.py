@@ -10,11 +10,43 @@ from telegram import Update
 from telegram.ext import ContextTypes, MessageHandler, filters
 from loguru import logger
 
-from app.core.database import get_db_session
+from app.bot.decorators import request_session
 from app.services import ActivityService, UserService
 from app.models.activity import ActivityType
+from app.schemas.activity import ChatActivityCreate
+from app.schemas.user import UserCreate, UserUpdate
 from config.settings import get_settings
 
+# ID основной группы (строкой, как в настройках): читается один раз, а не на каждое сообщение
+_GROUP_ID: str = get_settings().GROUP_ID
+
+
+def _message_kind(message) -> str:
+    """Тип сообщения для логирования."""
+    if message.video_note:
+        return "видеосообщение"
+    if message.voice:
+        return "голосовое"
+    if message.video:
+        return "видео"
+    if message.audio:
+        return "аудио"
+    if message.photo:
+        return "фото"
+    if message.animation:
+        return "GIF"
+    if message.sticker:
+        return "стикер"
+    if message.document:
+        return "документ"
+    if message.poll:
+        return "опрос"
+    if message.location:
+        return "геолокация"
+    if message.contact:
+        return "контакт"
+    return "текст"
+
 
 async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -31,13 +63,12 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
             return
             
         base_chat_id = str(update.message.chat.id)
-        settings = get_settings()
         
-        logger.debug(f"Получено сообщение из чата {base_chat_id}, ожидаем {settings.GROUP_ID}")
+        logger.debug("Получено сообщение из чата {}, ожидаем {}", base_chat_id, _GROUP_ID)
         
         # Проверяем, что сообщение из нашей группы
-        if base_chat_id != settings.GROUP_ID:
-            logger.debug(f"Сообщение не из нашей группы: {base_chat_id} != {settings.GROUP_ID}")
+        if base_chat_id != _GROUP_ID:
+            logger.debug("Сообщение не из нашей группы: {} != {}", base_chat_id, _GROUP_ID)
             return
         
         # Определяем полный ID чата с учетом топика
@@ -45,10 +76,10 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         if update.message.message_thread_id:
             # Это сообщение из топика
             chat_id = f"{base_chat_id}_{update.message.message_thread_id}"
-            logger.debug(f"Сообщение из топика: {chat_id}")
+            logger.debug("Сообщение из топика: {}", chat_id)
         else:
             # Это сообщение из основной группы
-            logger.debug(f"Сообщение из основной группы: {chat_id}")
+            logger.debug("Сообщение из основной группы: {}", chat_id)
             
         # Проверяем, что это не бот
         if update.message.from_user.is_bot:
@@ -58,34 +89,16 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         user = update.message.from_user
         message = update.message
         
-        # Определяем тип сообщения для логирования
-        message_type = "текст"
-        if message.video_note:
-            message_type = "видеосообщение"
-        elif message.voice:
-            message_type = "голосовое"
-        elif message.video:
-            message_type = "видео"
-        elif message.audio:
-            message_type = "аудио"
-        elif message.photo:
-            message_type = "фото"
-        elif message.animation:
-            message_type = "GIF"
-        elif message.sticker:
-            message_type = "стикер"
-        elif message.document:
-            message_type = "документ"
-        elif message.poll:
-            message_type = "опрос"
-        elif message.location:
-            message_type = "геолокация"
-        elif message.contact:
-            message_type = "контакт"
+        # Сообщение логируется на каждое событие в группе - форматируем только при уровне DEBUG
+        logger.opt(lazy=True).debug(
+            "📝 {} в группе от пользователя {} (@{}): {}",
+            lambda: _message_kind(message).title(),
+            lambda: user.id,
+            lambda: user.username,
+            lambda: (message.text or message.caption or "")[:50]
+        )
         
-        logger.info(f"📝 {message_type.title()} в группе от пользователя {user.id} (@{user.username}): {message.text[:50] if message.text else message.caption[:50] if message.caption else ''}")
-        
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             activity_service = ActivityService(session)
             
@@ -93,8 +106,6 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
             db_user = await user_service.get_user_by_telegram_id(user.id)
             if not db_user:
                 logger.info(f"Создаем нового пользователя {user.id} из активности в группе")
-                from app.schemas.user import UserCreate
-                
                 user_data = UserCreate(
                     telegram_id=user.id,
                     username=user.username,
@@ -108,7 +119,6 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
             
             # Обновляем статус участия в группе
             if not db_user.is_in_group:
-                from app.schemas.user import UserUpdate
                 await user_service.update_user(str(db_user.id), UserUpdate(
                     is_in_group=True,
                     joined_group_at=datetime.now()
@@ -189,8 +199,6 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
                 media_file_size = message.sticker.file_size
             
             # Создаем запись активности
-            from app.schemas.activity import ChatActivityCreate
-            
             activity_data = ChatActivityCreate(
                 user_id=str(db_user.id),
                 chat_id=chat_id,
@@ -210,7 +218,7 @@ async def group_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
             # Записываем активность в изолированной сессии, чтобы не откатывалась при ошибках
             try:
                 await ActivityService.record_activity_isolated(activity_data)
-                logger.info(f"✅ Сохранена активность: {activity_type} от пользователя {user.id} (@{user.username}) в чате {chat_id}")
+                logger.debug("Сохранена активность: {} от пользователя {} в чате {}", activity_type, user.id, chat_id)
             except Exception as activity_error:
                 logger.error(f"❌ Ошибка записи активности: {activity_error}")
                 # Не прерываем основной поток обработки
@@ -234,10 +242,9 @@ async def group_member_handler(update: Update, context: ContextTypes.DEFAULT_TYP
             return
             
         chat_id = str(update.message.chat.id)
-        settings = get_settings()
         
         # Проверяем, что это наша группа
-        if chat_id != settings.GROUP_ID:
+        if chat_id != _GROUP_ID:
             return
             
         for new_member in update.message.new_chat_members:
@@ -246,14 +253,12 @@ async def group_member_handler(update: Update, context: ContextTypes.DEFAULT_TYP
                 
             logger.info(f"👋 Новый участник группы: {new_member.id} (@{new_member.username})")
             
-            async with get_db_session() as session:
+            async with request_session(context) as session:
                 user_service = UserService(session)
                 
                 # Получаем или создаем пользователя
                 db_user = await user_service.get_user_by_telegram_id(new_member.id)
                 if not db_user:
-                    from app.schemas.user import UserCreate
-                    
                     user_data = UserCreate(
                         telegram_id=new_member.id,
                         username=new_member.username,
@@ -266,7 +271,6 @@ async def group_member_handler(update: Update, context: ContextTypes.DEFAULT_TYP
                     await user_service.create_user(user_data)
                 else:
                     # Обновляем статус участия в группе
-                    from app.schemas.user import UserUpdate
                     await user_service.update_user(str(db_user.id), UserUpdate(
                         is_in_group=True,
                         joined_group_at=datetime.now()
@@ -291,10 +295,9 @@ async def group_left_member_handler(update: Update, context: ContextTypes.DEFAUL
             return
             
         chat_id = str(update.message.chat.id)
-        settings = get_settings()
         
         # Проверяем, что это наша группа
-        if chat_id != settings.GROUP_ID:
+        if chat_id != _GROUP_ID:
             return
             
         left_member = update.message.left_chat_member
@@ -303,13 +306,12 @@ async def group_left_member_handler(update: Update, context: ContextTypes.DEFAUL
             
         logger.info(f"👋 Участник покинул группу: {left_member.id} (@{left_member.username})")
         
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             
             # Обновляем статус участия в группе
             db_user = await user_service.get_user_by_telegram_id(left_member.id)
             if db_user:
-                from app.schemas.user import UserUpdate
                 await user_service.update_user(str(db_user.id), UserUpdate(
                     is_in_group=False
                 ))
@@ -6,7 +6,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from loguru import logger
 
-from app.core.database import get_db_session
+from app.bot.decorators import request_session
 from app.services.user_service import UserService
 
 
@@ -24,7 +24,7 @@ async def handle_group_info(update: Update, context: ContextTypes.DEFAULT_TYPE)
             return
             
         # Проверяем что пользователь админ
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
             db_user = await user_service.get_user_by_telegram_id(user.id)
             
@@ -48,7 +48,7 @@ async def handle_group_info(update: Update, context: ContextTypes.DEFAULT_TYPE)
             info_lines.append(f"📄 **Описание:** {chat.description}")
             
         # Добавляем специальную информацию для групп
-        if chat.type in ['group', 'supergroup']:
+        if chat.type in {'group', 'supergroup'}:
             info_lines.extend([
                 "",
                 "⚙️ **Для настройки бота:**",
@@ -9,7 +9,6 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from loguru import logger
 
-from app.core.database import get_db_session
 
 
 async def safe_answer_callback(query, text: str = None) -> bool:
@@ -34,13 +33,55 @@ async def safe_answer_callback(query, text: str = None) -> bool:
             logger.error(f"Ошибка ответа на callback query: {e}")
             return False
 from app.services.user_service import UserService
-from app.services.telegram_service import TelegramService
+from app.bot.decorators import invalidate_user_cache, get_telegram_service, request_session
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 from config.settings import settings
 
 
+# Статичные клавиатуры: кнопки не зависят от запроса, собираются один раз
+_PAYMENT_OFFER_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💳 Оплатить доступ", callback_data="payment_options")],
+    [InlineKeyboardButton("📘 Узнать больше", callback_data="about_club")]
+])
+
+_NOT_SUBSCRIBED_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👥 Присоединиться", url="https://t.me/+hWoFGCMcaI83YTY0")],
+    [InlineKeyboardButton("🔄 Проверить снова", callback_data="check_subscription")],
+    [InlineKeyboardButton("🔙 Назад", callback_data="back_to_start")]
+])
+
+_PAYMENT_OPTIONS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💎 Выбрать способ оплаты", callback_data="choose_payment_method")],
+    [InlineKeyboardButton("🔙 Назад", callback_data="back_to_start")]
+])
+
+_PAYMENT_METHODS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("₿ Криптовалюта (USDT, TON, BTC, ETH)", callback_data="pay_crypto_monthly")],
+    [InlineKeyboardButton("💳 Зарубежная карта (Euro)", callback_data="pay_card_monthly")],
+    [InlineKeyboardButton("📱 СБП (Rub)", callback_data="pay_sbp_monthly")],
+    [InlineKeyboardButton("🔙 Назад", callback_data="payment_options")]
+])
+
+_BACK_TO_START_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Назад", callback_data="back_to_start")]
+])
+
+_BACK_TO_PAYMENT_OPTIONS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Назад", callback_data="payment_options")]
+])
+
+_BACK_TO_SUBSCRIPTION_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Назад", callback_data="subscription_confirmed")]
+])
+
+_PAYMENT_DONE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💬 Группа клуба", url="https://t.me/+hWoFGCMcaI83YTY0")],
+    [InlineKeyboardButton("ℹ️ О клубе", callback_data="about_club")]
+])
+
+
 async def main_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Основной обработчик callback'ов согласно ТЗ.
@@ -94,14 +135,17 @@ async def handle_subscription_check(update: Update, context: ContextTypes.DEFAUL
     """Обработка проверки подписки согласно ТЗ."""
     try:
         user = update.effective_user
-        telegram_service = TelegramService(context.bot)
+        telegram_service = get_telegram_service(context)
+        
+        # Явная повторная проверка - без кэша, пользователь мог только что вступить
+        invalidate_user_cache(context, user.id)
         
         # Проверяем подписку на канал
         is_subscribed = await telegram_service.check_user_subscription(user.id)
         
         if is_subscribed:
             # Пользователь подписан
-            async with get_db_session() as session:
+            async with request_session(context) as session:
                 user_service = UserService(session)
                 db_user = await user_service.get_user_by_telegram_id(user.id)
                 
@@ -128,10 +172,7 @@ async def handle_subscription_check(update: Update, context: ContextTypes.DEFAUL
 
 🚀 Готов оплатить доступ и войти в ЯДРО?"""
             
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("💳 Оплатить доступ", callback_data="payment_options")],
-                [InlineKeyboardButton("📘 Узнать больше", callback_data="about_club")]
-            ])
+            keyboard = _PAYMENT_OFFER_KB
             
         else:
             # Пользователь не подписан
@@ -153,11 +194,7 @@ async def handle_subscription_check(update: Update, context: ContextTypes.DEFAUL
 • Общение с участниками клуба
 """
             
-            keyboard = InlineKeyboardMarkup([
-                [InlineKeyboardButton("👥 Присоединиться", url="https://t.me/+hWoFGCMcaI83YTY0")],
-                [InlineKeyboardButton("🔄 Проверить снова", callback_data="check_subscription")],
-                [InlineKeyboardButton("🔙 Назад", callback_data="back_to_start")]
-            ])
+            keyboard = _NOT_SUBSCRIBED_KB
         
         await update.callback_query.edit_message_text(
             message,
@@ -192,10 +229,7 @@ async def handle_payment_options(update: Update, context: ContextTypes.DEFAULT_T
 🎯 <b>Один тариф - максимальная ценность!</b>
 """
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("💎 Выбрать способ оплаты", callback_data="choose_payment_method")],
-            [InlineKeyboardButton("🔙 Назад", callback_data="back_to_start")]
-        ])
+        keyboard = _PAYMENT_OPTIONS_KB
         
         await update.callback_query.edit_message_text(
             message,
@@ -217,12 +251,7 @@ async def handle_choose_payment_method(update: Update, context: ContextTypes.DEF
 
 Выберите удобный для вас способ оплаты:"""
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("₿ Криптовалюта (USDT, TON, BTC, ETH)", callback_data="pay_crypto_monthly")],
-            [InlineKeyboardButton("💳 Зарубежная карта (Euro)", callback_data="pay_card_monthly")],
-            [InlineKeyboardButton("📱 СБП (Rub)", callback_data="pay_sbp_monthly")],
-            [InlineKeyboardButton("🔙 Назад", callback_data="payment_options")]
-        ])
+        keyboard = _PAYMENT_METHODS_KB
         
         await update.callback_query.edit_message_text(
             message,
@@ -239,10 +268,10 @@ async def handle_about_club(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """Обработка показа информации о клубе."""
     try:
         user = update.effective_user
-        telegram_service = TelegramService(context.bot)
+        telegram_service = get_telegram_service(context)
         
         # Проверяем, есть ли у пользователя активная подписка
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             from app.services.user_service import UserService
             user_service = UserService(session)
             
@@ -264,10 +293,10 @@ async def handle_back_to_start(update: Update, context: ContextTypes.DEFAULT_TYP
     """Обработка возврата к стартовому сообщению."""
     try:
         user = update.effective_user
-        telegram_service = TelegramService(context.bot)
+        telegram_service = get_telegram_service(context)
         
         # Проверяем статус подписки пользователя
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             from app.services.user_service import UserService
             user_service = UserService(session)
             
@@ -306,7 +335,7 @@ async def handle_payment_create(update: Update, context: ContextTypes.DEFAULT_TY
         callback_data = query.data
         
         # Извлекаем тип платежа
-        payment_type = callback_data.replace("pay_", "").replace("_monthly", "")
+        payment_type = callback_data.removeprefix("pay_").removesuffix("_monthly")
         
         if payment_type == "crypto":
             await handle_crypto_payment(update, context)
@@ -380,7 +409,7 @@ async def handle_crypto_payment(update: Update, context: ContextTypes.DEFAULT_TY
             )
             
             # Сохраняем информацию о счете в базе данных
-            async with get_db_session() as session:
+            async with request_session(context) as session:
                 from app.services.payment_service import PaymentService
                 from app.services.user_service import UserService
                 
@@ -393,9 +422,7 @@ async def handle_crypto_payment(update: Update, context: ContextTypes.DEFAULT_TY
                     logger.error(f"Пользователь с Telegram ID {user.id} не найден в базе данных")
                     await query.edit_message_text(
                         "❌ Ошибка: пользователь не найден. Попробуйте команду /start.",
-                        reply_markup=InlineKeyboardMarkup([
-                            [InlineKeyboardButton("🔙 Назад", callback_data="back_to_start")]
-                        ])
+                        reply_markup=_BACK_TO_START_KB
                     )
                     return
                 
@@ -415,9 +442,7 @@ async def handle_crypto_payment(update: Update, context: ContextTypes.DEFAULT_TY
         else:
             await query.edit_message_text(
                 "❌ Ошибка создания счета. Попробуйте позже.",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🔙 Назад", callback_data="payment_options")]
-                ])
+                reply_markup=_BACK_TO_PAYMENT_OPTIONS_KB
             )
         
     except Exception as e:
@@ -450,9 +475,7 @@ async def handle_card_payment(update: Update, context: ContextTypes.DEFAULT_TYPE
 • Доступ активируется после проверки администратором
 """
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад", callback_data="subscription_confirmed")]
-        ])
+        keyboard = _BACK_TO_SUBSCRIPTION_KB
         
         await update.callback_query.edit_message_text(
             message,
@@ -490,9 +513,7 @@ async def handle_sbp_payment(update: Update, context: ContextTypes.DEFAULT_TYPE)
 • Доступ активируется после проверки администратором
 """
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🔙 Назад", callback_data="subscription_confirmed")]
-        ])
+        keyboard = _BACK_TO_SUBSCRIPTION_KB
         
         await update.callback_query.edit_message_text(
             message,
@@ -514,7 +535,7 @@ async def handle_payment_check(update: Update, context: ContextTypes.DEFAULT_TYP
         callback_data = query.data
         
         # Извлекаем ID счета
-        invoice_id = callback_data.replace("check_payment_", "")
+        invoice_id = callback_data.removeprefix("check_payment_")
         
         # Импортируем сервисы
         from app.services.crypto_service import CryptoService
@@ -527,7 +548,7 @@ async def handle_payment_check(update: Update, context: ContextTypes.DEFAULT_TYP
             
             if status == "paid":
                 # Платеж выполнен - активируем доступ
-                async with get_db_session() as session:
+                async with request_session(context) as session:
                     from app.services.payment_service import PaymentService
                     from app.services.user_service import UserService
                     
@@ -562,6 +583,7 @@ async def handle_payment_check(update: Update, context: ContextTypes.DEFAULT_TYP
                                 subscription_end=subscription_end
                             ))
                             
+                            invalidate_user_cache(context, user.id)
                             logger.info(f"Активирована подписка для пользователя {user.id} до {subscription_end}")
                 
                 message = """
@@ -581,10 +603,7 @@ async def handle_payment_check(update: Update, context: ContextTypes.DEFAULT_TYP
 Начинаем трансформацию уже сегодня 💪
 """
                 
-                keyboard = InlineKeyboardMarkup([
-                    [InlineKeyboardButton("💬 Группа клуба", url="https://t.me/+hWoFGCMcaI83YTY0")],
-                    [InlineKeyboardButton("ℹ️ О клубе", callback_data="about_club")]
-                ])
+                keyboard = _PAYMENT_DONE_KB
                 
             elif status == "active":
                 # Счет создан, но не оплачен
@@ -429,23 +429,26 @@ async def show_report_history(update: Update, context: ContextTypes.DEFAULT_TYPE
 <b>Начни писать отчеты, чтобы отслеживать свой прогресс!</b>
 """
         else:
-            history_text = """
+            parts = ["""
 📋 <b>История отчетов</b>
 
 <b>За последние 7 дней:</b>
 
-"""
+"""]
+            append = parts.append
             
             for report in reports[:5]:  # Показываем только последние 5
                 status_emoji = "✅" if report.is_submitted else "⏭️" if report.is_skipped else "⏳"
-                history_text += f"{status_emoji} {report.report_date.strftime('%d.%m')} - {report.status_display}\n"
+                append(f"{status_emoji} {report.report_date.strftime('%d.%m')} - {report.status_display}\n")
                 
                 if report.is_submitted and report.content:
                     # Показываем первые 50 символов
                     preview = report.content[:50] + "..." if len(report.content) > 50 else report.content
-                    history_text += f"   📝 {preview}\n"
+                    append(f"   📝 {preview}\n")
                 
-                history_text += "\n"
+                append("\n")
+            
+            history_text = "".join(parts)
         
         keyboard = [
             [InlineKeyboardButton("📝 Написать отчет", callback_data="report_write")],
@@ -241,7 +241,7 @@ async def start_ritual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             return
         
         # Получаем ID ритуала
-        ritual_id = update.callback_query.data.replace("ritual_start_", "")
+        ritual_id = update.callback_query.data.removeprefix("ritual_start_")
         
         # Получаем сервисы
         user_service = UserService(context.bot_data.get('session'))
@@ -409,7 +409,7 @@ async def skip_ritual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             return
         
         # Получаем ID ритуала
-        ritual_id = update.callback_query.data.replace("ritual_skip_", "")
+        ritual_id = update.callback_query.data.removeprefix("ritual_skip_")
         
         # Получаем сервисы
         user_service = UserService(context.bot_data.get('session'))
@@ -492,7 +492,7 @@ async def cancel_ritual(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
             return
         
         # Получаем ID ритуала
-        ritual_id = update.callback_query.data.replace("ritual_cancel_", "")
+        ritual_id = update.callback_query.data.removeprefix("ritual_cancel_")
         
         # Получаем сервисы
         user_service = UserService(context.bot_data.get('session'))
@@ -624,7 +624,7 @@ async def show_ritual_stats_detail(update: Update, context: ContextTypes.DEFAULT
             return
         
         # Получаем тип статистики
-        stats_type = update.callback_query.data.replace("ritual_stats_", "")
+        stats_type = update.callback_query.data.removeprefix("ritual_stats_")
         
         # Получаем сервисы
         user_service = UserService(context.bot_data.get('session'))
@@ -9,8 +9,8 @@ from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 from loguru import logger
 
-from app.core.database import get_db_session
-from app.services import UserService, TelegramService
+from app.services import UserService
+from app.bot.decorators import get_telegram_service, invalidate_user_cache, request_session
 from app.schemas.user import UserCreate
 
 
@@ -32,11 +32,13 @@ async def start_command_handler(update: Update, context: ContextTypes.DEFAULT_TY
             return
         
         # Получаем сессию базы данных
-        async with get_db_session() as session:
+        async with request_session(context) as session:
             user_service = UserService(session)
-            telegram_service = TelegramService(context.bot)
+            telegram_service = get_telegram_service(context)
             
-            # Сначала проверяем подписку на группу "ЯДРО КЛУБА / ОСНОВА PUTИ" согласно ТЗ
+            # Сначала проверяем подписку на группу "ЯДРО КЛУБА / ОСНОВА PUTИ" согласно ТЗ.
+            # /start - явная повторная проверка, поэтому кэш подписки не используем
+            invalidate_user_cache(context, user.id)
             is_subscribed = await telegram_service.check_user_subscription(user.id)
             
             if not is_subscribed:
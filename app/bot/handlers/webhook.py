@@ -4,24 +4,36 @@
 Обрабатывает уведомления об оплаченных счетах от CryptoBot API.
 """
 
-from typing import Dict, Any
-from telegram import Update
-from telegram.ext import ContextTypes
+from typing import Dict, Any, Optional
+from telegram import Bot, Update
+from telegram.ext import Application, ContextTypes
 from loguru import logger
 
+from app.bot.decorators import invalidate_application_user_cache
 from app.core.database import get_db_session
 from app.services.crypto_service import CryptoService
+from app.services.group_management_service import GroupManagementService
 from app.services.payment_service import PaymentService
 from app.services.user_service import UserService
 from app.services.telegram_service import TelegramService
+from config.settings import get_settings
 
 
-async def process_cryptobot_webhook(webhook_data: Dict[str, Any]) -> bool:
+# Настройки читаются один раз при загрузке модуля
+_SETTINGS = get_settings()
+
+
+async def process_cryptobot_webhook(
+    webhook_data: Dict[str, Any],
+    application: Optional[Application] = None
+) -> bool:
     """
     Обработка webhook от CryptoBot согласно документации.
     
     Args:
         webhook_data: Данные webhook от CryptoBot
+        application: Приложение бота, если сервер webhook работает в одном процессе
+            с ботом - для сброса кэша проверок оплаты пользователя
         
     Returns:
         bool: True если обработано успешно
@@ -76,20 +88,19 @@ async def process_cryptobot_webhook(webhook_data: Dict[str, Any]) -> bool:
                         
                         logger.info(f"Активирована подписка для пользователя {db_user.telegram_id} до {subscription_end}")
                         
+                        # Сбрасываем кэш проверок оплаты, чтобы доступ открылся сразу.
+                        # Если бот работает в другом процессе (run_webhook.py), кэш там
+                        # недоступен и устареет сам - не дольше чем через USER_CACHE_TTL
+                        if application is not None:
+                            invalidate_application_user_cache(application, db_user.telegram_id)
+                        
+                        # Один бот на добавление в группу и уведомление пользователя
+                        bot = Bot(token=_SETTINGS.BOT_TOKEN)
+                        telegram_service = TelegramService(bot)
+                        
                         # Автоматически добавляем пользователя в группу
                         try:
-                            from app.services.group_management_service import GroupManagementService
-                            from app.services.telegram_service import TelegramService
-                            from config.settings import get_settings
-                            
-                            # Создаем бота для отправки уведомления
-                            settings = get_settings()
-                            from telegram import Bot
-                            bot = Bot(token=settings.BOT_TOKEN)
-                            telegram_service = TelegramService(bot)
-                            
-                            # Создаем сервис управления группой
-                            group_service = GroupManagementService(telegram_service, settings)
+                            group_service = GroupManagementService(bot)
                             
                             # Автоматически добавляем пользователя в группу
                             added_to_group = await group_service.auto_add_paid_user_to_group(db_user.telegram_id)
@@ -104,15 +115,6 @@ async def process_cryptobot_webhook(webhook_data: Dict[str, Any]) -> bool:
                         
                         # Отправляем уведомление пользователю о успешной оплате
                         try:
-                            from app.services.telegram_service import TelegramService
-                            from config.settings import get_settings
-                            
-                            # Создаем бота для отправки уведомления
-                            settings = get_settings()
-                            from telegram import Bot
-                            bot = Bot(token=settings.BOT_TOKEN)
-                            telegram_service = TelegramService(bot)
-                            
                             # Отправляем сообщение об успешной активации
                             success_message = (
                                 f"🎉 Поздравляем!\n\n"
@@ -122,10 +124,7 @@ async def process_cryptobot_webhook(webhook_data: Dict[str, Any]) -> bool:
                                 f"Добро пожаловать в клуб ОСНОВА ПУТИ! 🚀"
                             )
                             
-                            await telegram_service.send_message(
-                                chat_id=db_user.telegram_id,
-                                text=success_message
-                            )
+                            await telegram_service.send_message(db_user.telegram_id, success_message)
                             
                             logger.info(f"Отправлено уведомление об активации подписки пользователю {db_user.telegram_id}")
                             
@@ -4,7 +4,7 @@
 Содержит конфигурацию подключения к базе данных и сессии.
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
@@ -23,12 +23,29 @@ class Base(DeclarativeBase):
     pass
 
 
+# Размер кэша скомпилированных SQL-выражений SQLAlchemy
+QUERY_CACHE_SIZE = 1000
+# Размер кэша подготовленных запросов на каждом соединении драйвера
+STATEMENT_CACHE_SIZE = 256
+
+
+def _connect_args(database_url: str) -> Dict[str, Any]:
+    """Параметры драйвера БД: кэш подготовленных запросов на соединении."""
+    if database_url.startswith("sqlite"):
+        return {"cached_statements": STATEMENT_CACHE_SIZE}
+    if "+asyncpg" in database_url:
+        return {"prepared_statement_cache_size": STATEMENT_CACHE_SIZE}
+    return {}
+
+
 # Создание асинхронного движка базы данных
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     pool_pre_ping=True,
     pool_recycle=300,
+    query_cache_size=QUERY_CACHE_SIZE,
+    connect_args=_connect_args(settings.DATABASE_URL),
 )
 
 # Создание фабрики сессий
@@ -38,6 +55,14 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Фабрика сессий только для чтения: тот же пул соединений, но в режиме
+# AUTOCOMMIT, без BEGIN/COMMIT вокруг запросов статистики
+readonly_session_maker = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 async def get_database() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -99,6 +124,25 @@ async def get_isolated_session():
             await session.close()
 
 
+@asynccontextmanager
+async def get_db_session_readonly():
+    """
+    Получение сессии базы данных только для чтения (контекстный менеджер).
+    
+    Запросы выполняются в режиме AUTOCOMMIT, поэтому сессия не открывает
+    транзакцию. Изменения через нее не записывать.
+    
+    Yields:
+        AsyncSession: Асинхронная сессия базы данных
+    """
+    async with readonly_session_maker() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Ошибка в сессии базы данных (чтение): {e}")
+            raise
+
+
 async def init_database() -> None:
     """Инициализация базы данных."""
     try:
@@ -8,7 +8,7 @@
 """
 
 from datetime import datetime, date
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Date, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Date, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from enum import Enum
 
@@ -53,6 +53,10 @@ class ChatActivity(BaseModel):
     для последующего анализа и построения статистики.
     """
     __tablename__ = "chat_activities"
+    __table_args__ = (
+        # Для статистики и топа пользователей по чату за период
+        Index("ix_chat_activities_chat_date_user", "chat_id", "activity_date", "user_id"),
+    )
 
     # Основная информация
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False, comment="ID пользователя")
@@ -7,7 +7,7 @@
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from sqlalchemy import BigInteger, DateTime, Numeric, String, Text, ForeignKey
+from sqlalchemy import BigInteger, DateTime, Numeric, String, Text, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel
@@ -35,6 +35,12 @@ class Payment(BaseModel):
     """Модель платежа."""
     
     __tablename__ = "payments"
+    __table_args__ = (
+        # Для последних платежей (ORDER BY created_at DESC LIMIT n)
+        Index("ix_payments_created_at", "created_at"),
+        # Для сумм оплат за период
+        Index("ix_payments_paid_at", "paid_at"),
+    )
     
     # ID пользователя (связь с таблицей users)
     user_id: Mapped[str] = mapped_column(
@@ -6,7 +6,7 @@
 
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import BigInteger, Boolean, DateTime, String, Text, Integer
+from sqlalchemy import BigInteger, Boolean, DateTime, String, Text, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel
@@ -25,6 +25,12 @@ class User(BaseModel):
     """Модель пользователя Telegram."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Для постраничного вывода пользователей по (created_at, id)
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Для выборок по статусу (ожидающие доступа) с сортировкой по дате
+        Index("ix_users_status_created_at", "status", "created_at"),
+    )
     
     # Telegram ID пользователя
     telegram_id: Mapped[int] = mapped_column(
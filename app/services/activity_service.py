@@ -8,6 +8,7 @@
 - Создания еженедельных отчетов
 """
 
+import heapq
 import json
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict, Any, Tuple
@@ -15,7 +16,7 @@ from sqlalchemy import select, and_, or_, func, desc
 from sqlalchemy.orm import selectinload
 from loguru import logger
 
-from app.core.database import AsyncSession
+from app.core.database import AsyncSession, get_db_session_readonly
 from app.core.exceptions import BaseException
 from app.models import (
     ChatActivity, UserActivity, ActivitySummary, WeeklyReport, User,
@@ -27,6 +28,10 @@ from app.schemas.activity import (
 )
 
 
+# Имя для пользователей без first_name в топах активности
+UNKNOWN_USER_NAME = "Неизвестно"
+
+
 class ActivityException(BaseException):
     """Исключение для ошибок системы активности."""
     pass
@@ -35,6 +40,13 @@ class ActivityException(BaseException):
 class ActivityService:
     """Сервис для управления активностью пользователей."""
     
+    # Снимок статистики экрана активности админ-панели: (время расчета UTC, статистика).
+    # Пересчитывается планировщиком, чтобы не агрегировать таблицу активности на каждое нажатие
+    DASHBOARD_DAYS = 7
+    DASHBOARD_TOP_LIMIT = 100
+    DASHBOARD_SNAPSHOT_TTL = timedelta(minutes=5)
+    _dashboard_snapshot: Optional[Tuple[datetime, Dict[str, Any]]] = None
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
@@ -577,60 +589,27 @@ class ActivityService:
             logger.error(f"Ошибка получения количества активных пользователей: {e}")
             return 0
     
-    async def get_activity_stats_for_date(self, target_date: date) -> Dict[str, Any]:
-        """Получение статистики активности за дату."""
-        try:
-            # Количество сообщений за дату
-            messages_stmt = select(func.count(ChatActivity.id)).where(
-                func.date(ChatActivity.activity_date) == target_date
-            )
-            messages_result = await self.session.execute(messages_stmt)
-            messages_count = messages_result.scalar() or 0
-            
-            # Количество активных пользователей за дату
-            users_stmt = select(func.count(func.distinct(ChatActivity.user_id))).where(
-                func.date(ChatActivity.activity_date) == target_date
-            )
-            users_result = await self.session.execute(users_stmt)
-            active_users = users_result.scalar() or 0
-            
-            return {
-                'messages': messages_count,
-                'active_users': active_users
-            }
-        except Exception as e:
-            logger.error(f"Ошибка получения статистики активности за {target_date}: {e}")
-            return {'messages': 0, 'active_users': 0}
-    
-    async def get_top_active_users(self, days: int = 7, limit: int = 10) -> List[Dict[str, Any]]:
-        """Получение топ активных пользователей за период."""
+    async def get_top_active_users(self, days: int = 7, limit: int = 10) -> List[Tuple[str, str, int]]:
+        """Получение топ активных пользователей за период: (имя, username, количество сообщений)."""
         try:
             since_date = datetime.utcnow().date() - timedelta(days=days)
             
+            # Пустые имена заменяются в SQL, чтобы строки можно было выводить без проверок
             stmt = (
                 select(
-                    ChatActivity.user_id,
-                    User.first_name,
-                    User.username,
+                    func.coalesce(User.first_name, UNKNOWN_USER_NAME),
+                    func.coalesce(User.username, ""),
                     func.count(ChatActivity.id).label('activity_count')
                 )
                 .join(User, ChatActivity.user_id == User.id)
-                .where(func.date(ChatActivity.activity_date) >= since_date)
+                .where(ChatActivity.activity_date >= since_date)
                 .group_by(ChatActivity.user_id, User.first_name, User.username)
                 .order_by(func.count(ChatActivity.id).desc())
                 .limit(limit)
             )
             
             result = await self.session.execute(stmt)
-            return [
-                {
-                    'user_id': row.user_id,
-                    'first_name': row.first_name,
-                    'username': row.username,
-                    'activity_count': row.activity_count
-                }
-                for row in result
-            ]
+            return [tuple(row) for row in result]
         except Exception as e:
             logger.error(f"Ошибка получения топ активных пользователей: {e}")
             return []
@@ -718,90 +697,65 @@ class ActivityService:
             return {'messages': 0, 'active_users': 0}
     
     async def get_activity_stats_by_chat(self, start_date: date, end_date: date) -> Dict[str, Dict[str, Any]]:
-        """Получить статистику активности по чатам за период."""
+        """Получить статистику активности по всем чатам за период."""
+        return await self.get_activity_stats_for_chats(None, start_date, end_date)
+    
+    async def get_activity_stats_for_chats(
+        self,
+        chat_ids: Optional[List[str]],
+        start_date: date,
+        end_date: date
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Получить статистику активности по нескольким чатам одним запросом.
+        
+        Активность группируется по (чату, типу, пользователю), итоги по каждому
+        чату собираются из этого результата в Python.
+        
+        Args:
+            chat_ids: ID чатов или None для всех чатов с активностью
+            start_date: Дата начала периода (включительно)
+            end_date: Дата окончания периода (включительно)
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: chat_id -> total_messages, unique_users, message_types
+        """
         try:
-            chat_stats = {}
-            
-            # Получаем список всех чатов из базы
-            chats_stmt = select(ChatActivity.chat_id).distinct()
-            chats_result = await self.session.execute(chats_stmt)
-            chat_ids = [row.chat_id for row in chats_result]
-            
-            for chat_id in chat_ids:
-                # Общая статистика по чату
-                stats_stmt = (
-                    select(
-                        func.count(ChatActivity.id).label('total_messages'),
-                        func.count(func.distinct(ChatActivity.user_id)).label('unique_users')
-                    )
-                    .where(
-                        and_(
-                            ChatActivity.chat_id == chat_id,
-                            func.date(ChatActivity.activity_date) >= start_date,
-                            func.date(ChatActivity.activity_date) <= end_date
-                        )
-                    )
-                )
-                
-                stats_result = await self.session.execute(stats_stmt)
-                stats_row = stats_result.first()
-                
-                # Статистика по типам сообщений
-                types_stmt = (
-                    select(
-                        ChatActivity.activity_type,
-                        func.count(ChatActivity.id).label('count')
-                    )
-                    .where(
-                        and_(
-                            ChatActivity.chat_id == chat_id,
-                            func.date(ChatActivity.activity_date) >= start_date,
-                            func.date(ChatActivity.activity_date) <= end_date
-                        )
-                    )
-                    .group_by(ChatActivity.activity_type)
+            stmt = (
+                select(
+                    ChatActivity.chat_id,
+                    ChatActivity.activity_type,
+                    ChatActivity.user_id,
+                    func.count(ChatActivity.id).label('count')
                 )
-                
-                types_result = await self.session.execute(types_stmt)
-                message_types = {row.activity_type: row.count for row in types_result}
-                
-                # Топ пользователей в чате
-                users_stmt = (
-                    select(
-                        ChatActivity.user_id,
-                        User.first_name,
-                        User.username,
-                        func.count(ChatActivity.id).label('message_count')
-                    )
-                    .join(User, ChatActivity.user_id == User.id)
-                    .where(
-                        and_(
-                            ChatActivity.chat_id == chat_id,
-                            func.date(ChatActivity.activity_date) >= start_date,
-                            func.date(ChatActivity.activity_date) <= end_date
-                        )
+                .where(
+                    and_(
+                        ChatActivity.activity_date >= start_date,
+                        ChatActivity.activity_date <= end_date
                     )
-                    .group_by(ChatActivity.user_id, User.first_name, User.username)
-                    .order_by(func.count(ChatActivity.id).desc())
-                    .limit(5)
                 )
+                .group_by(ChatActivity.chat_id, ChatActivity.activity_type, ChatActivity.user_id)
+            )
+            if chat_ids is not None:
+                stmt = stmt.where(ChatActivity.chat_id.in_(chat_ids))
+            
+            result = await self.session.execute(stmt)
+            
+            chat_stats: Dict[str, Dict[str, Any]] = {}
+            chat_users: Dict[str, set] = {}
+            for chat_id, activity_type, user_id, count in result:
+                stats = chat_stats.get(chat_id)
+                if stats is None:
+                    stats = chat_stats[chat_id] = {'total_messages': 0, 'message_types': {}}
+                    chat_users[chat_id] = set()
                 
-                users_result = await self.session.execute(users_stmt)
-                top_users = [
-                    {
-                        'first_name': row.first_name,
-                        'username': row.username,
-                        'message_count': row.message_count
-                    }
-                    for row in users_result
-                ]
-                
-                chat_stats[chat_id] = {
-                    'total_messages': stats_row.total_messages,
-                    'unique_users': stats_row.unique_users,
-                    'message_types': message_types,
-                    'top_users': top_users
-                }
+                stats['total_messages'] += count
+                message_types = stats['message_types']
+                message_types[activity_type] = message_types.get(activity_type, 0) + count
+                chat_users[chat_id].add(user_id)
+            
+            for chat_id, stats in chat_stats.items():
+                stats['unique_users'] = len(chat_users[chat_id])
             
             return chat_stats
             
@@ -896,23 +850,166 @@ class ActivityService:
                 'top_users': []
             }
     
-    async def get_top_active_users_for_chat(self, chat_id: str, days: int = 7, limit: int = 50) -> List[Dict]:
-        """Получить топ активных пользователей для конкретного чата."""
-        try:
-            start_date = (datetime.utcnow() - timedelta(days=days)).date()
+    async def get_dashboard_stats(self, since: date, top_limit: int = 100) -> Dict[str, Any]:
+        """
+        Получить всю статистику для экрана активности одним запросом.
+        
+        Активность с указанной даты группируется по (дню, пользователю, чату, типу),
+        а счетчики по дням, по типам, общие итоги и топ пользователей
+        собираются из этого результата в Python.
+        
+        Args:
+            since: Дата начала периода (включительно)
+            top_limit: Максимальное количество пользователей в топе
             
+        Returns:
+            Dict[str, Any]: by_day (дата -> messages, active_users), by_type,
+                totals (total_messages, unique_users, active_chats) и top_users
+                (список кортежей (имя, username, количество сообщений))
+        """
+        try:
             stmt = (
                 select(
+                    ChatActivity.activity_date,
                     ChatActivity.user_id,
+                    ChatActivity.chat_id,
+                    ChatActivity.activity_type,
+                    User.id,
                     User.first_name,
                     User.username,
+                    func.count(ChatActivity.id).label('count')
+                )
+                .outerjoin(User, ChatActivity.user_id == User.id)
+                .where(ChatActivity.activity_date >= since)
+                .group_by(
+                    ChatActivity.activity_date,
+                    ChatActivity.user_id,
+                    ChatActivity.chat_id,
+                    ChatActivity.activity_type,
+                    User.id,
+                    User.first_name,
+                    User.username
+                )
+            )
+            result = await self.session.execute(stmt)
+            
+            day_messages: Dict[date, int] = {}
+            day_users: Dict[date, set] = {}
+            by_type: Dict[str, int] = {}
+            chats = set()
+            user_counts: Dict[str, int] = {}
+            profiles: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+            total_messages = 0
+            
+            for activity_date, user_id, chat_id, activity_type, profile_id, first_name, username, count in result:
+                total_messages += count
+                day_messages[activity_date] = day_messages.get(activity_date, 0) + count
+                day_users.setdefault(activity_date, set()).add(user_id)
+                by_type[activity_type] = by_type.get(activity_type, 0) + count
+                chats.add(chat_id)
+                user_counts[user_id] = user_counts.get(user_id, 0) + count
+                if profile_id is not None:
+                    profiles[user_id] = (first_name, username)
+            
+            # В топ попадают только пользователи, найденные в таблице users;
+            # строки (имя, username, количество) собираются только для вошедших в топ
+            top_ids = heapq.nlargest(top_limit, profiles, key=user_counts.__getitem__)
+            top_users = [
+                (
+                    profiles[user_id][0] or UNKNOWN_USER_NAME,
+                    profiles[user_id][1] or "",
+                    user_counts[user_id]
+                )
+                for user_id in top_ids
+            ]
+            
+            return {
+                'by_day': {
+                    day: {'messages': day_messages[day], 'active_users': len(day_users[day])}
+                    for day in day_messages
+                },
+                'by_type': by_type,
+                'totals': {
+                    'total_messages': total_messages,
+                    'unique_users': len(user_counts),
+                    'active_chats': len(chats)
+                },
+                'top_users': top_users
+            }
+            
+        except Exception as e:
+            logger.error(f"Ошибка получения статистики активности для админ-панели: {e}")
+            return {
+                'by_day': {},
+                'by_type': {},
+                'totals': {'total_messages': 0, 'unique_users': 0, 'active_chats': 0},
+                'top_users': []
+            }
+    
+    @staticmethod
+    async def refresh_dashboard_snapshot() -> Tuple[datetime, Dict[str, Any]]:
+        """
+        Пересчитать снимок статистики для экрана активности в собственной сессии.
+        
+        Returns:
+            Tuple[datetime, Dict[str, Any]]: Время расчета (UTC) и результат get_dashboard_stats
+        """
+        computed_at = datetime.utcnow()
+        since = computed_at.date() - timedelta(days=ActivityService.DASHBOARD_DAYS)
+        
+        # Только чтение: сессия в режиме AUTOCOMMIT, без BEGIN/COMMIT на каждый пересчет
+        async with get_db_session_readonly() as session:
+            stats = await ActivityService(session).get_dashboard_stats(
+                since, top_limit=ActivityService.DASHBOARD_TOP_LIMIT
+            )
+        
+        ActivityService._dashboard_snapshot = (computed_at, stats)
+        return computed_at, stats
+    
+    @classmethod
+    def get_dashboard_snapshot(cls) -> Optional[Tuple[datetime, Dict[str, Any]]]:
+        """
+        Получить снимок статистики для экрана активности, если он еще актуален.
+        
+        Returns:
+            Optional[Tuple[datetime, Dict[str, Any]]]: Время расчета (UTC) и статистика
+                или None, если снимка нет или он устарел
+        """
+        snapshot = cls._dashboard_snapshot
+        if snapshot is None or datetime.utcnow() - snapshot[0] > cls.DASHBOARD_SNAPSHOT_TTL:
+            return None
+        return snapshot
+    
+    async def get_top_active_users_for_chat(
+        self,
+        chat_id: str,
+        days: int = 7,
+        limit: int = 50,
+        since: Optional[date] = None
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Получить топ активных пользователей для конкретного чата: (имя, username, количество сообщений).
+        
+        Args:
+            chat_id: ID чата
+            days: Период в днях (если не передана дата начала)
+            limit: Максимальное количество пользователей
+            since: Дата начала периода, если вызывающий код уже вычислил ее
+        """
+        try:
+            start_date = since or (datetime.utcnow() - timedelta(days=days)).date()
+            
+            stmt = (
+                select(
+                    func.coalesce(User.first_name, UNKNOWN_USER_NAME),
+                    func.coalesce(User.username, ""),
                     func.count(ChatActivity.id).label('activity_count')
                 )
                 .join(User, ChatActivity.user_id == User.id)
                 .where(
                     and_(
                         ChatActivity.chat_id == chat_id,
-                        func.date(ChatActivity.activity_date) >= start_date
+                        ChatActivity.activity_date >= start_date
                     )
                 )
                 .group_by(ChatActivity.user_id, User.first_name, User.username)
@@ -921,14 +1018,7 @@ class ActivityService:
             )
             
             result = await self.session.execute(stmt)
-            return [
-                {
-                    'first_name': row.first_name,
-                    'username': row.username,
-                    'activity_count': row.activity_count
-                }
-                for row in result
-            ]
+            return [tuple(row) for row in result]
             
         except Exception as e:
             logger.error(f"Ошибка получения пользователей для чата {chat_id}: {e}")
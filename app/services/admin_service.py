@@ -4,7 +4,8 @@
 
 import os
 import tempfile
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from loguru import logger
 
 from config.settings import get_settings
@@ -13,17 +14,19 @@ from config.settings import get_settings
 class AdminService:
     """Сервис для управления администраторами."""
     
+    # Время жизни кэша списка администраторов (сек)
+    ADMINS_CACHE_TTL = 300
+    
     def __init__(self):
         """Инициализация сервиса."""
         self.env_file_path = ".env"
+        # Кэш списка администраторов: (время сохранения, список)
+        self._admins_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
     
     def _reload_settings(self):
         """Перезагружает настройки из .env файла."""
-        # Импортируем модуль заново для перезагрузки настроек
-        import importlib
-        import config.settings
-        importlib.reload(config.settings)
-        return config.settings.get_settings()
+        get_settings.cache_clear()
+        return get_settings()
     
     async def get_current_admins(self) -> List[Dict[str, Any]]:
         """
@@ -32,6 +35,9 @@ class AdminService:
         Returns:
             List[Dict[str, Any]]: Список администраторов с их данными
         """
+        if self._admins_cache and time.monotonic() - self._admins_cache[0] < self.ADMINS_CACHE_TTL:
+            return self._admins_cache[1]
+        
         try:
             settings = self._reload_settings()
             admin_ids = settings.admin_ids_list
@@ -47,6 +53,7 @@ class AdminService:
                     "username": f"admin_{admin_id}"  # Можно получить из базы или API
                 })
             
+            self._admins_cache = (time.monotonic(), admins)
             return admins
             
         except Exception as e:
@@ -76,8 +83,7 @@ class AdminService:
                 }
             
             # Проверяем, не является ли уже администратором
-            current_admins = settings.admin_ids_list
-            if admin_id in current_admins:
+            if admin_id in settings.admin_ids_set:
                 return {
                     "success": False,
                     "message": f"❌ Пользователь с ID {admin_id} уже является администратором."
@@ -117,6 +123,10 @@ class AdminService:
             with open(self.env_file_path, 'w', encoding='utf-8') as f:
                 f.writelines(new_lines)
             
+            # Сбрасываем кэши, чтобы изменения .env были видны сразу
+            get_settings.cache_clear()
+            self._admins_cache = None
+            
             logger.info(f"Добавлен новый администратор: {admin_id}")
             
             return {
@@ -161,8 +171,7 @@ class AdminService:
                 }
             
             # Проверяем, является ли администратором
-            current_admins = settings.admin_ids_list
-            if admin_id not in current_admins:
+            if admin_id not in settings.admin_ids_set:
                 return {
                     "success": False,
                     "message": f"❌ Пользователь с ID {admin_id} не является администратором."
@@ -203,6 +212,10 @@ class AdminService:
             with open(self.env_file_path, 'w', encoding='utf-8') as f:
                 f.writelines(new_lines)
             
+            # Сбрасываем кэши, чтобы изменения .env были видны сразу
+            get_settings.cache_clear()
+            self._admins_cache = None
+            
             logger.info(f"Удален администратор: {admin_id}")
             
             return {
@@ -228,9 +241,10 @@ class AdminService:
             Dict[str, Any]: Информация об администраторе
         """
         try:
-            current_admins = self.settings.admin_ids_list
-            is_admin = admin_id in current_admins
-            is_super_admin = admin_id == self.settings.SUPER_ADMIN_ID
+            # Настройки берутся из кэша get_settings: после add_admin/remove_admin он сброшен
+            settings = get_settings()
+            is_admin = admin_id in settings.admin_ids_set
+            is_super_admin = admin_id == settings.SUPER_ADMIN_ID
             
             return {
                 "id": admin_id,
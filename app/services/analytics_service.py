@@ -33,9 +33,10 @@ class AnalyticsService:
         Returns:
             Dict: Статистика активности
         """
+        now = datetime.utcnow()
         try:
             if not start_date:
-                start_date = datetime.utcnow() - timedelta(days=7)
+                start_date = now - timedelta(days=7)
             
             end_date = start_date + timedelta(days=7)
             
@@ -43,7 +44,7 @@ class AnalyticsService:
             active_users_query = select(User).where(
                 and_(
                     User.is_premium == True,
-                    User.subscription_end > datetime.utcnow()
+                    User.subscription_end > now
                 )
             )
             active_users_result = await self.session.execute(active_users_query)
@@ -120,8 +121,8 @@ class AnalyticsService:
         except Exception as e:
             logger.error(f"Ошибка получения статистики активности: {e}")
             return {
-                'period_start': start_date or datetime.utcnow() - timedelta(days=7),
-                'period_end': (start_date or datetime.utcnow() - timedelta(days=7)) + timedelta(days=7),
+                'period_start': start_date or now - timedelta(days=7),
+                'period_end': (start_date or now - timedelta(days=7)) + timedelta(days=7),
                 'total_users': 0,
                 'active_users': 0,
                 'inactive_users': 0,
@@ -146,7 +147,7 @@ class AnalyticsService:
         try:
             stats = await self.get_weekly_activity_stats(start_date)
             
-            report = f"""
+            parts = [f"""
 📊 <b>Еженедельный отчет активности</b>
 
 <b>Период:</b> {stats['period_start'].strftime('%d.%m.%Y')} - {stats['period_end'].strftime('%d.%m.%Y')}
@@ -160,27 +161,28 @@ class AnalyticsService:
 📈 Средняя активность: {stats['average_activity']:.1f}
 
 <b>Топ включённых:</b>
-"""
+"""]
+            append = parts.append
             
             if stats['top_active']:
                 for i, username in enumerate(stats['top_active'], 1):
-                    report += f"{i}. @{username}\n"
+                    append(f"{i}. @{username}\n")
             else:
-                report += "Нет активных участников\n"
+                append("Нет активных участников\n")
             
-            report += "\n<b>Подключаемся:</b>\n"
+            append("\n<b>Подключаемся:</b>\n")
             if stats['connecting']:
                 for username in stats['connecting']:
-                    report += f"• @{username}\n"
+                    append(f"• @{username}\n")
             else:
-                report += "Все участники активны!\n"
+                append("Все участники активны!\n")
             
             # Детальная статистика по пользователям
-            report += "\n<b>Детальная статистика:</b>\n"
+            append("\n<b>Детальная статистика:</b>\n")
             for user_stat in stats['user_stats'][:10]:  # Показываем топ-10
-                report += f"@{user_stat['username']}: {user_stat['reports_count']} отчетов, {user_stat['goals_count']} целей (баллы: {user_stat['activity_score']})\n"
+                append(f"@{user_stat['username']}: {user_stat['reports_count']} отчетов, {user_stat['goals_count']} целей (баллы: {user_stat['activity_score']})\n")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Ошибка формирования отчета для админа: {e}")
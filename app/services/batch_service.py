@@ -22,7 +22,7 @@ class BatchService:
     def __init__(self):
         """Инициализация сервиса."""
         self.settings = get_settings()
-        self.bot = Bot(token=self.settings.TELEGRAM_BOT_TOKEN)
+        self.bot = Bot(token=self.settings.BOT_TOKEN)
         self.telegram_service = TelegramService(self.bot)
         
     async def send_messages_batch(
@@ -171,29 +171,34 @@ class BatchService:
             for i in range(0, len(user_ids), batch_size):
                 batch = user_ids[i:i + batch_size]
                 
-                # Обновляем статус подписки для пакета
-                for user_id in batch:
-                    try:
-                        user = await user_service.get_user_by_telegram_id(user_id)
-                        if user:
-                            # Проверяем подписку на канал
-                            is_subscribed = await self.telegram_service.check_user_subscription(
-                                user_id, 
-                                self.settings.CHANNEL_ID
-                            )
-                            
-                            # Обновляем статус в базе данных
-                            await user_service.update_user(
-                                user.id,
-                                {'is_subscribed_to_channel': is_subscribed}
-                            )
-                            
-                            results['updated'] += 1
-                        else:
-                            results['not_found'] += 1
-                    except Exception as e:
-                        logger.error(f"Ошибка обновления статуса пользователя {user_id}: {e}")
+                # Пользователи пакета, которые есть в базе, - одним запросом
+                known_ids = [row.telegram_id for row in await user_service.get_user_status_rows(batch)]
+                results['not_found'] += len(batch) - len(known_ids)
+                
+                # Проверяем подписку на канал для пакета параллельно
+                checks = await asyncio.gather(
+                    *(self.telegram_service.check_user_subscription(user_id) for user_id in known_ids),
+                    return_exceptions=True
+                )
+                
+                subscribed, unsubscribed = [], []
+                for user_id, is_subscribed in zip(known_ids, checks):
+                    if isinstance(is_subscribed, Exception):
+                        logger.error(f"Ошибка проверки подписки пользователя {user_id}: {is_subscribed}")
                         results['failed'] += 1
+                    elif is_subscribed:
+                        subscribed.append(user_id)
+                    else:
+                        unsubscribed.append(user_id)
+                
+                # Обновляем статус в базе двумя UPDATE на пакет вместо запроса на каждого
+                try:
+                    await user_service.bulk_set_channel_subscription(subscribed, True)
+                    await user_service.bulk_set_channel_subscription(unsubscribed, False)
+                    results['updated'] += len(subscribed) + len(unsubscribed)
+                except Exception as e:
+                    logger.error(f"Ошибка обновления статуса подписки пакета: {e}")
+                    results['failed'] += len(subscribed) + len(unsubscribed)
                 
                 # Небольшая задержка между пакетами
                 if i + batch_size < len(user_ids):
@@ -6,7 +6,7 @@
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from loguru import logger
 
 from app.core.database import get_db_session
@@ -18,10 +18,26 @@ from config.settings import get_settings
 class GroupManagementService:
     """Сервис для управления участниками группы."""
     
+    # Сколько пользователей проверяется одновременно (запросы к Telegram API)
+    CHECK_CONCURRENCY = 20
+    
     def __init__(self, bot=None):
         self.settings = get_settings()
         self.telegram_service = TelegramService(bot) if bot else None
     
+    @staticmethod
+    def new_check_results() -> Dict[str, Any]:
+        """Пустые счетчики результатов проверки подписок."""
+        return {
+            "total_checked": 0,
+            "processed": 0,
+            "warnings_sent": 0,
+            "warnings_failed": 0,
+            "kicked_users": 0,
+            "errors": 0,
+            "details": []
+        }
+    
     async def check_subscriptions_and_kick_unpaid(self) -> Dict[str, Any]:
         """
         Проверяет подписки всех участников группы и исключает неоплативших.
@@ -29,6 +45,24 @@ class GroupManagementService:
         Returns:
             Dict с результатами операции
         """
+        results = self.new_check_results()
+        async for detail in self.iter_subscription_checks(results):
+            results["details"].append(detail)
+        return results
+    
+    async def iter_subscription_checks(self, results: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Проверяет подписки участников группы, отдавая детали по мере обработки.
+        
+        Счетчики накапливаются в results, а записи деталей не копятся в памяти -
+        вызывающий код получает их сразу и может показывать прогресс.
+        
+        Args:
+            results: Счетчики результатов (см. new_check_results)
+            
+        Yields:
+            Dict[str, Any]: Запись о действии с пользователем (action, user_id, ...)
+        """
         try:
             logger.info("🔍 Начинаем проверку подписок участников группы...")
             
@@ -49,7 +83,7 @@ class GroupManagementService:
                 
                 # Проверяем всех пользователей, которые могут быть в группе
                 # (статус active или pending, независимо от is_in_group)
-                potential_group_members = [user for user in all_users if user.status in ['active', 'pending']]
+                potential_group_members = [user for user in all_users if user.status in {'active', 'pending'}]
                 logger.info(f"🔍 Потенциальных участников группы: {len(potential_group_members)}")
                 
                 # Используем потенциальных участников для проверки
@@ -58,49 +92,73 @@ class GroupManagementService:
                     logger.info("🔄 Проверяем всех потенциальных участников...")
                     group_members = potential_group_members
                 
-                results = {
-                    "total_checked": len(group_members),
-                    "warnings_sent": 0,
-                    "warnings_failed": 0,
-                    "kicked_users": 0,
-                    "errors": 0,
-                    "details": []
-                }
+                results["total_checked"] = len(group_members)
                 
                 # Логируем список пользователей для проверки
                 logger.info("📋 Список пользователей для проверки:")
                 for i, user in enumerate(group_members, 1):
                     logger.info(f"  {i}. {user.telegram_id} (@{user.username}) - Статус: {user.status}, Premium: {user.is_premium}, В группе: {user.is_in_group}")
                 
-                for i, user in enumerate(group_members, 1):
-                    logger.info(f"🔄 Обрабатываем пользователя {i}/{len(group_members)}: {user.telegram_id} (@{user.username})")
-                    try:
-                        await self._process_user_subscription(user, user_service, results)
-                    except Exception as e:
-                        logger.error(f"Ошибка обработки пользователя {user.telegram_id}: {e}")
-                        results["errors"] += 1
-                        results["details"].append({
-                            "user_id": user.telegram_id,
-                            "action": "error",
-                            "message": str(e)
-                        })
+                # Запросы к Telegram выполняются параллельно (не больше CHECK_CONCURRENCY),
+                # а изменения в БД применяются по одному по мере готовности:
+                # одну сессию нельзя использовать из нескольких задач одновременно
+                semaphore = asyncio.Semaphore(self.CHECK_CONCURRENCY)
+                
+                async def check(user):
+                    async with semaphore:
+                        try:
+                            return user, await self._check_user_subscription(user), None
+                        except Exception as e:
+                            return user, None, e
+                
+                tasks = [asyncio.create_task(check(user)) for user in group_members]
+                try:
+                    for i, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                        user, action, error = await next_done
+                        logger.info(f"🔄 Обработан пользователь {i}/{len(group_members)}: {user.telegram_id} (@{user.username})")
+                        
+                        if error is None:
+                            try:
+                                detail = await self._apply_subscription_check(user, action, user_service, results)
+                            except Exception as e:
+                                error = e
+                        
+                        if error is not None:
+                            logger.error(f"Ошибка обработки пользователя {user.telegram_id}: {error}")
+                            results["errors"] += 1
+                            detail = {
+                                "user_id": user.telegram_id,
+                                "action": "error",
+                                "message": str(error)
+                            }
+                        
+                        results["processed"] = i
+                        if detail is not None:
+                            yield detail
+                finally:
+                    # Если проверку прервали, оставшиеся задачи не нужны
+                    for task in tasks:
+                        task.cancel()
                 
                 logger.info(f"✅ Проверка завершена: {results}")
                 logger.info(f"🔄 Все задачи исключения запущены в фоне, система продолжает работать")
-                return results
                 
         except Exception as e:
             logger.error(f"Критическая ошибка при проверке подписок: {e}")
-            return {
-                "total_checked": 0,
-                "warnings_sent": 0,
-                "kicked_users": 0,
-                "errors": 1,
-                "details": [{"error": str(e)}]
-            }
+            results["errors"] += 1
+            yield {"action": "error", "message": str(e)}
     
-    async def _process_user_subscription(self, user, user_service: UserService, results: Dict[str, Any]) -> None:
-        """Обрабатывает подписку конкретного пользователя."""
+    async def _check_user_subscription(self, user) -> Optional[str]:
+        """
+        Проверяет подписку конкретного пользователя и при необходимости предупреждает его.
+        
+        Выполняет только запросы к Telegram и не трогает БД, поэтому
+        может выполняться параллельно для разных пользователей.
+        
+        Returns:
+            Optional[str]: "left", "warning_sent", "warning_failed"
+            или None, если действий не потребовалось
+        """
         
         logger.info(f"🔍 Проверяем пользователя {user.telegram_id} (@{user.username})")
         logger.info(f"   Статус: {user.status}, Premium: {user.is_premium}, Подписка до: {user.subscription_until}")
@@ -130,14 +188,9 @@ class GroupManagementService:
                     user_id=user.telegram_id
                 )
                 
-                if chat_member.status in ['left', 'kicked']:
+                if chat_member.status in {'left', 'kicked'}:
                     logger.info(f"ℹ️ Пользователь {user.telegram_id} (@{user.username}) покинул группу (статус: {chat_member.status}), обновляем базу и пропускаем")
-                    
-                    # Обновляем статус в базе данных
-                    user.is_in_group = False
-                    user.joined_group_at = None
-                    await user_service.session.commit()
-                    return
+                    return "left"
                     
         except Exception as e:
             logger.warning(f"⚠️ Не удалось проверить статус пользователя {user.telegram_id} в группе: {e}")
@@ -155,30 +208,56 @@ class GroupManagementService:
         logger.warning(f"⚠️ Пользователь {user.telegram_id} (@{user.username}) НЕ ОПЛАЧИВАЛ - отправляем предупреждение")
         
         warning_sent = await self._send_payment_warning(user)
-        if warning_sent:
+        return "warning_sent" if warning_sent else "warning_failed"
+    
+    async def _apply_subscription_check(
+        self,
+        user,
+        action: Optional[str],
+        user_service: UserService,
+        results: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Сохраняет результат проверки пользователя в БД и в счетчиках.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Запись о действии или None, если действий не потребовалось
+        """
+        if action is None:
+            return None
+        
+        if action == "left":
+            # Обновляем статус в базе данных
+            user.is_in_group = False
+            user.joined_group_at = None
+            await user_service.session.commit()
+            return None
+        
+        if action == "warning_sent":
             # Обновляем дату последнего предупреждения
             user.last_subscription_check = datetime.utcnow()
             await user_service.session.commit()
             
             results["warnings_sent"] += 1
-            results["details"].append({
+            detail = {
                 "user_id": user.telegram_id,
                 "action": "warning_sent",
                 "username": user.username
-            })
+            }
         else:
             results["warnings_failed"] += 1
-            results["details"].append({
+            detail = {
                 "user_id": user.telegram_id,
                 "action": "warning_failed",
                 "username": user.username
-            })
+            }
         
         # Планируем исключение через 3 дня (асинхронно)
         logger.info(f"⏰ Планируем исключение пользователя {user.telegram_id} через 3 дня")
         # Создаем задачу в фоне, чтобы не блокировать обработку других пользователей
-        import asyncio
         asyncio.create_task(self._schedule_user_kick(user.telegram_id))
+        
+        return detail
     
     async def _send_payment_warning(self, user) -> bool:
         """Отправляет предупреждение о необходимости оплаты."""
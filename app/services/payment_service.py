@@ -6,12 +6,12 @@
 
 import hashlib
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 # UUID больше не используется, ID теперь строка
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, func, case
 from sqlalchemy.orm import selectinload
 from loguru import logger
 import httpx
@@ -484,6 +484,19 @@ class PaymentService:
             logger.error(f"Ошибка получения количества успешных платежей: {e}")
             return 0
     
+    async def get_payment_counts(self) -> Dict[str, int]:
+        """Получение общего количества платежей и количества успешных одним запросом."""
+        try:
+            stmt = select(
+                func.count(Payment.id),
+                func.count(case((Payment.status == PaymentStatus.PAID, Payment.id)))
+            )
+            total, successful = (await self.session.execute(stmt)).one()
+            return {"total": total, "successful": successful}
+        except Exception as e:
+            logger.error(f"Ошибка получения счетчиков платежей: {e}")
+            return {"total": 0, "successful": 0}
+    
     async def get_total_payments_amount(self) -> Decimal:
         """Получение общей суммы платежей."""
         try:
@@ -497,12 +510,12 @@ class PaymentService:
     async def get_today_payments_amount(self) -> Decimal:
         """Получение суммы платежей за сегодня."""
         try:
-            today = datetime.utcnow().date()
+            # Диапазон вместо date(paid_at), чтобы работал индекс ix_payments_paid_at
+            day_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
             stmt = select(func.sum(Payment.amount)).where(
-                and_(
-                    Payment.status == PaymentStatus.PAID,
-                    func.date(Payment.paid_at) == today
-                )
+                Payment.status == PaymentStatus.PAID,
+                Payment.paid_at >= day_start,
+                Payment.paid_at < day_start + timedelta(days=1)
             )
             result = await self.session.execute(stmt)
             return result.scalar() or Decimal('0')
@@ -170,11 +170,14 @@ class ReminderService:
     async def get_subscription_stats(self) -> Dict[str, Any]:
         """Получение статистики подписок."""
         try:
+            # Одна отметка времени на все три выборки
+            now = datetime.now()
+            
             # Активные подписки
             active_stmt = select(User).join(Payment).where(
                 and_(
                     Payment.status == PaymentStatus.PAID,
-                    Payment.subscription_end > datetime.now(),
+                    Payment.subscription_end > now,
                     User.is_active == True
                 )
             )
@@ -182,12 +185,12 @@ class ReminderService:
             active_users = active_result.scalars().all()
             
             # Истекающие в течение недели
-            week_later = datetime.now() + timedelta(days=7)
+            week_later = now + timedelta(days=7)
             expiring_stmt = select(User).join(Payment).where(
                 and_(
                     Payment.status == PaymentStatus.PAID,
                     Payment.subscription_end <= week_later,
-                    Payment.subscription_end > datetime.now(),
+                    Payment.subscription_end > now,
                     User.is_active == True
                 )
             )
@@ -198,7 +201,7 @@ class ReminderService:
             expired_stmt = select(User).join(Payment).where(
                 and_(
                     Payment.status == PaymentStatus.PAID,
-                    Payment.subscription_end < datetime.now(),
+                    Payment.subscription_end < now,
                     User.is_active == True
                 )
             )
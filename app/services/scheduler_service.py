@@ -178,6 +178,15 @@ class SchedulerService:
                 name='Проверка подписок и исключение неоплативших'
             )
             
+            # Пересчет статистики для экрана активности админ-панели (каждые 2 минуты)
+            self.scheduler.add_job(
+                self.refresh_activity_dashboard,
+                IntervalTrigger(minutes=2),
+                id='refresh_activity_dashboard',
+                name='Пересчет статистики активности для админ-панели',
+                next_run_time=datetime.now()
+            )
+            
             logger.info("Планировщик задач настроен")
             
         except Exception as e:
@@ -195,13 +204,15 @@ class SchedulerService:
                 # Получаем всех активных пользователей для отправки еженедельного отчета
                 users = await report_service.get_all_active_users()
                 
+                # Дата запроса отчета одна на всю рассылку
+                now = datetime.now()
+                
                 count = 0
                 for user in users:
                     try:
                         
                         # Проверяем, не отправили ли уже напоминание на этой неделе
-                        today = datetime.now().date()
-                        existing_request = await report_service.get_report_by_date(str(user.id), datetime.now())
+                        existing_request = await report_service.get_report_by_date(str(user.id), now)
                         
                         if existing_request and existing_request.status == "sent":
                             logger.debug(f"Еженедельный отчет уже отправлен пользователем {user.telegram_id}, пропускаем напоминание")
@@ -209,7 +220,7 @@ class SchedulerService:
                         
                         # Создаем запрос на отчет (если его нет)
                         if not existing_request:
-                            await report_service.create_report_request(str(user.id), datetime.now())
+                            await report_service.create_report_request(str(user.id), now)
                         
                         # Отправляем напоминание
                         success = await telegram_service.send_report_reminder(user.telegram_id)
@@ -347,6 +358,13 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"Ошибка при отправке напоминаний о подписке: {e}")
     
+    async def refresh_activity_dashboard(self) -> None:
+        """Пересчет снимка статистики активности для админ-панели."""
+        try:
+            await ActivityService.refresh_dashboard_snapshot()
+        except Exception as e:
+            logger.error(f"Ошибка пересчета статистики активности для админ-панели: {e}")
+    
     async def check_subscriptions_and_kick_unpaid(self) -> None:
         """Проверка подписок и исключение неоплативших пользователей."""
         try:
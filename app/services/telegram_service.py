@@ -4,6 +4,7 @@
 Содержит методы для отправки сообщений, работы с группами и каналами.
 """
 
+import time
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from telegram import Bot, InlineKeyboardMarkup, InlineKeyboardButton
@@ -13,7 +14,7 @@ from loguru import logger
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from config.settings import settings
+from config.settings import settings, get_settings
 
 
 class TelegramService:
@@ -22,9 +23,12 @@ class TelegramService:
     def __init__(self, bot: Bot):
         """Инициализация сервиса."""
         self.bot = bot
+        self.settings = get_settings()
         # Кэш для проверки подписки (user_id -> (is_subscribed, timestamp))
         self.subscription_cache = {}
         self.cache_ttl = 300  # 5 минут
+        # Когда кэш последний раз очищался от устаревших записей
+        self._cache_purged_at = 0.0
     
     def clear_subscription_cache(self, user_id: int = None):
         """
@@ -35,11 +39,24 @@ class TelegramService:
         """
         if user_id:
             self.subscription_cache.pop(user_id, None)
-            logger.info(f"Очищен кэш подписки для пользователя {user_id}")
+            logger.debug(f"Очищен кэш подписки для пользователя {user_id}")
         else:
             self.subscription_cache.clear()
             logger.info("Очищен весь кэш подписки")
     
+    def _purge_subscription_cache(self, current_time: float) -> None:
+        """Удаляет устаревшие записи кэша подписки (не чаще раза в cache_ttl)."""
+        if current_time - self._cache_purged_at < self.cache_ttl:
+            return
+        
+        self._cache_purged_at = current_time
+        expired = [
+            user_id for user_id, (_, timestamp) in self.subscription_cache.items()
+            if current_time - timestamp >= self.cache_ttl
+        ]
+        for user_id in expired:
+            del self.subscription_cache[user_id]
+    
     async def send_message(
         self, 
         chat_id: int, 
@@ -375,10 +392,8 @@ class TelegramService:
     
     async def send_message_to_group(self, message: str) -> bool:
         """Отправка сообщения в группу."""
-        from config.settings import get_settings
-        settings = get_settings()
-        if settings.GROUP_ID:
-            return await self.send_message(int(settings.GROUP_ID), message)
+        if self.settings.GROUP_ID:
+            return await self.send_message(int(self.settings.GROUP_ID), message)
         return False
     
     async def create_group_invite_link(self, expire_date=None, member_limit=None) -> str:
@@ -393,8 +408,7 @@ class TelegramService:
             str: Пригласительная ссылка
         """
         try:
-            from config.settings import get_settings
-            settings = get_settings()
+            settings = self.settings
             
             if not settings.GROUP_ID:
                 logger.error("GROUP_ID не настроен")
@@ -450,7 +464,6 @@ class TelegramService:
         """Проверка подписки пользователя на группу "ЯДРО КЛУБА / ОСНОВА PUTИ" согласно ТЗ."""
         try:
             # Проверяем кэш
-            import time
             current_time = time.time()
             if user_id in self.subscription_cache:
                 is_subscribed, timestamp = self.subscription_cache[user_id]
@@ -459,9 +472,7 @@ class TelegramService:
                     return is_subscribed
             
             # Реальная проверка подписки на группу "ЯДРО КЛУБА / ОСНОВА PUTИ"
-            from config.settings import get_settings
-            settings = get_settings()
-            group_id = settings.GROUP_ID
+            group_id = self.settings.GROUP_ID
             logger.info(f"🔍 Проверяем подписку пользователя {user_id} на группу {group_id}")
             
             # Получаем информацию о пользователе в группе через Bot API
@@ -472,9 +483,10 @@ class TelegramService:
             
             # Проверяем статус: member, administrator, creator = подписан
             # left, kicked = не подписан
-            is_subscribed = chat_member.status in ['member', 'administrator', 'creator']
+            is_subscribed = chat_member.status in {'member', 'administrator', 'creator'}
             
             # Сохраняем в кэш
+            self._purge_subscription_cache(current_time)
             self.subscription_cache[user_id] = (is_subscribed, current_time)
             
             logger.info(f"Проверка подписки пользователя {user_id} на группу {group_id}: статус '{chat_member.status}', подписан: {is_subscribed}")
@@ -482,9 +494,8 @@ class TelegramService:
             
         except TelegramError as e:
             logger.error(f"Ошибка проверки подписки пользователя {user_id} на группу {group_id}: {e}")
-            # В случае ошибки (например, бот не админ канала) считаем, что не подписан
-            # Сохраняем результат ошибки в кэш на короткое время
-            self.subscription_cache[user_id] = (False, current_time)
+            # В случае ошибки (например, бот не админ канала) считаем, что не подписан.
+            # Ошибку не кэшируем, чтобы временный сбой не закрывал доступ на весь TTL
             return False
     
     async def send_subscription_required_message(self, user_id: int) -> bool:
@@ -585,7 +596,6 @@ class TelegramService:
         """
         try:
             # Временно баним на 30 секунд, чтобы пользователь мог вернуться после оплаты
-            from datetime import datetime
             until_date = int(datetime.utcnow().timestamp()) + 30
             
             await self.bot.ban_chat_member(
@@ -4,11 +4,13 @@
 Содержит бизнес-логику для управления пользователями.
 """
 
-from typing import Optional, List
+import uuid
+from typing import Optional, List, Tuple, Dict
 from datetime import datetime
 # UUID больше не используется, ID теперь строка
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, func, delete, or_
+from sqlalchemy import select, update, func, delete, or_, bindparam, case, literal, tuple_, type_coerce, String, Row, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import selectinload
 from loguru import logger
 
@@ -20,9 +22,43 @@ from app.core.exceptions import UserException
 class UserService:
     """Сервис для работы с пользователями."""
     
+    # Поля пользователя для списков в админ-панели (строки вместо ORM-объектов)
+    _LIST_COLUMNS = (
+        User.id,
+        User.telegram_id,
+        User.username,
+        User.first_name,
+        User.status,
+        User.is_premium,
+        User.is_subscribed_to_channel,
+        User.subscription_until,
+        User.created_at
+    )
+    
+    # Ключ в session.info для пользователей, уже найденных по Telegram ID в этой сессии
+    _TELEGRAM_ID_CACHE_KEY = "users_by_telegram_id"
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
+    def _telegram_id_cache(self) -> Dict[int, User]:
+        """Кэш поиска по Telegram ID, живущий столько же, сколько сессия."""
+        return self.session.info.setdefault(self._TELEGRAM_ID_CACHE_KEY, {})
+    
+    def _get_cached_user(self, telegram_id: int) -> Optional[User]:
+        """Пользователь из кэша сессии, если он все еще загружен в этой сессии."""
+        user = self._telegram_id_cache().get(telegram_id)
+        if user is None:
+            return None
+        
+        # После отката объект истекает или отсоединяется - тогда идем в БД
+        state = inspect(user)
+        if state.persistent and not state.expired_attributes:
+            return user
+        
+        self._telegram_id_cache().pop(telegram_id, None)
+        return None
+    
     async def create_user(self, user_data: UserCreate) -> User:
         """
         Создание нового пользователя.
@@ -78,6 +114,48 @@ class UserService:
             logger.error(f"Ошибка получения пользователя по ID {user_id}: {e}")
             return None
     
+    async def get_or_create_by_telegram_id(self, user_data: UserCreate) -> Tuple[User, bool]:
+        """
+        Получение пользователя по Telegram ID или создание нового одним запросом.
+        
+        Выполняет INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING,
+        попутно обновляя имя и username из Telegram.
+        
+        Args:
+            user_data: Данные пользователя из Telegram
+            
+        Returns:
+            Tuple[User, bool]: Пользователь и флаг, был ли он создан
+        """
+        try:
+            new_id = str(uuid.uuid4())
+            stmt = sqlite_insert(User).values(id=new_id, **user_data.dict())
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.telegram_id],
+                set_={
+                    "username": stmt.excluded.username,
+                    "first_name": stmt.excluded.first_name,
+                    "last_name": stmt.excluded.last_name,
+                    "updated_at": func.now()
+                }
+            ).returning(User)
+            
+            result = await self.session.execute(stmt, execution_options={"populate_existing": True})
+            user = result.scalar_one()
+            await self.session.commit()
+            self._telegram_id_cache()[user.telegram_id] = user
+            
+            # При конфликте строка сохраняет прежний id, поэтому совпадение означает вставку
+            created = user.id == new_id
+            if created:
+                logger.info(f"Создан новый пользователь: {user.telegram_id}")
+            return user, created
+            
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Ошибка получения или создания пользователя {user_data.telegram_id}: {e}")
+            raise UserException(f"Не удалось получить или создать пользователя: {e}")
+    
     async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
         """
         Получение пользователя по Telegram ID.
@@ -88,11 +166,18 @@ class UserService:
         Returns:
             Optional[User]: Пользователь или None
         """
+        user = self._get_cached_user(telegram_id)
+        if user is not None:
+            return user
+        
         try:
             result = await self.session.execute(
                 select(User).where(User.telegram_id == telegram_id)
             )
-            return result.scalar_one_or_none()
+            user = result.scalar_one_or_none()
+            if user is not None:
+                self._telegram_id_cache()[telegram_id] = user
+            return user
         except Exception as e:
             logger.error(f"Ошибка получения пользователя по Telegram ID {telegram_id}: {e}")
             return None
@@ -131,7 +216,241 @@ class UserService:
             await self.session.rollback()
             logger.error(f"Ошибка обновления пользователя {user_id}: {e}")
             raise UserException(f"Не удалось обновить пользователя: {e}")
-    
+
+    async def set_subscription_by_telegram_id(
+        self,
+        telegram_id: int,
+        subscription_until: Optional[datetime],
+        is_premium: bool,
+        status: str
+    ) -> Optional[User]:
+        """
+        Обновление подписки пользователя одним UPDATE ... RETURNING.
+        
+        Args:
+            telegram_id: Telegram ID пользователя
+            subscription_until: Дата окончания подписки (None - снять подписку)
+            is_premium: Флаг премиум
+            status: Новый статус пользователя
+            
+        Returns:
+            Optional[User]: Обновленный пользователь или None, если не найден
+        """
+        try:
+            stmt = (
+                update(User)
+                .where(User.telegram_id == telegram_id)
+                .values(
+                    subscription_until=subscription_until,
+                    is_premium=is_premium,
+                    status=status
+                )
+                .returning(User)
+            )
+            result = await self.session.execute(stmt)
+            user = result.scalar_one_or_none()
+            await self.session.commit()
+            
+            if user:
+                logger.info(f"Обновлена подписка пользователя {telegram_id}")
+            return user
+            
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Ошибка обновления подписки пользователя {telegram_id}: {e}")
+            raise UserException(f"Не удалось обновить подписку: {e}")
+
+    async def upsert_grant_access(
+        self,
+        user_data: UserCreate,
+        subscription_until: datetime
+    ) -> Tuple[User, bool]:
+        """
+        Выдача доступа с созданием пользователя при необходимости одним запросом.
+        
+        Выполняет INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING:
+        новый пользователь создается сразу активным, у существующего
+        обновляются статус и подписка.
+        
+        Args:
+            user_data: Данные пользователя из Telegram
+            subscription_until: Дата окончания подписки
+            
+        Returns:
+            Tuple[User, bool]: Пользователь и флаг, был ли он создан
+        """
+        try:
+            new_id = str(uuid.uuid4())
+            access = {
+                "status": UserStatus.ACTIVE.value,
+                "is_premium": True,
+                "subscription_until": subscription_until
+            }
+            stmt = sqlite_insert(User).values(id=new_id, **user_data.dict(), **access)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.telegram_id],
+                set_={**access, "updated_at": func.now()}
+            ).returning(User)
+            
+            result = await self.session.execute(stmt, execution_options={"populate_existing": True})
+            user = result.scalar_one()
+            await self.session.commit()
+            self._telegram_id_cache()[user.telegram_id] = user
+            
+            created = user.id == new_id
+            logger.info(
+                f"Выдан доступ пользователю {user.telegram_id}"
+                f"{' (создан новый пользователь)' if created else ''}"
+            )
+            return user, created
+            
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Ошибка выдачи доступа пользователю {user_data.telegram_id}: {e}")
+            raise UserException(f"Не удалось выдать доступ: {e}")
+
+    async def get_user_status_rows(self, telegram_ids: List[int]) -> List[Row]:
+        """
+        Получение полей статуса пользователей без загрузки ORM-объектов.
+        
+        Args:
+            telegram_ids: Список Telegram ID
+            
+        Returns:
+            List[Row]: Строки с полями статуса и подписки
+        """
+        try:
+            if not telegram_ids:
+                return []
+            
+            stmt = select(
+                User.id,
+                User.telegram_id,
+                User.username,
+                User.first_name,
+                User.last_name,
+                User.status,
+                User.is_in_group,
+                User.is_subscribed_to_channel,
+                User.is_premium,
+                User.subscription_until,
+                User.created_at,
+                User.updated_at
+            ).where(User.telegram_id.in_(bindparam("telegram_ids", expanding=True)))
+            result = await self.session.execute(stmt, {"telegram_ids": list(telegram_ids)})
+            return result.all()
+            
+        except Exception as e:
+            logger.error(f"Ошибка получения статуса пользователей: {e}")
+            return []
+
+    async def bulk_set_subscription(
+        self,
+        telegram_ids: List[int],
+        subscription_until: Optional[datetime],
+        is_premium: bool = True,
+        status: str = UserStatus.ACTIVE.value
+    ) -> int:
+        """
+        Массовое обновление подписки одним UPDATE ... WHERE telegram_id IN (...).
+
+        Args:
+            telegram_ids: Список Telegram ID
+            subscription_until: Дата окончания подписки (None - снять подписку)
+            is_premium: Флаг премиум
+            status: Новый статус пользователей
+
+        Returns:
+            int: Количество обновленных пользователей
+        """
+        try:
+            if not telegram_ids:
+                return 0
+
+            stmt = (
+                update(User)
+                .where(User.telegram_id.in_(bindparam("telegram_ids", expanding=True)))
+                .values(
+                    subscription_until=subscription_until,
+                    is_premium=is_premium,
+                    status=status
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt, {"telegram_ids": list(telegram_ids)})
+            await self.session.commit()
+
+            logger.info(f"Массово обновлена подписка для {result.rowcount} пользователей")
+            return result.rowcount
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Ошибка массового обновления подписки: {e}")
+            raise UserException(f"Не удалось обновить подписку: {e}")
+
+    async def bulk_set_channel_subscription(self, telegram_ids: List[int], is_subscribed: bool) -> int:
+        """
+        Массовое обновление флага подписки на канал одним UPDATE ... WHERE telegram_id IN (...).
+
+        Args:
+            telegram_ids: Список Telegram ID
+            is_subscribed: Подписан ли пользователь на канал
+
+        Returns:
+            int: Количество обновленных пользователей
+        """
+        try:
+            if not telegram_ids:
+                return 0
+
+            stmt = (
+                update(User)
+                .where(User.telegram_id.in_(bindparam("telegram_ids", expanding=True)))
+                .values(is_subscribed_to_channel=is_subscribed)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt, {"telegram_ids": list(telegram_ids)})
+            await self.session.commit()
+            return result.rowcount
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Ошибка массового обновления подписки на канал: {e}")
+            raise UserException(f"Не удалось обновить подписку на канал: {e}")
+
+    async def bulk_grant_access(self, subscription_until: datetime) -> List[int]:
+        """
+        Выдать доступ всем ожидающим пользователям одним UPDATE ... WHERE status='pending'.
+
+        Args:
+            subscription_until: Дата окончания подписки
+
+        Returns:
+            List[int]: Telegram ID обновленных пользователей (для уведомлений)
+        """
+        try:
+            stmt = (
+                update(User)
+                .where(User.status == UserStatus.PENDING.value)
+                .values(
+                    status=UserStatus.ACTIVE.value,
+                    is_premium=True,
+                    subscription_until=subscription_until
+                )
+                .returning(User.telegram_id)
+                .execution_options(synchronize_session=False)
+            )
+            updated_ids = list((await self.session.execute(stmt)).scalars().all())
+            await self.session.commit()
+
+            logger.info(f"Доступ выдан {len(updated_ids)} ожидающим пользователям")
+            return updated_ids
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Ошибка массовой выдачи доступа: {e}")
+            raise UserException(f"Не удалось выдать доступ: {e}")
+
     async def get_users(
         self, 
         skip: int = 0, 
@@ -194,42 +513,122 @@ class UserService:
             logger.error(f"Ошибка получения количества активных пользователей: {e}")
             return 0
 
-    async def get_recent_users(self, limit: int = 10, offset: int = 0) -> List[User]:
+    @staticmethod
+    def _keyset_page(stmt, cursor: Optional[Tuple[datetime, str]]):
+        """
+        Упорядочить выборку пользователей по (created_at, id) и отрезать ее по курсору.
+        
+        В отличие от OFFSET, база не перебирает пропущенные строки:
+        поиск идет сразу по индексу ix_users_created_at_id.
+        
+        Args:
+            stmt: Запрос select(User)
+            cursor: Курсор (created_at, id) последнего пользователя предыдущей страницы
+            
+        Returns:
+            Запрос с сортировкой и условием курсора
+        """
+        stmt = stmt.order_by(User.created_at.desc(), User.id.desc())
+        if cursor:
+            # Сравниваем с сырым текстом колонки, как в get_users_page_with_stats:
+            # server_default пишет время без микросекунд, а связанный datetime - с ними
+            created_at, user_id = cursor
+            stmt = stmt.where(
+                tuple_(type_coerce(User.created_at, String), User.id) < tuple_(str(created_at), user_id)
+            )
+        return stmt
+    
+    async def get_recent_users(
+        self,
+        limit: int = 10,
+        cursor: Optional[Tuple[datetime, str]] = None
+    ) -> List[User]:
         """
         Получить список последних пользователей.
         
         Args:
             limit: Максимальное количество пользователей
-            offset: Смещение для пагинации
+            cursor: Курсор (created_at, id) последнего пользователя предыдущей страницы
             
         Returns:
             List[User]: Список последних пользователей
         """
         try:
-            stmt = select(User).order_by(User.created_at.desc()).limit(limit).offset(offset)
+            stmt = self._keyset_page(select(User), cursor).limit(limit)
             result = await self.session.execute(stmt)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Ошибка получения последних пользователей: {e}")
             return []
     
-    async def get_users_by_status(self, status: str) -> List[User]:
+    async def get_users_page_with_stats(
+        self,
+        cursor: Optional[Tuple[str, str]] = None,
+        limit: int = 10,
+        since: Optional[datetime] = None
+    ) -> Tuple[List[Row], Optional[Tuple[str, str]], Dict[str, int]]:
         """
-        Получить пользователей по статусу.
+        Получить страницу пользователей вместе со счетчиками одним запросом.
+        
+        Счетчики считаются оконными функциями по всей таблице во вложенном
+        запросе, а курсор применяется уже к его результату. Пользователи
+        возвращаются строками с полями _LIST_COLUMNS, без ORM-объектов.
         
         Args:
-            status: Статус пользователей
+            cursor: Курсор (created_at, id) последнего пользователя предыдущей страницы
+            limit: Количество пользователей на странице
+            since: Дата, с которой считать новых пользователей
             
         Returns:
-            List[User]: Список пользователей с указанным статусом
+            Tuple: Строки пользователей, курсор следующей страницы и счетчики
+                (ключи как у get_user_counts)
         """
         try:
-            stmt = select(User).where(User.status == status).order_by(User.created_at.desc())
-            result = await self.session.execute(stmt)
-            return result.scalars().all()
+            new_users = (
+                func.count(case((User.created_at >= since, User.id))).over()
+                if since is not None else literal(0)
+            )
+            ranked = select(
+                *self._LIST_COLUMNS,
+                type_coerce(User.created_at, String).label("created_at_raw"),
+                func.count(User.id).over().label("total_users"),
+                func.count(case((User.status == UserStatus.ACTIVE.value, User.id))).over().label("active_users"),
+                func.count(case((User.is_premium == True, User.id))).over().label("premium_users"),
+                new_users.label("new_users")
+            ).subquery()
+            stmt = select(
+                *(ranked.c[column.key] for column in self._LIST_COLUMNS),
+                ranked.c.created_at_raw,
+                ranked.c.total_users,
+                ranked.c.active_users,
+                ranked.c.premium_users,
+                ranked.c.new_users
+            ).order_by(ranked.c.created_at_raw.desc(), ranked.c.id.desc())
+            if cursor:
+                stmt = stmt.where(tuple_(ranked.c.created_at_raw, ranked.c.id) < tuple_(*cursor))
+            
+            rows = (await self.session.execute(stmt.limit(limit + 1))).all()
+            if not rows:
+                # Пустая страница - счетчики берем отдельным запросом
+                return [], None, await self.get_user_counts(since=since)
+            
+            first = rows[0]
+            stats = {
+                "total": first.total_users,
+                "active": first.active_users,
+                "premium": first.premium_users,
+                "new": first.new_users
+            }
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = (rows[-1].created_at_raw, rows[-1].id)
+            
+            return rows, next_cursor, stats
         except Exception as e:
-            logger.error(f"Ошибка получения пользователей по статусу {status}: {e}")
-            return []
+            logger.error(f"Ошибка получения страницы пользователей со статистикой: {e}")
+            return [], None, {"total": 0, "active": 0, "premium": 0, "new": 0}
     
     async def get_total_users_count(self) -> int:
         """Получение общего количества пользователей."""
@@ -271,6 +670,33 @@ class UserService:
             logger.error(f"Ошибка получения количества новых пользователей: {e}")
             return 0
     
+    async def get_user_counts(self, since: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Получение основных счетчиков пользователей одним запросом.
+        
+        Args:
+            since: Дата, с которой считать новых пользователей
+            
+        Returns:
+            Dict[str, int]: total, active, premium и new (новые с since)
+        """
+        try:
+            new_users = (
+                func.count(case((User.created_at >= since, User.id)))
+                if since is not None else literal(0)
+            )
+            stmt = select(
+                func.count(User.id),
+                func.count(case((User.status == UserStatus.ACTIVE.value, User.id))),
+                func.count(case((User.is_premium == True, User.id))),
+                new_users
+            )
+            total, active, premium, new = (await self.session.execute(stmt)).one()
+            return {"total": total, "active": active, "premium": premium, "new": new}
+        except Exception as e:
+            logger.error(f"Ошибка получения счетчиков пользователей: {e}")
+            return {"total": 0, "active": 0, "premium": 0, "new": 0}
+    
     async def add_user_to_group(self, user_id: str) -> bool:
         """
         Добавление пользователя в группу.
@@ -394,14 +820,15 @@ class UserService:
             logger.error(f"Ошибка обновления подписки пользователя {user_id}: {e}")
             return False
     
-    async def get_all_users(self, offset: int = 0, limit: int = 20) -> List[User]:
-        """Получить всех пользователей с пагинацией."""
+    async def get_all_users(
+        self,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        limit: Optional[int] = None
+    ) -> List[User]:
+        """Получить пользователей (limit=None - всех) с пагинацией по курсору (created_at, id)."""
         try:
             result = await self.session.execute(
-                select(User)
-                .order_by(User.created_at.desc())
-                .offset(offset)
-                .limit(limit)
+                self._keyset_page(select(User), cursor).limit(limit)
             )
             return list(result.scalars().all())
         except Exception as e:
@@ -453,25 +880,39 @@ class UserService:
                 delete(User).where(User.id == user_id_str)
             )
             await self.session.commit()
+            self._telegram_id_cache().clear()
             return result.rowcount > 0
         except Exception as e:
             logger.error(f"Ошибка удаления пользователя {user_id}: {e}")
             await self.session.rollback()
             return False
     
-    async def get_users_by_status(self, status: str, limit: int = 50) -> List[User]:
-        """Получить пользователей по статусу."""
+    async def get_status_preview(self, status: str, limit: int = 5) -> Tuple[int, List[Row]]:
+        """
+        Количество пользователей с указанным статусом и последние из них - одним запросом.
+        
+        Общее количество считается оконной функцией до LIMIT, поэтому
+        из базы приходит не больше limit строк.
+        
+        Args:
+            status: Статус пользователей
+            limit: Сколько последних пользователей вернуть
+            
+        Returns:
+            Tuple[int, List[Row]]: Общее количество и строки с полями _LIST_COLUMNS, новые первыми
+        """
         try:
             result = await self.session.execute(
-                select(User)
+                select(*self._LIST_COLUMNS, func.count(User.id).over().label("status_total"))
                 .where(User.status == status)
                 .order_by(User.created_at.desc())
                 .limit(limit)
             )
-            return list(result.scalars().all())
+            rows = result.all()
+            return (rows[0].status_total if rows else 0), rows
         except Exception as e:
             logger.error(f"Ошибка получения пользователей по статусу {status}: {e}")
-            return []
+            return 0, []
     
     async def get_inactive_users(self, days: int = 7) -> List[User]:
         """Получить неактивных пользователей (не заходили N дней)."""
@@ -489,55 +930,6 @@ class UserService:
             logger.error(f"Ошибка получения неактивных пользователей: {e}")
             return []
     
-    async def get_user_statistics(self) -> dict:
-        """Получить детальную статистику пользователей."""
-        try:
-            from datetime import timedelta
-            
-            # Общая статистика
-            total = await self.get_users_count()
-            active = await self.get_active_users_count()
-            
-            # По статусам
-            active_users = len(await self.get_users_by_status("active"))
-            inactive_users = len(await self.get_users_by_status("inactive"))
-            banned_users = len(await self.get_users_by_status("banned"))
-            
-            # По времени
-            today = datetime.utcnow().date()
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            month_ago = datetime.utcnow() - timedelta(days=30)
-            
-            new_today = await self.session.execute(
-                select(func.count(User.id))
-                .where(func.date(User.created_at) == today)
-            )
-            new_week = await self.session.execute(
-                select(func.count(User.id))
-                .where(User.created_at >= week_ago)
-            )
-            new_month = await self.session.execute(
-                select(func.count(User.id))
-                .where(User.created_at >= month_ago)
-            )
-            
-            return {
-                "total": total,
-                "active": active_users,
-                "inactive": inactive_users,
-                "banned": banned_users,
-                "new_today": new_today.scalar() or 0,
-                "new_week": new_week.scalar() or 0,
-                "new_month": new_month.scalar() or 0,
-                "activity_rate": round((active / max(total, 1)) * 100, 1)
-            }
-        except Exception as e:
-            logger.error(f"Ошибка получения статистики пользователей: {e}")
-            return {
-                "total": 0, "active": 0, "inactive": 0, "banned": 0,
-                "new_today": 0, "new_week": 0, "new_month": 0, "activity_rate": 0
-            }
-    
     async def get_users_in_group(self) -> List[User]:
         """Получить всех пользователей, которые находятся в группе."""
         try:
@@ -550,14 +942,3 @@ class UserService:
         except Exception as e:
             logger.error(f"Ошибка получения пользователей в группе: {e}")
             return []
-    
-    async def get_all_users(self) -> List[User]:
-        """Получить всех пользователей из базы данных."""
-        try:
-            result = await self.session.execute(
-                select(User).order_by(User.created_at.desc())
-            )
-            return list(result.scalars().all())
-        except Exception as e:
-            logger.error(f"Ошибка получения всех пользователей: {e}")
-            return []
\ No newline at end of file
@@ -12,6 +12,7 @@ import hashlib
 import json
 from typing import Dict, Any, Optional
 from aiohttp import web, ClientSession
+from telegram.ext import Application
 from loguru import logger
 
 from config.settings import get_settings
@@ -21,16 +22,23 @@ from app.bot.handlers.webhook import process_cryptobot_webhook
 class WebhookServer:
     """HTTP сервер для обработки webhook'ов."""
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 8000):
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        application: Optional[Application] = None
+    ):
         """
         Инициализация сервера.
         
         Args:
             host: Хост для привязки сервера
             port: Порт для привязки сервера
+            application: Приложение бота, если он запущен в этом же процессе
         """
         self.host = host
         self.port = port
+        self.application = application
         self.app = web.Application()
         self.settings = get_settings()
         self._setup_routes()
@@ -132,7 +140,7 @@ class WebhookServer:
             logger.info(f"Получен webhook CryptoBot: {webhook_data.get('update_type')}")
             
             # Обрабатываем webhook
-            success = await process_cryptobot_webhook(webhook_data)
+            success = await process_cryptobot_webhook(webhook_data, self.application)
             
             if success:
                 logger.info("Webhook CryptoBot обработан успешно")
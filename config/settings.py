@@ -3,8 +3,9 @@
 """
 
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import FrozenSet, List, Optional, Dict
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -79,6 +80,11 @@ class Settings(BaseSettings):
         """Получить список ID админов."""
         return [int(x.strip()) for x in self.ADMIN_IDS.split(",") if x.strip()]
     
+    @cached_property
+    def admin_ids_set(self) -> FrozenSet[int]:
+        """Множество ID админов для проверки прав (разбирается один раз на экземпляр настроек)."""
+        return frozenset(self.admin_ids_list)
+    
     # Настройки платежей
     PAYMENT_PROVIDER: str = Field(default="cryptobot", env="PAYMENT_PROVIDER")  # cryptobot, freekassa, telegram
     CRYPTOBOT_TOKEN: str = Field(default="461291:AAsDrsj9ZG7kIw5cNPP3UipePY7L6rSa6Xl", env="CRYPTOBOT_TOKEN")
@@ -157,9 +163,14 @@ class Settings(BaseSettings):
 settings = Settings()
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Получить настройки приложения."""
-    # Всегда создаем новый экземпляр для получения актуальных данных
+    """
+    Получить настройки приложения.
+    
+    Экземпляр создается один раз; после изменения .env
+    его нужно сбросить через get_settings.cache_clear().
+    """
     return Settings()
 
 
@@ -6,6 +6,8 @@
 - media_file_id
 - media_duration  
 - media_file_size
+
+и создает недостающие индексы.
 """
 
 import asyncio
@@ -80,6 +82,20 @@ async def migrate_database():
                 else:
                     logger.info(f"✅ Колонка {column_name} уже существует")
             
+            # Индексы, объявленные в моделях (create_all не добавляет их в существующие таблицы)
+            new_indexes = [
+                ("ix_users_created_at_id", "users", "created_at, id"),
+                ("ix_users_status_created_at", "users", "status, created_at"),
+                ("ix_chat_activities_chat_date_user", "chat_activities", "chat_id, activity_date, user_id"),
+                ("ix_payments_created_at", "payments", "created_at"),
+                ("ix_payments_paid_at", "payments", "paid_at"),
+            ]
+            
+            for index_name, table_name, columns_sql in new_indexes:
+                logger.info(f"➕ Создаем индекс (если отсутствует): {index_name}")
+                await cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns_sql})")
+                await db.commit()
+            
             # Проверяем результат
             logger.info("🔍 Проверяем структуру таблицы после миграции...")
             await cursor.execute("PRAGMA table_info(chat_activities)")
@@ -56,7 +56,8 @@ class BotWithWebhookRunner:
             # Создание и запуск webhook сервера
             self.webhook_server = WebhookServer(
                 host=self.settings.WEBHOOK_HOST,
-                port=self.settings.WEBHOOK_PORT
+                port=self.settings.WEBHOOK_PORT,
+                application=self.bot.application
             )
             await self.webhook_server.start()
             